@@ -7,26 +7,48 @@ Flask API 服务
 
 import os
 import sys
+import json
+import hashlib
+from datetime import datetime
+from functools import wraps
+from itertools import islice
 
 # 添加项目根目录到路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from flask import Flask, jsonify, send_from_directory, request
+from flask import (
+    Flask, Response, jsonify, send_from_directory, request, make_response, stream_with_context
+)
 from flask_cors import CORS
 
-from config import FLASK_HOST, FLASK_PORT, FLASK_DEBUG, BASE_DIR
+from config import (
+    FLASK_HOST, FLASK_PORT, FLASK_DEBUG, BASE_DIR, ANALYTICS_MAX_HOURS,
+    SSE_HEARTBEAT_SECONDS, SSE_RETRY_MS
+)
 from models.database import (
-    get_latest_hot_list,
     get_word_trend,
-    get_rising_topics,
+    get_word_trends,
+    pick_trend_resolution,
     get_snapshot_history,
+    search_words,
+    get_topic_lifecycle,
+    list_topics,
+    LIFECYCLE_SORT_COLUMNS,
     init_database
 )
+from models.analytics import analyze_topics, ANALYTICS_SORT_FIELDS
+from models.bursts import get_recent_bursts
+from models.cache import get_snapshot_cache
+from models.rendered import RenderedBody
+from models.status import get_status_counters
+from snapshot_events import get_snapshot_events
+from process_signal import get_worker_status, watch_worker
 from scraper.unified_scraper import get_unified_scraper
 from scheduler.jobs import start_scheduler, trigger_scrape_now, update_scheduler_interval
+from scheduler.leader import get_leader_election
 from settings_manager import (
     load_settings, save_settings, 
-    get_record_dates, get_records_for_date, get_word_history
+    get_record_dates, iter_records_for_date, get_word_history
 )
 
 
@@ -37,6 +59,55 @@ app = Flask(__name__,
 CORS(app)
 
 
+# ==================== 条件请求 ====================
+
+def snapshot_etag(view):
+    """
+    基于最新快照生成强 ETag 的装饰器
+    
+    ETag 由数据版本和完整请求路径（含参数）计算，
+    If-None-Match 命中时直接返回 304，不执行任何查询。
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        version = get_snapshot_cache().get_version()
+        etag = hashlib.md5(f"{version}|{request.full_path}".encode('utf-8')).hexdigest()
+        
+        if request.if_none_match.contains(etag):
+            response = make_response('', 304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        
+        response.set_etag(etag)
+        # 允许缓存，但每次使用前必须重新验证
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    return wrapper
+
+
+def send_rendered(body):
+    """
+    返回预渲染的响应体（models/rendered.py）
+
+    按 Accept-Encoding 选择 br / gzip / 未压缩的字节直接发送，
+    ETag 取自内容哈希，命中 If-None-Match 时返回 304。
+    """
+    data, encoding, etag = body.select(request.accept_encodings)
+    if any(request.if_none_match.contains(tag) for tag in body.etags()):
+        response = make_response('', 304)
+    else:
+        response = Response(data, mimetype='application/json')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
+
 # ==================== 页面路由 ====================
 
 @app.route('/')
@@ -69,10 +140,59 @@ def api_hot_list():
         }
     """
     try:
-        hot_list = get_latest_hot_list()
+        return send_rendered(get_snapshot_cache().get_hot_body())
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/hot/delta')
+@snapshot_etag
+def api_hot_delta():
+    """
+    获取最新热榜相对某个快照的变化
+    
+    参数:
+        since: 客户端当前持有的快照ID（/api/hot 或上一次增量返回的 snapshot_id）
+    
+    返回（增量）:
+        {
+            "success": true,
+            "mode": "delta",
+            "since": 344,
+            "snapshot_id": 345,
+            "entered": [{"key": "812", "position": 7, "word": "...", ...}],  // 新上榜的完整条目
+            "left": ["640"],                                                // 下榜条目的 key
+            "changed": [{"key": "77", "position": 3, "hot_value": 9876543}], // 只含变化的字段
+            "count": 50
+        }
+    
+    since 不存在或落后超过 HOT_DELTA_MAX_SNAPSHOTS 个快照时返回完整热榜：
+        {"success": true, "mode": "full", "snapshot_id": 345, "data": [...], "count": 50}
+    """
+    since = request.args.get('since', type=int)
+    if since is None:
+        return jsonify({'success': False, 'error': '缺少 since 参数'}), 400
+    
+    try:
+        snapshot_id, hot_list, delta = get_snapshot_cache().get_hot_delta(since)
+        
+        if delta is None:
+            return jsonify({
+                'success': True,
+                'mode': 'full',
+                'snapshot_id': snapshot_id,
+                'data': hot_list,
+                'count': len(hot_list)
+            })
         return jsonify({
             'success': True,
-            'data': hot_list,
+            'mode': 'delta',
+            'since': since,
+            'snapshot_id': snapshot_id,
+            **delta,
             'count': len(hot_list)
         })
     except Exception as e:
@@ -83,6 +203,7 @@ def api_hot_list():
 
 
 @app.route('/api/trend/<word>')
+@snapshot_etag
 def api_word_trend(word):
     """
     获取某个热搜词的趋势
@@ -90,11 +211,13 @@ def api_word_trend(word):
     参数:
         word: 热搜词
         hours: 查询的小时数 (默认24)
+        resolution: raw/hourly/daily (默认 auto，按时间窗口自动选择)
     
     返回:
         {
             "success": true,
             "word": "...",
+            "resolution": "raw",
             "trend": [
                 {"time": "2024-01-14 10:00:00", "position": 1, "hot_value": 1234567},
                 ...
@@ -103,10 +226,12 @@ def api_word_trend(word):
     """
     try:
         hours = request.args.get('hours', 24, type=int)
-        trend = get_word_trend(word, hours)
+        resolution = pick_trend_resolution(hours, request.args.get('resolution', 'auto'))
+        trend = get_word_trend(word, hours, resolution)
         return jsonify({
             'success': True,
             'word': word,
+            'resolution': resolution,
             'trend': trend,
             'count': len(trend)
         })
@@ -117,6 +242,97 @@ def api_word_trend(word):
         }), 500
 
 
+@app.route('/api/trends')
+@snapshot_etag
+def api_word_trends():
+    """
+    批量获取多个热搜词的趋势（一次请求、一次查询）
+    
+    参数:
+        words: 热搜词，可重复传入多个 (words=词1&words=词2)；只传一个时按逗号分隔
+        hours: 查询的小时数 (默认24)
+        resolution: raw/hourly/daily (默认 auto，按时间窗口自动选择)
+    
+    返回:
+        {
+            "success": true,
+            "resolution": "raw",
+            "trends": {
+                "词1": [{"time": "...", "position": 1, "hot_value": 1234567}, ...],
+                "词2": []
+            }
+        }
+    """
+    try:
+        hours = request.args.get('hours', 24, type=int)
+        values = request.args.getlist('words')
+        # 热搜词本身可能含逗号：多个 words 参数时逐个原样使用，只有单个参数时按逗号拆分
+        if len(values) == 1:
+            values = values[0].split(',')
+        words = []
+        for word in values:
+            word = word.strip()
+            if word and word not in words:
+                words.append(word)
+        
+        if not words:
+            return jsonify({'success': False, 'error': '缺少 words 参数'}), 400
+        
+        resolution = pick_trend_resolution(hours, request.args.get('resolution', 'auto'))
+        trends = get_word_trends(words, hours, resolution)
+        return jsonify({
+            'success': True,
+            'hours': hours,
+            'resolution': resolution,
+            'trends': trends,
+            'count': len(trends)
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/search')
+@snapshot_etag
+def api_search_words():
+    """
+    搜索历史上出现过的热搜词（用于自动补全）
+    
+    参数:
+        q: 关键字（3 个字符以上按子串匹配，更短时按前缀匹配）
+        limit: 返回数量 (默认10，最大50)
+    
+    返回:
+        {
+            "success": true,
+            "data": [
+                {"word": "...", "last_seen_at": "...", "peak_hot_value": 1234567, ...},
+                ...
+            ]
+        }
+    """
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({'success': False, 'error': '缺少 q 参数'}), 400
+        
+        limit = max(1, min(50, request.args.get('limit', 10, type=int)))
+        results = search_words(query, limit)
+        return jsonify({
+            'success': True,
+            'query': query,
+            'data': results,
+            'count': len(results)
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @app.route('/api/rising')
 def api_rising_topics():
     """
@@ -136,12 +352,16 @@ def api_rising_topics():
     """
     try:
         limit = request.args.get('limit', 10, type=int)
-        rising = get_rising_topics(limit)
-        return jsonify({
-            'success': True,
-            'data': rising,
-            'count': len(rising)
-        })
+        body = get_snapshot_cache().get_rising_body(limit)
+        if body is None:
+            # 超过缓存条数，按次查询并渲染
+            rising = get_snapshot_cache().get_rising(limit)
+            body = RenderedBody({
+                'success': True,
+                'data': rising,
+                'count': len(rising)
+            })
+        return send_rendered(body)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -150,6 +370,7 @@ def api_rising_topics():
 
 
 @app.route('/api/snapshots')
+@snapshot_etag
 def api_snapshots():
     """
     获取快照历史
@@ -172,6 +393,225 @@ def api_snapshots():
         }), 500
 
 
+@app.route('/api/analytics')
+@snapshot_etag
+def api_analytics():
+    """
+    话题分析：在榜时长、最高排名、热度速度/加速度、指数加权热度
+    
+    参数:
+        hours: 时间范围 (默认168，最大744)
+        sort: 排序指标 ewma_heat / velocity / acceleration / minutes_on_board /
+              peak_hot_value / peak_position / current_position (默认 ewma_heat)
+        limit: 返回数量 (默认50，最大500)
+        half_life: ewma_heat 的半衰期（小时，默认6）
+        resolution: raw/hourly/daily (默认 auto，按时间窗口自动选择)
+    
+    返回:
+        {
+            "success": true,
+            "resolution": "hourly",
+            "points": 168,
+            "topics": 350,
+            "data": [
+                {"word": "...", "minutes_on_board": 620.0, "peak_position": 1,
+                 "velocity": 15320.5, "acceleration": -820.1, "ewma_heat": 8123456.7, ...},
+                ...
+            ]
+        }
+    """
+    try:
+        hours = max(1, min(ANALYTICS_MAX_HOURS, request.args.get('hours', 168, type=int)))
+        sort = request.args.get('sort', 'ewma_heat')
+        if sort not in ANALYTICS_SORT_FIELDS:
+            return jsonify({
+                'success': False,
+                'error': f"sort 只能是 {', '.join(ANALYTICS_SORT_FIELDS)}"
+            }), 400
+        limit = max(1, min(500, request.args.get('limit', 50, type=int)))
+        half_life = request.args.get('half_life', type=float)
+        
+        kwargs = {'half_life_hours': half_life} if half_life and half_life > 0 else {}
+        analysis = analyze_topics(hours, sort, limit,
+                                  resolution=request.args.get('resolution', 'auto'), **kwargs)
+        return jsonify({
+            'success': True,
+            'hours': hours,
+            'sort': sort,
+            'resolution': analysis['resolution'],
+            'half_life_hours': analysis['half_life_hours'],
+            'points': analysis['points'],
+            'topics': analysis['topics'],
+            'data': analysis['results'],
+            'count': len(analysis['results'])
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/bursts')
+@snapshot_etag
+def api_bursts():
+    """
+    获取最近检测到的热度突发（入库时增量检测，不回扫历史）
+    
+    参数:
+        hours: 时间范围 (默认24，最大168)
+        limit: 返回数量 (默认50，最大200)
+    
+    返回:
+        {
+            "success": true,
+            "data": [
+                {"word": "...", "detected_at": "...", "hot_value": 9876543,
+                 "hot_change": 1200000, "rate": 120000.0, "zscore": 4.8, ...},
+                ...
+            ]
+        }
+    """
+    try:
+        hours = max(1, min(168, request.args.get('hours', 24, type=int)))
+        limit = max(1, min(200, request.args.get('limit', 50, type=int)))
+        bursts = get_recent_bursts(hours, limit)
+        return jsonify({
+            'success': True,
+            'hours': hours,
+            'data': bursts,
+            'count': len(bursts)
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/topics')
+@snapshot_etag
+def api_topics():
+    """
+    按生命周期指标排序列出话题
+    
+    参数:
+        sort: last_seen / first_seen / peak_position / peak_hot_value /
+              minutes_on_board / appearances (默认 last_seen)
+        order: desc / asc (默认 desc)
+        limit: 返回数量 (默认50，最大500)
+        offset: 跳过的数量 (默认0)
+    """
+    try:
+        sort = request.args.get('sort', 'last_seen')
+        if sort not in LIFECYCLE_SORT_COLUMNS:
+            return jsonify({
+                'success': False,
+                'error': f"sort 只能是 {', '.join(LIFECYCLE_SORT_COLUMNS)}"
+            }), 400
+        order = request.args.get('order', 'desc').lower()
+        if order not in ('asc', 'desc'):
+            return jsonify({'success': False, 'error': 'order 只能是 asc 或 desc'}), 400
+        limit = max(1, min(500, request.args.get('limit', 50, type=int)))
+        offset = max(0, request.args.get('offset', 0, type=int))
+        
+        topics = list_topics(sort, order == 'desc', limit, offset)
+        return jsonify({
+            'success': True,
+            'sort': sort,
+            'order': order,
+            'offset': offset,
+            'data': topics,
+            'count': len(topics)
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/topics/<path:topic>/lifecycle')
+@snapshot_etag
+def api_topic_lifecycle(topic):
+    """
+    获取单个话题的生命周期
+    
+    参数:
+        topic: 话题ID（topic_key）或标题
+    
+    返回:
+        {
+            "success": true,
+            "data": {"word": "...", "topic_key": 2366771, "first_seen": "...", "last_seen": "...",
+                     "peak_position": 1, "peak_hot_value": 12000000,
+                     "minutes_on_board": 540.0, "appearances": 54}
+        }
+    """
+    try:
+        lifecycle = get_topic_lifecycle(topic)
+        if lifecycle is None:
+            return jsonify({'success': False, 'error': f'未找到话题: {topic}'}), 404
+        return jsonify({
+            'success': True,
+            'data': lifecycle
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/stream')
+def api_stream():
+    """
+    新快照推送（Server-Sent Events）
+    
+    每次抓取任务提交新快照后推送一个 snapshot 事件：
+        id: 12
+        event: snapshot
+        data: {"snapshot_id": 345, "count": 50, "method": "api", "time": "..."}
+    
+    空闲时每隔 SSE_HEARTBEAT_SECONDS 秒发送一行心跳注释。
+    重连时浏览器自动带上 Last-Event-ID，若期间有新快照会立即补发最新事件。
+    连接数达到上限时返回 503，前端回退到定时轮询。
+    HEAD 请求不建立推送连接，直接返回 405。
+    """
+    if request.method == 'HEAD':
+        return jsonify({'success': False, 'error': '推送接口不支持 HEAD'}), 405, {'Allow': 'GET'}
+    
+    events = get_snapshot_events()
+    if not events.connect():
+        return jsonify({'success': False, 'error': '推送连接数已达上限'}), 503
+    
+    last_id = request.headers.get('Last-Event-ID', type=int)
+    if last_id is None or last_id > events.last_id:
+        # 新连接（或服务重启后的旧序号）只接收之后的事件
+        last_id = events.last_id
+    
+    def generate():
+        nonlocal last_id
+        yield f'retry: {SSE_RETRY_MS}\n\n'
+        while True:
+            event = events.wait(last_id, SSE_HEARTBEAT_SECONDS)
+            if event is None:
+                yield ': keep-alive\n\n'
+                continue
+            last_id = event['id']
+            data = json.dumps(event['data'], ensure_ascii=False)
+            yield f"id: {event['id']}\nevent: snapshot\ndata: {data}\n\n"
+    
+    response = Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        # 关闭反向代理缓冲，事件立即送达
+        'X-Accel-Buffering': 'no',
+    })
+    # 响应关闭时释放连接名额（响应体未被迭代、客户端提前断开时同样会调用）
+    response.call_on_close(events.disconnect)
+    return response
+
+
 @app.route('/api/refresh', methods=['POST'])
 def api_refresh():
     """
@@ -193,23 +633,31 @@ def api_refresh():
 @app.route('/api/status')
 def api_status():
     """
-    获取系统状态（包含抓取器统计）
+    获取系统状态（包含抓取器统计和缓存命中统计）
+    
+    所有字段均来自内存中的计数器和缓存，不访问数据库。
     """
     try:
-        history = get_snapshot_history(1)
-        last_update = history[0]['captured_at'] if history else None
+        storage = get_status_counters().get_status()
         
-        # 获取抓取器统计
-        unified_scraper = get_unified_scraper()
-        scraper_stats = unified_scraper.get_stats()
+        # 获取抓取器统计（抓取在独立进程中运行时取其最近一次通知的统计）
+        worker_status = get_worker_status()
+        if worker_status and worker_status.get('scraper_stats'):
+            scraper_stats = worker_status['scraper_stats']
+        else:
+            scraper_stats = get_unified_scraper().get_stats()
         
         settings = load_settings()
         return jsonify({
             'success': True,
             'status': 'running',
-            'last_update': last_update,
-            'total_snapshots': len(get_snapshot_history(1000)),
+            'last_update': storage['newest_capture'],
+            'total_snapshots': storage['snapshot_count'],
+            'storage': storage,
             'scraper_stats': scraper_stats,
+            'cache_stats': get_snapshot_cache().get_stats(),
+            'stream_stats': get_snapshot_events().get_stats(),
+            'scheduler': get_leader_election().get_stats(),
             'settings': settings
         })
     except Exception as e:
@@ -241,14 +689,14 @@ def api_update_settings():
             return jsonify({'success': False, 'error': '无效的设置数据'}), 400
         
         if save_settings(new_settings):
-            # 更新调度器间隔
-            interval = new_settings.get('scrape_interval_minutes', 10)
-            update_scheduler_interval(interval)
+            # 更新调度器间隔（未提交该字段时保持原值）
+            settings = load_settings()
+            update_scheduler_interval(settings['scrape_interval_minutes'])
             
             return jsonify({
                 'success': True,
                 'message': '设置已更新',
-                'settings': load_settings()
+                'settings': settings
             })
         return jsonify({'success': False, 'error': '保存失败'}), 500
     except Exception as e:
@@ -268,16 +716,73 @@ def api_get_records():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+def _project_record(record: dict, fields: list) -> dict:
+    """只保留条目中指定的字段（记录本身的元数据保持不变）"""
+    if not fields:
+        return record
+    record['data'] = [
+        {key: item[key] for key in fields if key in item}
+        for item in record.get('data', [])
+    ]
+    return record
+
+
 @app.route('/api/records/<date>')
 def api_get_records_for_date(date):
-    """获取某天的所有快照"""
+    """
+    分页获取某天的快照
+    
+    参数:
+        after: 分页游标（上一页返回的 next_cursor，即最后一条记录的文件名）
+        limit: 每页条数 (默认100，最大1000；jsonl 模式下默认不限制)
+        fields: 逗号分隔的条目字段，如 word,position（默认返回全部字段）
+        format: json (默认) / jsonl（逐行流式输出，每行一条记录）
+    
+    返回 (json):
+        {
+            "success": true,
+            "date": "2026-01-17",
+            "records": [...],
+            "count": 100,
+            "next_cursor": "01-39.json"   // 没有更多数据时为 null
+        }
+    """
+    try:
+        datetime.strptime(date, '%Y-%m-%d')
+    except ValueError:
+        return jsonify({'success': False, 'error': '日期格式应为 YYYY-MM-DD'}), 400
+    
     try:
-        records = get_records_for_date(date)
+        after = request.args.get('after') or None
+        fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()]
+        output = request.args.get('format', 'json')
+        
+        if output == 'jsonl':
+            limit = request.args.get('limit', 0, type=int)
+            records = iter_records_for_date(date, after)
+            if limit > 0:
+                records = islice(records, limit)
+            
+            def generate():
+                for record in records:
+                    yield json.dumps(_project_record(record, fields), ensure_ascii=False) + '\n'
+            
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+        
+        limit = max(1, min(1000, request.args.get('limit', 100, type=int)))
+        # 多取一条判断是否还有下一页
+        page = [
+            _project_record(record, fields)
+            for record in islice(iter_records_for_date(date, after), limit + 1)
+        ]
+        has_more = len(page) > limit
+        page = page[:limit]
         return jsonify({
             'success': True,
             'date': date,
-            'records': records,
-            'count': len(records)
+            'records': page,
+            'count': len(page),
+            'next_cursor': page[-1].get('filename') if has_more else None
         })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -302,10 +807,13 @@ def api_word_history(word):
 def create_app():
     """创建并配置应用"""
     init_database()
+    # 本进程提供 HTTP 服务：新快照入库时即渲染并压缩 /api/hot、/api/rising 的响应体
+    get_snapshot_cache().prerender = True
     return app
 
 
 if __name__ == '__main__':
-    init_database()
+    create_app()
     start_scheduler()
+    watch_worker()
     app.run(host=FLASK_HOST, port=FLASK_PORT, debug=FLASK_DEBUG)
@@ -16,6 +16,26 @@ DATA_DIR = os.path.join(BASE_DIR, 'data')
 # 数据库配置
 DATABASE_PATH = os.path.join(DATA_DIR, 'douyin.db')
 
+# SQLite 连接参数（WAL 模式下读写互不阻塞）
+DB_MMAP_SIZE = 64 * 1024 * 1024   # 内存映射大小（字节），0 表示关闭
+DB_BUSY_TIMEOUT_MS = 5000         # 写锁等待超时（毫秒）
+
+# 趋势查询分辨率：窗口不超过该小时数时返回原始快照，否则使用小时/天汇总
+TREND_RAW_MAX_HOURS = 24
+TREND_HOURLY_MAX_HOURS = 24 * 31
+
+# 热榜增量（/api/hot/delta）：客户端落后超过该快照数时直接返回完整热榜
+HOT_DELTA_MAX_SNAPSHOTS = 12
+
+# 话题分析（/api/analytics）：热度指数加权的半衰期、速度/加速度的计算窗口（小时）
+ANALYTICS_HALF_LIFE_HOURS = 6
+ANALYTICS_VELOCITY_WINDOW_HOURS = 1
+ANALYTICS_MAX_HOURS = 24 * 31
+
+# 突发检测：热度增速的 z 分数超过阈值即判定为突发；样本数不足时不判定
+BURST_Z_THRESHOLD = 4.0
+BURST_MIN_SAMPLES = 10
+
 # ============================================================
 # 抖音 API 配置
 # ============================================================
@@ -74,12 +94,44 @@ HEADERS = {
 # 抓取间隔（分钟）- 建议不低于 10 分钟
 SCRAPE_INTERVAL_MINUTES = 10
 
+# 多个进程都启动调度器时，通过数据库中的租约选出唯一执行抓取的进程
+LEADER_LEASE_SECONDS = 6     # 租约有效期，持有者停止续约后最多这么久其他进程即可接管
+LEADER_RENEW_SECONDS = 2     # 续约/尝试获取租约的间隔，需明显小于有效期
+
 # 是否启用演示数据回退（当 API 和 HTML 都失败时使用本地样本数据）
 ENABLE_DEMO_FALLBACK = True
 
+# ============================================================
+# 数据保留配置
+# ============================================================
+
+# 过期数据清理任务的执行间隔（分钟）
+RETENTION_INTERVAL_MINUTES = 30
+
+# 每个短事务删除的快照数量
+RETENTION_BATCH_SNAPSHOTS = 200
+
+# 每次增量回收的空闲页数量
+RETENTION_VACUUM_PAGES = 2000
+
 # ============================================================
 # Flask 配置
 # ============================================================
 FLASK_HOST = '0.0.0.0'
 FLASK_PORT = 5001
-FLASK_DEBUG = True
+FLASK_DEBUG = False
+
+# 生产模式 WSGI 服务（waitress，python run.py 默认使用；--dev 使用 Flask 开发服务器）
+SERVER_THREADS = 128             # 请求线程数（每个 /api/stream 连接会一直占用一个线程）
+SERVER_RESERVED_THREADS = 16     # 至少留给普通请求的线程数，推送连接上限会被限制在 线程数 - 该值
+SERVER_CONNECTION_LIMIT = 1000   # 同时打开的连接上限，超出后不再 accept
+SERVER_BACKLOG = 1024            # 监听队列长度（尚未 accept 的连接）
+SERVER_KEEPALIVE_SECONDS = 120   # keep-alive 连接空闲多久后关闭（需大于 SSE 心跳间隔）
+
+# 独立抓取进程（python run.py worker）与 Web 进程之间的文件通知，轮询间隔（秒）
+SIGNAL_POLL_SECONDS = 0.5
+
+# 新快照推送（/api/stream，Server-Sent Events）
+SSE_HEARTBEAT_SECONDS = 15   # 空闲时发送心跳注释的间隔，用于发现已断开的连接
+SSE_RETRY_MS = 3000          # 浏览器断线重连的等待时间
+SSE_MAX_CLIENTS = 100        # 同时保持的推送连接上限（每个连接占用一个请求线程）
@@ -0,0 +1,346 @@
+# -*- coding: utf-8 -*-
+"""
+热搜分析模块
+
+把一段时间内的数据一次性读成 话题 × 时间点 的稠密矩阵（排名、热度值），
+再用 NumPy 对所有话题同时计算。时间点的分辨率与趋势查询相同：
+24 小时以内逐个快照，更长的窗口使用小时/天汇总表。
+
+    minutes_on_board  在榜时长（分钟，间隔按 MAX_SNAPSHOT_GAP_MINUTES 封顶，与汇总表一致）
+    peak_position     最高排名
+    peak_hot_value    峰值热度
+    velocity          最近窗口内热度的最小二乘斜率（热度/小时）
+    acceleration      最近两个窗口斜率之差（热度/小时²）
+    ewma_heat         以窗口末尾为基准、按半衰期指数加权的平均热度（不在榜记为 0）
+
+矩阵中缺失的格子为 NaN，整个计算没有按话题的 Python 循环。
+"""
+
+from datetime import datetime, timedelta
+from itertools import chain
+from typing import Dict, List, Optional
+
+import numpy as np
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import ANALYTICS_HALF_LIFE_HOURS, ANALYTICS_VELOCITY_WINDOW_HOURS
+from models.database import (
+    get_db_connection, pick_trend_resolution, _time_ago, _chunks,
+    MAX_SNAPSHOT_GAP_MINUTES, ROLLUP_TABLES
+)
+
+
+# 可排序的指标 -> 是否降序
+ANALYTICS_SORT_FIELDS = {
+    'ewma_heat': True,
+    'velocity': True,
+    'acceleration': True,
+    'minutes_on_board': True,
+    'peak_hot_value': True,
+    'peak_position': False,
+    'current_position': False,
+}
+
+
+# 汇总表每个时间桶的小时数
+ROLLUP_BUCKET_HOURS = {'hourly': 1, 'daily': 24}
+
+
+class HistoryMatrix:
+    """一段时间内的 话题 × 时间点 矩阵（时间点为快照或汇总时间桶）"""
+
+    def __init__(self, resolution: str, word_ids: np.ndarray, times: np.ndarray,
+                 samples: np.ndarray, minutes: np.ndarray, position: np.ndarray, hot: np.ndarray):
+        self.resolution = resolution  # raw/hourly/daily
+        self.word_ids = word_ids      # (话题数,) int64
+        self.times = times            # (时间点数,) datetime64[us]，升序
+        self.samples = samples        # (话题数, 时间点数) int32，出现次数
+        self.minutes = minutes        # (话题数, 时间点数) float32，在榜分钟数
+        self.position = position      # (话题数, 时间点数) float32，最好排名，缺失为 NaN
+        self.hot = hot                # (话题数, 时间点数) float64，最高热度，缺失为 NaN
+
+    @property
+    def hours(self) -> np.ndarray:
+        """各时间点相对第一个时间点的小时数"""
+        if len(self.times) == 0:
+            return np.zeros(0)
+        return (self.times - self.times[0]) / np.timedelta64(1, 'h')
+
+
+def load_history_matrix(hours: float, resolution: str = 'auto') -> HistoryMatrix:
+    """
+    读取最近 N 小时的数据，构建稠密矩阵
+
+    分辨率的选择与趋势查询相同：短窗口逐个快照，长窗口读取小时/天汇总表，
+    矩阵列数与抓取频率无关。
+    """
+    resolution = pick_trend_resolution(hours, resolution)
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        # 大量行直接按元组读取，避免为每行构造 sqlite3.Row
+        cursor.row_factory = None
+        if resolution in ROLLUP_TABLES:
+            return _load_rollups(cursor, hours, resolution)
+        return _load_snapshots(cursor, hours)
+
+
+def _load_snapshots(cursor, hours: float) -> HistoryMatrix:
+    """逐个快照构建矩阵"""
+    since = _time_ago(hours)
+
+    cursor.execute('''
+        SELECT id, captured_at FROM hot_snapshots
+        WHERE captured_at >= ?
+        ORDER BY captured_at
+    ''', (since,))
+    snapshots = cursor.fetchall()
+
+    cursor.execute('''
+        SELECT MAX(captured_at) FROM hot_snapshots WHERE captured_at < ?
+    ''', (since,))
+    prev = cursor.fetchone()[0]
+
+    cursor.execute('''
+        SELECT i.snapshot_id, i.word_id, i.position, COALESCE(i.hot_value, 0)
+        FROM hot_snapshots s
+        JOIN hot_items i ON i.snapshot_id = s.id
+        WHERE s.captured_at >= ?
+    ''', (since,))
+    rows = np.fromiter(chain.from_iterable(cursor), dtype=np.int64).reshape(-1, 4)
+
+    snapshot_ids = np.array([row[0] for row in snapshots], dtype=np.int64)
+    times = np.array([row[1] for row in snapshots], dtype='datetime64[us]')
+
+    # 间隔计算与 _snapshot_gaps 相同：第一个快照与窗口之前的快照比较
+    edges = times
+    if prev is not None:
+        edges = np.concatenate([np.array([prev], dtype='datetime64[us]'), times])
+    gaps = np.clip(np.diff(edges) / np.timedelta64(1, 'm'), 0.0, MAX_SNAPSHOT_GAP_MINUTES)
+    if prev is None and len(times):
+        gaps = np.concatenate([[0.0], gaps])
+
+    word_ids, row_index = np.unique(rows[:, 1], return_inverse=True)
+    order = np.argsort(snapshot_ids)
+    col_index = order[np.searchsorted(snapshot_ids, rows[:, 0], sorter=order)]
+
+    shape = (len(word_ids), len(times))
+    samples = np.zeros(shape, dtype=np.int32)
+    samples[row_index, col_index] = 1
+    minutes = (samples * gaps).astype(np.float32)
+
+    # 同一快照中重复出现时取最好的排名和最高的热度；排名 0（置顶/无排名）视为缺失
+    position = np.full(shape, np.nan, dtype=np.float32)
+    ranked = rows[:, 2] > 0
+    np.fmin.at(position, (row_index[ranked], col_index[ranked]),
+               rows[ranked, 2].astype(np.float32))
+    hot = np.full(shape, np.nan)
+    np.fmax.at(hot, (row_index, col_index), rows[:, 3].astype(np.float64))
+
+    return HistoryMatrix('raw', word_ids, times, samples, minutes, position, hot)
+
+
+def _load_rollups(cursor, hours: float, resolution: str) -> HistoryMatrix:
+    """从小时/天汇总表构建矩阵，每个时间桶一列"""
+    table, bucket_format = ROLLUP_TABLES[resolution]
+    start_bucket = (datetime.now() - timedelta(hours=hours)).strftime(bucket_format)
+
+    cursor.execute(f'''
+        SELECT bucket, word_id, samples, min_position, max_hot_value, minutes_on_board
+        FROM {table}
+        WHERE bucket >= ?
+    ''', (start_bucket,))
+    rows = cursor.fetchall()
+
+    buckets, col_index = np.unique(np.array([row[0] for row in rows], dtype='datetime64[us]'),
+                                   return_inverse=True)
+    values = np.array([row[1:] for row in rows], dtype=np.float64).reshape(-1, 5)
+    word_ids, row_index = np.unique(values[:, 0].astype(np.int64), return_inverse=True)
+
+    shape = (len(word_ids), len(buckets))
+    samples = np.zeros(shape, dtype=np.int32)
+    samples[row_index, col_index] = values[:, 1]
+    minutes = np.zeros(shape, dtype=np.float32)
+    minutes[row_index, col_index] = values[:, 4]
+    position = np.full(shape, np.nan, dtype=np.float32)
+    position[row_index, col_index] = np.where(values[:, 2] > 0, values[:, 2], np.nan)
+    hot = np.full(shape, np.nan)
+    hot[row_index, col_index] = values[:, 3]
+
+    return HistoryMatrix(resolution, word_ids, buckets, samples, minutes, position, hot)
+
+
+def _window_slope(t: np.ndarray, hot: np.ndarray, columns: np.ndarray) -> np.ndarray:
+    """每个话题在指定列上的热度最小二乘斜率，样本不足 2 个为 NaN"""
+    if not columns.any():
+        return np.full(hot.shape[0], np.nan)
+
+    h = hot[:, columns]
+    mask = np.isfinite(h)
+    # 时间先居中，减小平方和的数值误差
+    x = np.where(mask, t[columns] - t[columns].mean(), 0.0)
+    y = np.where(mask, h, 0.0)
+
+    n = mask.sum(axis=1)
+    sx = x.sum(axis=1)
+    sy = y.sum(axis=1)
+    sxx = (x * x).sum(axis=1)
+    sxy = (x * y).sum(axis=1)
+
+    denom = n * sxx - sx * sx
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = (n * sxy - sx * sy) / denom
+    slope[(n < 2) | (denom <= 0)] = np.nan
+    return slope
+
+
+def compute_topic_metrics(matrix: HistoryMatrix,
+                          half_life_hours: float = ANALYTICS_HALF_LIFE_HOURS,
+                          window_hours: float = ANALYTICS_VELOCITY_WINDOW_HOURS) -> Dict[str, np.ndarray]:
+    """
+    对矩阵中的所有话题同时计算各项指标
+
+    汇总分辨率下速度窗口至少包含 3 个时间桶，保证斜率有足够的样本。
+
+    Returns:
+        {指标名: (话题数,) 数组}，无法计算的值为 NaN
+    """
+    n_topics, n_snapshots = matrix.samples.shape
+    if n_snapshots == 0:
+        # 时间窗口内没有快照（空库或窗口内无数据）
+        missing = np.full(n_topics, np.nan)
+        zeros = np.zeros(n_topics)
+        index = np.zeros(n_topics, dtype=np.int64)
+        return {
+            'samples': zeros, 'minutes_on_board': zeros, 'peak_position': missing,
+            'peak_hot_value': zeros, 'current_position': missing, 'velocity': missing,
+            'acceleration': missing, 'ewma_heat': zeros, 'first_seen': index, 'last_seen': index,
+        }
+
+    present = matrix.samples > 0
+    hot = matrix.hot
+    t = matrix.hours
+    end = t[-1]
+
+    peak_position = np.where(np.isnan(matrix.position), np.inf, matrix.position).min(
+        axis=1, initial=np.inf)
+    peak_position[np.isinf(peak_position)] = np.nan
+    hot_filled = np.nan_to_num(hot, nan=0.0)
+
+    # 第一次/最后一次出现的列
+    first = present.argmax(axis=1)
+    last = n_snapshots - 1 - present[:, ::-1].argmax(axis=1)
+
+    # 指数加权：w_j = 0.5 ** ((T - t_j) / half_life)
+    weights = np.power(0.5, (end - t) / max(half_life_hours, 1e-6))
+    ewma_heat = hot_filled @ weights / weights.sum()
+
+    # 最近窗口与前一个窗口的斜率
+    window_hours = max(window_hours, 3 * ROLLUP_BUCKET_HOURS.get(matrix.resolution, 0))
+    recent = t >= end - window_hours
+    earlier = (t >= end - 2 * window_hours) & ~recent
+    velocity = _window_slope(t, hot, recent)
+    acceleration = (velocity - _window_slope(t, hot, earlier)) / window_hours
+
+    current_position = matrix.position[:, -1]
+
+    return {
+        'samples': matrix.samples.sum(axis=1),
+        'minutes_on_board': matrix.minutes.sum(axis=1, dtype=np.float64),
+        'peak_position': peak_position,
+        'peak_hot_value': hot_filled.max(axis=1),
+        'current_position': current_position,
+        'velocity': velocity,
+        'acceleration': acceleration,
+        'ewma_heat': ewma_heat,
+        'first_seen': first,
+        'last_seen': last,
+    }
+
+
+def _word_info(word_ids: List[int]) -> Dict[int, Dict]:
+    """批量读取话题标题、topic_key、链接"""
+    info = {}
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        for chunk in _chunks(word_ids):
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(f'''
+                SELECT id, word, topic_key, url FROM words WHERE id IN ({placeholders})
+            ''', chunk)
+            for row in cursor.fetchall():
+                info[row['id']] = dict(row)
+    return info
+
+
+def _json_number(value, digits: int = 2) -> Optional[float]:
+    """NaN 转为 None，其余保留指定位小数"""
+    value = float(value)
+    if value != value:
+        return None
+    return round(value, digits)
+
+
+def analyze_topics(hours: float = 24 * 7, sort: str = 'ewma_heat', limit: int = 50,
+                   half_life_hours: float = ANALYTICS_HALF_LIFE_HOURS,
+                   resolution: str = 'auto') -> Dict:
+    """
+    分析最近 N 小时内出现过的全部话题，按指定指标排序返回前 limit 个
+
+    Args:
+        hours: 时间窗口
+        sort: 排序指标（见 ANALYTICS_SORT_FIELDS），无法计算的值排在最后
+        limit: 返回条数
+        half_life_hours: ewma_heat 的半衰期
+        resolution: raw/hourly/daily，auto 按时间窗口自动选择
+    """
+    if sort not in ANALYTICS_SORT_FIELDS:
+        raise ValueError(f"不支持的排序指标: {sort}")
+
+    matrix = load_history_matrix(hours, resolution)
+    metrics = compute_topic_metrics(matrix, half_life_hours)
+
+    key = metrics[sort].astype(np.float64)
+    if ANALYTICS_SORT_FIELDS[sort]:
+        key = -key
+    # NaN 在 argsort 中排在最后
+    top = np.argsort(key, kind='stable')[:limit]
+
+    info = _word_info([int(matrix.word_ids[i]) for i in top])
+
+    def time_of(column) -> str:
+        return str(np.datetime_as_string(matrix.times[column], unit='s')).replace('T', ' ')
+
+    results = []
+    for i in top:
+        word_id = int(matrix.word_ids[i])
+        word = info.get(word_id, {})
+        peak_position = metrics['peak_position'][i]
+        current_position = metrics['current_position'][i]
+        results.append({
+            'word': word.get('word'),
+            'topic_key': word.get('topic_key'),
+            'url': word.get('url'),
+            'samples': int(metrics['samples'][i]),
+            'first_seen': time_of(metrics['first_seen'][i]),
+            'last_seen': time_of(metrics['last_seen'][i]),
+            'minutes_on_board': _json_number(metrics['minutes_on_board'][i], 1),
+            'peak_position': None if np.isnan(peak_position) else int(peak_position),
+            'peak_hot_value': int(metrics['peak_hot_value'][i]),
+            'current_position': None if np.isnan(current_position) else int(current_position),
+            'velocity': _json_number(metrics['velocity'][i]),
+            'acceleration': _json_number(metrics['acceleration'][i]),
+            'ewma_heat': _json_number(metrics['ewma_heat'][i]),
+        })
+
+    return {
+        'hours': hours,
+        'resolution': matrix.resolution,
+        'points': len(matrix.times),
+        'topics': len(matrix.word_ids),
+        'sort': sort,
+        'half_life_hours': half_life_hours,
+        'results': results,
+    }
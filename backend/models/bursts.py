@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+热度突发检测模块
+
+每次入库后对新快照做一次增量检测：
+对每个话题维护热度增速（热度/分钟）的在线均值和方差（Welford 算法），
+burst_stats 中每个话题只有一行，不随历史增长。
+新的增速相对该话题自身历史的 z 分数超过 BURST_Z_THRESHOLD 时记为突发，
+写入 hot_bursts，/api/bursts 直接读取，无需回扫历史。
+"""
+
+import math
+from typing import Dict, List, Optional
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import BURST_Z_THRESHOLD, BURST_MIN_SAMPLES
+from models.database import (
+    get_db_connection, _parse_time, _time_ago, MAX_SNAPSHOT_GAP_MINUTES
+)
+
+
+def _update_stats(samples: int, mean: float, m2: float, value: float) -> tuple:
+    """Welford 在线更新：加入一个样本后的 (样本数, 均值, 平方差和)"""
+    samples += 1
+    delta = value - mean
+    mean += delta / samples
+    m2 += delta * (value - mean)
+    return samples, mean, m2
+
+
+def _zscore(samples: int, mean: float, m2: float, value: float) -> Optional[float]:
+    """value 相对已有样本的 z 分数，样本不足或方差为 0 时返回 None"""
+    if samples < BURST_MIN_SAMPLES:
+        return None
+    variance = m2 / (samples - 1)
+    if variance <= 0:
+        return None
+    return (value - mean) / math.sqrt(variance)
+
+
+def detect_bursts(snapshot_id: int) -> List[Dict]:
+    """
+    对一个新快照做突发检测并更新各话题的统计状态
+
+    同一快照重复调用时不会重复计入（按 last_snapshot_id 跳过）。
+
+    Returns:
+        本次检测到的突发 [{word_id, position, hot_value, hot_change, rate, zscore}, ...]
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute('SELECT captured_at FROM hot_snapshots WHERE id = ?', (snapshot_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return []
+        detected_at = row['captured_at']
+        captured_at = _parse_time(detected_at)
+
+        # 同一快照中重复出现时取最好的排名和最高的热度
+        cursor.execute('''
+            SELECT word_id, MIN(position) AS position, MAX(hot_value) AS hot_value
+            FROM hot_items
+            WHERE snapshot_id = ?
+            GROUP BY word_id
+        ''', (snapshot_id,))
+        items = cursor.fetchall()
+        if not items:
+            return []
+
+        placeholders = ','.join('?' * len(items))
+        cursor.execute(f'''
+            SELECT word_id, samples, mean, m2, last_hot_value, last_seen_at, last_snapshot_id
+            FROM burst_stats
+            WHERE word_id IN ({placeholders})
+        ''', [item['word_id'] for item in items])
+        states = {row['word_id']: row for row in cursor.fetchall()}
+
+        updates = []
+        bursts = []
+        for item in items:
+            word_id = item['word_id']
+            hot_value = item['hot_value'] or 0
+            state = states.get(word_id)
+
+            if state is None:
+                updates.append((word_id, 0, 0.0, 0.0, hot_value, detected_at, snapshot_id))
+                continue
+            if state['last_snapshot_id'] is not None and state['last_snapshot_id'] >= snapshot_id:
+                continue
+
+            samples, mean, m2 = state['samples'], state['mean'], state['m2']
+            minutes = (captured_at - _parse_time(state['last_seen_at'])).total_seconds() / 60
+
+            # 下榜后重新上榜（间隔过长）只更新基准值，不计入增速样本
+            if 0 < minutes <= MAX_SNAPSHOT_GAP_MINUTES and state['last_hot_value'] is not None:
+                hot_change = hot_value - state['last_hot_value']
+                rate = hot_change / minutes
+                zscore = _zscore(samples, mean, m2, rate)
+                if zscore is not None and zscore >= BURST_Z_THRESHOLD and hot_change > 0:
+                    bursts.append({
+                        'word_id': word_id,
+                        'position': item['position'],
+                        'hot_value': hot_value,
+                        'hot_change': hot_change,
+                        'rate': rate,
+                        'zscore': zscore,
+                    })
+                samples, mean, m2 = _update_stats(samples, mean, m2, rate)
+
+            updates.append((word_id, samples, mean, m2, hot_value, detected_at, snapshot_id))
+
+        cursor.executemany('''
+            INSERT INTO burst_stats (word_id, samples, mean, m2,
+                                     last_hot_value, last_seen_at, last_snapshot_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (word_id) DO UPDATE SET
+                samples = excluded.samples,
+                mean = excluded.mean,
+                m2 = excluded.m2,
+                last_hot_value = excluded.last_hot_value,
+                last_seen_at = excluded.last_seen_at,
+                last_snapshot_id = excluded.last_snapshot_id
+        ''', updates)
+        cursor.executemany('''
+            INSERT OR IGNORE INTO hot_bursts (snapshot_id, word_id, detected_at, position,
+                                              hot_value, hot_change, rate, zscore)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (snapshot_id, b['word_id'], detected_at, b['position'],
+             b['hot_value'], b['hot_change'], b['rate'], b['zscore'])
+            for b in bursts
+        ])
+        conn.commit()
+
+    if bursts:
+        print(f"[突发检测] 快照 #{snapshot_id} 发现 {len(bursts)} 个突发话题")
+    return bursts
+
+
+def get_recent_bursts(hours: float = 24, limit: int = 50) -> List[Dict]:
+    """
+    获取最近 N 小时内检测到的突发，按检测时间倒序
+
+    Returns:
+        [{word, topic_key, url, detected_at, position, hot_value, hot_change, rate, zscore}, ...]
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT w.word, w.topic_key, w.url, b.detected_at, b.position,
+                   b.hot_value, b.hot_change, b.rate, b.zscore
+            FROM hot_bursts b
+            JOIN words w ON w.id = b.word_id
+            WHERE b.detected_at >= ?
+            ORDER BY b.detected_at DESC, b.zscore DESC
+            LIMIT ?
+        ''', (_time_ago(hours), limit))
+
+        return [
+            {
+                'word': row['word'],
+                'topic_key': row['topic_key'],
+                'url': row['url'],
+                'detected_at': row['detected_at'],
+                'position': row['position'],
+                'hot_value': row['hot_value'],
+                'hot_change': row['hot_change'],
+                'rate': round(row['rate'], 1),
+                'zscore': round(row['zscore'], 2),
+            }
+            for row in cursor.fetchall()
+        ]
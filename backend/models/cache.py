@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+最新快照缓存模块
+
+热榜和上升榜只在保存新快照时变化，
+由 save_hot_list 在入库后整体替换缓存，接口在两次抓取之间无需访问数据库。
+提供 HTTP 服务的进程（prerender 为 True）在加载时即把 /api/hot 和 /api/rising 的响应体
+序列化并压缩好（见 models/rendered.py），请求时按编码直接返回字节；
+独立的抓取进程不提供接口，入库刷新缓存时不做渲染和压缩，响应体在首次请求时才渲染。
+"""
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.database import (
+    get_latest_hot_list, get_rising_topics, get_snapshot_history, get_hot_list_delta
+)
+from models.status import get_status_counters
+from models.rendered import RenderedBody
+
+
+# 缓存的上升榜条数，请求的 limit 不超过该值时直接切片返回
+RISING_CACHE_LIMIT = 50
+
+# 上升榜默认条数（前端使用的 limit），随快照一起预渲染
+RISING_DEFAULT_LIMIT = 10
+
+# 每个快照最多缓存的增量结果数（不同的 since 参数）
+DELTA_CACHE_LIMIT = 32
+
+
+class SnapshotCache:
+    """最新快照及其派生数据的进程内缓存"""
+
+    def __init__(self):
+        self._entry: Optional[Dict] = None
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # 加载时预渲染响应体，由 create_app 在提供 HTTP 服务的进程中开启
+        self.prerender = False
+
+    def _load(self) -> Dict:
+        """从数据库读取最新快照的全部派生数据"""
+        history = get_snapshot_history(1)
+        entry = {
+            'snapshot_id': history[0]['id'] if history else None,
+            'hot_list': get_latest_hot_list(),
+            'rising': get_rising_topics(RISING_CACHE_LIMIT),
+            'deltas': {},
+        }
+        entry['rendered'] = {}
+        if self.prerender:
+            entry['rendered']['hot'] = self._render_hot(entry)
+            entry['rendered'][('rising', RISING_DEFAULT_LIMIT)] = self._render_rising(
+                entry, RISING_DEFAULT_LIMIT
+            )
+        return entry
+
+    @staticmethod
+    def _render_hot(entry: Dict) -> RenderedBody:
+        """/api/hot 的响应体"""
+        hot_list = entry['hot_list']
+        return RenderedBody({
+            'success': True,
+            'snapshot_id': entry['snapshot_id'],
+            'data': hot_list,
+            'count': len(hot_list)
+        })
+
+    @staticmethod
+    def _render_rising(entry: Dict, limit: int) -> RenderedBody:
+        """/api/rising 的响应体"""
+        rising = entry['rising'][:limit]
+        return RenderedBody({
+            'success': True,
+            'data': rising,
+            'count': len(rising)
+        })
+
+    def _get_entry(self, track: bool = True) -> Dict:
+        """获取缓存条目，未命中时从数据库加载（track 为 False 时不计入命中统计）"""
+        entry = self._entry
+        if entry is not None:
+            if track:
+                with self._lock:
+                    self.hits += 1
+            return entry
+
+        with self._lock:
+            if track:
+                self.misses += 1
+            generation = self._generation
+
+        entry = self._load()
+
+        # 加载期间若已有新快照入库，不用旧数据覆盖
+        with self._lock:
+            if generation == self._generation:
+                self._entry = entry
+        return entry
+
+    def refresh(self):
+        """新快照入库后重新加载并原子替换缓存"""
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+
+        entry = self._load()
+
+        with self._lock:
+            if generation == self._generation:
+                self._entry = entry
+
+    def invalidate(self):
+        """清空缓存，下次访问时重新加载"""
+        with self._lock:
+            self._generation += 1
+            self._entry = None
+
+    def get_hot_list(self) -> List[Dict]:
+        """最新热榜"""
+        return self._get_entry()['hot_list']
+
+    def get_rising(self, limit: int = 10) -> List[Dict]:
+        """上升榜（limit 超过缓存条数时直接查询数据库）"""
+        if limit > RISING_CACHE_LIMIT:
+            with self._lock:
+                self.misses += 1
+            return get_rising_topics(limit)
+        return self._get_entry()['rising'][:limit]
+
+    def get_hot_body(self) -> RenderedBody:
+        """预渲染的 /api/hot 响应体（未预渲染时首次请求渲染并缓存到该快照失效）"""
+        entry = self._get_entry()
+        body = entry['rendered'].get('hot')
+        if body is None:
+            body = entry['rendered']['hot'] = self._render_hot(entry)
+        return body
+
+    def get_rising_body(self, limit: int = RISING_DEFAULT_LIMIT) -> Optional[RenderedBody]:
+        """
+        预渲染的 /api/rising 响应体
+
+        默认条数在预渲染时随快照一起渲染，其他 limit 首次请求时渲染并缓存到该快照失效；
+        limit 超过缓存条数时返回 None，由接口直接查询数据库。
+        """
+        if limit > RISING_CACHE_LIMIT:
+            return None
+        entry = self._get_entry()
+        rendered = entry['rendered']
+        key = ('rising', max(limit, 0))
+        body = rendered.get(key)
+        if body is None:
+            body = rendered[key] = self._render_rising(entry, max(limit, 0))
+        return body
+
+    def get_hot_delta(self, since_id: int) -> Tuple[Optional[int], List[Dict], Optional[Dict]]:
+        """
+        最新热榜相对 since_id 快照的变化（同一快照的结果在各客户端间共享）
+
+        Returns:
+            (最新快照ID, 最新热榜, get_hot_list_delta 的结果)；无法计算增量时第三项为 None
+        """
+        entry = self._get_entry()
+        snapshot_id = entry['snapshot_id']
+        deltas = entry['deltas']
+        if since_id in deltas:
+            with self._lock:
+                self.hits += 1
+            return snapshot_id, entry['hot_list'], deltas[since_id]
+
+        with self._lock:
+            self.misses += 1
+        delta = get_hot_list_delta(since_id, snapshot_id) if snapshot_id is not None else None
+        if len(deltas) < DELTA_CACHE_LIMIT:
+            deltas[since_id] = delta
+        return snapshot_id, entry['hot_list'], delta
+
+    def get_version(self) -> str:
+        """
+        当前数据版本（最新快照ID + 快照数量）
+        
+        用作 ETag 的基础，有新快照入库或数据被清理时都会变化。
+        每个带 ETag 的请求都会读取，不计入命中统计。
+        """
+        entry = self._get_entry(track=False)
+        return f"{entry['snapshot_id']}-{get_status_counters().get_status()['snapshot_count']}"
+
+    def get_stats(self) -> Dict:
+        """缓存命中统计"""
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': (hits / total * 100) if total > 0 else 0,
+        }
+
+
+# 全局缓存实例（模块导入时创建，避免多线程重复初始化）
+_snapshot_cache = SnapshotCache()
+
+
+def get_snapshot_cache() -> SnapshotCache:
+    """获取全局缓存实例"""
+    return _snapshot_cache
@@ -6,29 +6,95 @@
 """
 
 import os
+import re
 import sqlite3
-from datetime import datetime
-from typing import List, Dict, Optional
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Union
 from contextlib import contextmanager
 
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import DATABASE_PATH, DATA_DIR
+from config import (
+    DATABASE_PATH, DATA_DIR, DB_MMAP_SIZE, DB_BUSY_TIMEOUT_MS,
+    TREND_RAW_MAX_HOURS, TREND_HOURLY_MAX_HOURS, HOT_DELTA_MAX_SNAPSHOTS,
+    RETENTION_BATCH_SNAPSHOTS, RETENTION_VACUUM_PAGES
+)
 
 
 # 确保数据目录存在
 os.makedirs(DATA_DIR, exist_ok=True)
 
+# 汇总表：分辨率 -> (表名, 时间桶格式)
+ROLLUP_TABLES = {
+    'hourly': ('hot_rollups_hourly', '%Y-%m-%d %H:00:00'),
+    'daily': ('hot_rollups_daily', '%Y-%m-%d 00:00:00'),
+}
+
+# 两次快照间隔超过该值（分钟）时，只按该值计入在榜时长
+MAX_SNAPSHOT_GAP_MINUTES = 60
+
+# 话题生命周期表中可排序（且建有索引）的列
+LIFECYCLE_SORT_COLUMNS = (
+    'last_seen', 'first_seen', 'peak_position', 'peak_hot_value',
+    'minutes_on_board', 'appearances'
+)
+
+# 新上榜词条在上升榜中的排序分数（高于任何排名上升幅度）
+RISE_SCORE_NEW = 1000
+
+# 从话题链接中提取话题ID：https://www.douyin.com/hot/2366771[/标题]
+_TOPIC_URL_RE = re.compile(r'/hot/(\d+)')
+
+# 每个线程复用一条连接（Flask 请求线程 / 调度器线程各自独立）
+_local = threading.local()
+
+
+def _open_connection() -> sqlite3.Connection:
+    """创建新连接并设置 WAL 等参数"""
+    conn = sqlite3.connect(DATABASE_PATH, timeout=DB_BUSY_TIMEOUT_MS / 1000)
+    conn.row_factory = sqlite3.Row
+    # WAL 模式：读不阻塞写，写不阻塞读
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute(f'PRAGMA mmap_size={int(DB_MMAP_SIZE)}')
+    conn.execute(f'PRAGMA busy_timeout={int(DB_BUSY_TIMEOUT_MS)}')
+    return conn
+
 
 @contextmanager
 def get_db_connection():
-    """获取数据库连接的上下文管理器"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
+    """
+    获取数据库连接的上下文管理器
+    
+    连接按线程缓存复用，不再每次打开/关闭。
+    退出最外层时若仍有未提交的事务则回滚，行为与原先关闭连接一致。
+    """
+    conn = getattr(_local, 'conn', None)
+    if conn is None or getattr(_local, 'path', None) != DATABASE_PATH:
+        if conn is not None:
+            conn.close()
+        conn = _open_connection()
+        _local.conn = conn
+        _local.path = DATABASE_PATH
+        _local.depth = 0
+    
+    _local.depth += 1
     try:
         yield conn
     finally:
+        _local.depth -= 1
+        if _local.depth == 0 and conn.in_transaction:
+            conn.rollback()
+
+
+def close_db_connection():
+    """关闭当前线程缓存的连接"""
+    conn = getattr(_local, 'conn', None)
+    if conn is not None:
         conn.close()
+        _local.conn = None
 
 
 def init_database():
@@ -36,6 +102,8 @@ def init_database():
     with get_db_connection() as conn:
         cursor = conn.cursor()
         
+        _enable_incremental_vacuum(conn)
+        
         # 热搜快照表 - 记录每次抓取
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS hot_snapshots (
@@ -45,78 +113,1049 @@ def init_database():
             )
         ''')
         
-        # 热搜条目表 - 记录每条热搜
+        # 热搜词字典表 - 每个词只存一份文本、链接和封面
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS words (
+                id INTEGER PRIMARY KEY,
+                word TEXT NOT NULL,
+                topic_id TEXT,
+                url TEXT,
+                cover TEXT,
+                last_seen_at TEXT,
+                peak_hot_value INTEGER DEFAULT 0,
+                topic_key INTEGER,
+                meta_changed_at TEXT
+            )
+        ''')
+        word_stats_added = _add_missing_columns(cursor, 'words', {
+            'last_seen_at': 'TEXT',
+            'peak_hot_value': 'INTEGER DEFAULT 0',
+        })
+        topic_key_added = _add_missing_columns(cursor, 'words', {'topic_key': 'INTEGER'})
+        # 标题、链接等最近一次变化所在快照的抓取时间（热榜增量据此下发改名）
+        _add_missing_columns(cursor, 'words', {'meta_changed_at': 'TEXT'})
+        
+        # 话题改名前的标题 - 按旧标题查询时仍能找到同一个话题
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS word_aliases (
+                alias TEXT NOT NULL,
+                word_id INTEGER NOT NULL,
+                PRIMARY KEY (alias, word_id)
+            ) WITHOUT ROWID
+        ''')
+        
+        # 标签字典表（热/新/爆/上升...）
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS tags (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE
+            )
+        ''')
+        
+        # 旧版 hot_items 直接存储文本，先改名再迁移
+        legacy = _is_legacy_hot_items(cursor)
+        if legacy:
+            # 整个迁移在同一个事务里完成
+            cursor.execute('BEGIN')
+            cursor.execute('DROP INDEX IF EXISTS idx_hot_items_word')
+            cursor.execute('DROP INDEX IF EXISTS idx_hot_items_snapshot')
+            cursor.execute('DROP INDEX IF EXISTS idx_hot_items_word_cover')
+            cursor.execute('DROP INDEX IF EXISTS idx_hot_items_snapshot_cover')
+            cursor.execute('ALTER TABLE hot_items RENAME TO hot_items_legacy')
+        
+        # 热搜条目表 - 只保存整数列
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS hot_items (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                id INTEGER PRIMARY KEY,
                 snapshot_id INTEGER NOT NULL,
+                word_id INTEGER NOT NULL,
                 position INTEGER NOT NULL,
-                word TEXT NOT NULL,
                 hot_value INTEGER DEFAULT 0,
-                topic_id TEXT,
-                tag TEXT,
-                url TEXT,
-                FOREIGN KEY (snapshot_id) REFERENCES hot_snapshots(id)
+                tag_id INTEGER,
+                FOREIGN KEY (snapshot_id) REFERENCES hot_snapshots(id),
+                FOREIGN KEY (word_id) REFERENCES words(id),
+                FOREIGN KEY (tag_id) REFERENCES tags(id)
             )
         ''')
         
         # 创建索引
+        # 话题以 topic_key 为准，标题允许重复；按标题查找走 idx_words_search
+        cursor.execute('DROP INDEX IF EXISTS idx_words_word')
+        # 覆盖索引：趋势查询按 word_id 定位，榜单/上升查询按 snapshot_id 定位，
+        # 均无需回表读取 hot_items
+        cursor.execute('DROP INDEX IF EXISTS idx_hot_items_word')
+        cursor.execute('DROP INDEX IF EXISTS idx_hot_items_snapshot')
         cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_hot_items_word ON hot_items(word)
+            CREATE INDEX IF NOT EXISTS idx_hot_items_word_cover
+            ON hot_items(word_id, snapshot_id, position, hot_value)
         ''')
         cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_hot_items_snapshot ON hot_items(snapshot_id)
+            CREATE INDEX IF NOT EXISTS idx_hot_items_snapshot_cover
+            ON hot_items(snapshot_id, word_id, position, hot_value, tag_id)
         ''')
         cursor.execute('''
             CREATE INDEX IF NOT EXISTS idx_snapshots_time ON hot_snapshots(captured_at)
         ''')
+        # 搜索前缀匹配时覆盖排序所需的列
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_words_search
+            ON words(word, last_seen_at, peak_hot_value)
+        ''')
+        
+        # 小时/天汇总表 - 长时间范围的趋势直接读取汇总，与抓取频率无关
+        for table, _ in ROLLUP_TABLES.values():
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS {table} (
+                    word_id INTEGER NOT NULL,
+                    bucket TEXT NOT NULL,
+                    samples INTEGER NOT NULL,
+                    min_position INTEGER,
+                    max_position INTEGER,
+                    sum_position INTEGER,
+                    max_hot_value INTEGER,
+                    minutes_on_board REAL DEFAULT 0,
+                    PRIMARY KEY (word_id, bucket)
+                ) WITHOUT ROWID
+            ''')
+            # 按时间桶读取全部话题（/api/analytics）
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_bucket ON {table}(bucket)')
+        
+        # 排名变化表 - 入库时与上一个快照比较，/api/rising 直接读取
+        # rise_score: 新上榜为 1000，排名上升为上升名次，未上升为 NULL
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS hot_deltas (
+                snapshot_id INTEGER NOT NULL,
+                word_id INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                prev_position INTEGER,
+                hot_value INTEGER,
+                hot_change INTEGER,
+                rise_score INTEGER,
+                PRIMARY KEY (snapshot_id, word_id)
+            ) WITHOUT ROWID
+        ''')
+        
+        # 话题生命周期 - 入库时增量维护，不随过期快照的清理而丢失
+        # peak_position 只统计正常排名（排名 0 的置顶条目不计入）
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS topic_lifecycle (
+                word_id INTEGER PRIMARY KEY,
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL,
+                peak_position INTEGER,
+                peak_hot_value INTEGER DEFAULT 0,
+                minutes_on_board REAL DEFAULT 0,
+                appearances INTEGER DEFAULT 0
+            ) WITHOUT ROWID
+        ''')
+        # /api/topics 按各列排序分页
+        for column in LIFECYCLE_SORT_COLUMNS:
+            cursor.execute(f'''
+                CREATE INDEX IF NOT EXISTS idx_topic_lifecycle_{column}
+                ON topic_lifecycle({column})
+            ''')
+        
+        # 突发检测状态 - 每个话题一行，保存热度增速（热度/分钟）的在线均值和方差
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS burst_stats (
+                word_id INTEGER PRIMARY KEY,
+                samples INTEGER NOT NULL DEFAULT 0,
+                mean REAL NOT NULL DEFAULT 0,
+                m2 REAL NOT NULL DEFAULT 0,
+                last_hot_value INTEGER,
+                last_seen_at TEXT,
+                last_snapshot_id INTEGER
+            ) WITHOUT ROWID
+        ''')
+        
+        # 检测到的突发 - 入库时写入，/api/bursts 直接读取
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS hot_bursts (
+                snapshot_id INTEGER NOT NULL,
+                word_id INTEGER NOT NULL,
+                detected_at TEXT NOT NULL,
+                position INTEGER,
+                hot_value INTEGER,
+                hot_change INTEGER,
+                rate REAL,
+                zscore REAL,
+                PRIMARY KEY (snapshot_id, word_id)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_hot_bursts_time ON hot_bursts(detected_at)
+        ''')
+        
+        # 调度器租约 - 多个进程同时运行时，只有持有未过期租约的进程执行抓取（scheduler/leader.py）
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS scheduler_lease (
+                name TEXT PRIMARY KEY,
+                holder TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            ) WITHOUT ROWID
+        ''')
+        
+        if legacy:
+            _migrate_legacy_hot_items(cursor)
+        
+        _rebuild_rollups_if_empty(cursor)
+        _rebuild_lifecycle_if_empty(cursor)
+        if word_stats_added or legacy:
+            _rebuild_word_stats(cursor)
+        if topic_key_added or legacy:
+            _migrate_topic_keys(cursor)
+            # 合并后的话题ID与迁移前不同，按合并结果重新计算最新排名变化
+            cursor.execute('DELETE FROM hot_deltas')
+        _rebuild_latest_deltas_if_empty(cursor)
+        cursor.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_words_topic_key
+            ON words(topic_key) WHERE topic_key IS NOT NULL
+        ''')
+        _init_word_search(cursor)
         
         conn.commit()
+        
         print("[数据库] 初始化完成")
 
 
-def save_hot_list(items: List[Dict]) -> int:
+def _enable_incremental_vacuum(conn):
     """
-    保存热榜数据到数据库
+    新数据库开启 auto_vacuum=INCREMENTAL，清理后可逐步回收空闲页
+    
+    已有数据的数据库需要一次完整的 VACUUM 才能转换，耗时且独占数据库，
+    不在每个进程启动时执行，由抓取进程的清理任务或 python run.py vacuum
+    调用 convert_to_incremental_vacuum 完成。
+    """
+    if conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2:
+        return
+    
+    conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+    if conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2:
+        return
+    
+    # 新建的空数据库（切换 WAL 时已写入文件头），VACUUM 很快
+    has_tables = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' LIMIT 1"
+    ).fetchone()
+    if not has_tables:
+        conn.execute('VACUUM')
+
+
+def convert_to_incremental_vacuum() -> bool:
+    """
+    把已有数据库转换为 auto_vacuum=INCREMENTAL（执行一次完整的 VACUUM）
+    
+    Returns:
+        是否执行了转换（已是增量回收模式时直接返回 False）
+    """
+    with get_db_connection() as conn:
+        if conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2:
+            return False
+        
+        print("[数据库] 转换为增量回收模式（VACUUM），可能需要一些时间 ...")
+        conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+        conn.execute('VACUUM')
+        return True
+
+
+def _add_missing_columns(cursor, table: str, columns: Dict[str, str]) -> bool:
+    """给旧表补充新增的列，返回是否有列被添加"""
+    cursor.execute(f'PRAGMA table_info({table})')
+    existing = {row['name'] for row in cursor.fetchall()}
+    added = False
+    for name, definition in columns.items():
+        if name not in existing:
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN {name} {definition}')
+            added = True
+    return added
+
+
+def _rebuild_word_stats(cursor):
+    """从历史数据回填 words 的最后出现时间和峰值热度"""
+    print("[数据库] 正在回填热搜词的最后出现时间和峰值热度 ...")
+    cursor.execute('''
+        UPDATE words SET
+            last_seen_at = (
+                SELECT s.captured_at FROM hot_items i
+                JOIN hot_snapshots s ON s.id = i.snapshot_id
+                WHERE i.word_id = words.id
+                ORDER BY i.snapshot_id DESC
+                LIMIT 1
+            ),
+            peak_hot_value = COALESCE(
+                (SELECT MAX(hot_value) FROM hot_items WHERE word_id = words.id), 0
+            )
+    ''')
+
+
+def _migrate_topic_keys(cursor):
+    """
+    为已有的 words 回填 topic_key，并合并同一话题因改名产生的多条记录
+    
+    每组保留最近出现的记录，其余记录的条目、汇总和排名变化并入该记录，
+    旧标题写入 word_aliases。
+    """
+    cursor.execute('SELECT id, word, topic_id, url, last_seen_at FROM words')
+    groups = {}
+    for row in cursor.fetchall():
+        key = _topic_key({'topic_id': row['topic_id'], 'url': row['url']})
+        if key is not None:
+            groups.setdefault(key, []).append(row)
+    
+    if not groups:
+        return
+    
+    print(f"[数据库] 正在为 {len(groups)} 个话题回填 topic_key ...")
+    merged = 0
+    for key, rows in groups.items():
+        rows.sort(key=lambda row: (row['last_seen_at'] or '', row['id']))
+        canonical = rows[-1]['id']
+        duplicates = [row['id'] for row in rows[:-1]]
+        if duplicates:
+            _merge_words(cursor, canonical, duplicates)
+            merged += len(duplicates)
+    
+    cursor.executemany('''
+        UPDATE words SET topic_key = ?, topic_id = ? WHERE id = ?
+    ''', ((key, str(key), rows[-1]['id']) for key, rows in groups.items()))
+    
+    if merged:
+        print(f"[数据库] 合并了 {merged} 条重复的话题记录")
+
+
+def _merge_words(cursor, canonical: int, duplicates: List[int]):
+    """把 duplicates 的全部数据并入 canonical 后删除 duplicates"""
+    marks = ','.join('?' * len(duplicates))
+    
+    cursor.execute(f'''
+        INSERT OR IGNORE INTO word_aliases (alias, word_id)
+        SELECT word, ? FROM words
+        WHERE id IN ({marks}) AND word != (SELECT word FROM words WHERE id = ?)
+    ''', (canonical, *duplicates, canonical))
+    cursor.execute(f'''
+        UPDATE word_aliases SET word_id = ? WHERE word_id IN ({marks})
+    ''', (canonical, *duplicates))
+    cursor.execute(f'''
+        UPDATE hot_items SET word_id = ? WHERE word_id IN ({marks})
+    ''', (canonical, *duplicates))
+    
+    for table, _ in ROLLUP_TABLES.values():
+        cursor.execute(f'''
+            INSERT INTO {table} (word_id, bucket, samples, min_position, max_position,
+                                 sum_position, max_hot_value, minutes_on_board)
+            SELECT ?, bucket, samples, min_position, max_position,
+                   sum_position, max_hot_value, minutes_on_board
+            FROM {table} WHERE word_id IN ({marks})
+            ON CONFLICT (word_id, bucket) DO UPDATE SET
+                samples = samples + excluded.samples,
+                min_position = MIN(min_position, excluded.min_position),
+                max_position = MAX(max_position, excluded.max_position),
+                sum_position = sum_position + excluded.sum_position,
+                max_hot_value = MAX(max_hot_value, excluded.max_hot_value),
+                minutes_on_board = minutes_on_board + excluded.minutes_on_board
+        ''', (canonical, *duplicates))
+        cursor.execute(f'DELETE FROM {table} WHERE word_id IN ({marks})', duplicates)
+    
+    cursor.execute(f'''
+        UPDATE OR IGNORE hot_deltas SET word_id = ? WHERE word_id IN ({marks})
+    ''', (canonical, *duplicates))
+    cursor.execute(f'DELETE FROM hot_deltas WHERE word_id IN ({marks})', duplicates)
+    
+    cursor.execute(f'''
+        INSERT INTO topic_lifecycle (word_id, first_seen, last_seen, peak_position,
+                                     peak_hot_value, minutes_on_board, appearances)
+        SELECT ?, MIN(first_seen), MAX(last_seen), MIN(peak_position),
+               MAX(peak_hot_value), SUM(minutes_on_board), SUM(appearances)
+        FROM topic_lifecycle WHERE word_id IN ({marks})
+        HAVING COUNT(*) > 0
+        ON CONFLICT (word_id) DO UPDATE SET {_LIFECYCLE_MERGE}
+    ''', (canonical, *duplicates))
+    cursor.execute(f'DELETE FROM topic_lifecycle WHERE word_id IN ({marks})', duplicates)
+    
+    cursor.execute(f'''
+        UPDATE OR IGNORE hot_bursts SET word_id = ? WHERE word_id IN ({marks})
+    ''', (canonical, *duplicates))
+    cursor.execute(f'DELETE FROM hot_bursts WHERE word_id IN ({marks})', duplicates)
+    # 在线统计无法合并，保留 canonical 的状态
+    cursor.execute(f'DELETE FROM burst_stats WHERE word_id IN ({marks})', duplicates)
+    
+    cursor.execute(f'''
+        UPDATE words SET
+            last_seen_at = (SELECT MAX(last_seen_at) FROM words WHERE id IN (?, {marks})),
+            peak_hot_value = (SELECT MAX(peak_hot_value) FROM words WHERE id IN (?, {marks}))
+        WHERE id = ?
+    ''', (canonical, *duplicates, canonical, *duplicates, canonical))
+    cursor.execute(f'DELETE FROM words WHERE id IN ({marks})', duplicates)
+
+
+def _init_word_search(cursor):
+    """
+    创建热搜词全文索引（FTS5 trigram，支持中文子串匹配）
+    
+    索引只保存 words 的 rowid 和 word，由触发器随 words 同步更新；
+    当前 SQLite 不支持 FTS5/trigram 时搜索退化为 LIKE 匹配。
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'words_fts'")
+    if cursor.fetchone():
+        return
+    
+    try:
+        cursor.execute('''
+            CREATE VIRTUAL TABLE words_fts USING fts5(
+                word, content='words', content_rowid='id', tokenize='trigram'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        print(f"[数据库] 不支持 FTS5 trigram，搜索将使用 LIKE 匹配: {e}")
+        return
+    
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS words_fts_insert AFTER INSERT ON words BEGIN
+            INSERT INTO words_fts (rowid, word) VALUES (new.id, new.word);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS words_fts_delete AFTER DELETE ON words BEGIN
+            INSERT INTO words_fts (words_fts, rowid, word) VALUES ('delete', old.id, old.word);
+        END
+    ''')
+    # 只在词文本变化时更新索引，入库时更新统计列不会触发
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS words_fts_update AFTER UPDATE OF word ON words BEGIN
+            INSERT INTO words_fts (words_fts, rowid, word) VALUES ('delete', old.id, old.word);
+            INSERT INTO words_fts (rowid, word) VALUES (new.id, new.word);
+        END
+    ''')
+    cursor.execute("INSERT INTO words_fts (words_fts) VALUES ('rebuild')")
+
+
+def _is_legacy_hot_items(cursor) -> bool:
+    """hot_items 是否为旧版（直接存储 word/url 文本）的表结构"""
+    cursor.execute('PRAGMA table_info(hot_items)')
+    return any(row['name'] == 'word' for row in cursor.fetchall())
+
+
+def _migrate_legacy_hot_items(cursor):
+    """把旧版 hot_items_legacy 的数据迁移到 words/tags/hot_items"""
+    print("[数据库] 检测到旧版表结构，正在迁移 hot_items ...")
+    
+    # 每个词取最近一次出现时的 topic_id/url
+    cursor.execute('''
+        INSERT OR IGNORE INTO words (word, topic_id, url)
+        SELECT word, topic_id, url FROM hot_items_legacy
+        WHERE id IN (SELECT MAX(id) FROM hot_items_legacy GROUP BY word)
+    ''')
+    cursor.execute('''
+        INSERT OR IGNORE INTO tags (name)
+        SELECT DISTINCT COALESCE(tag, '') FROM hot_items_legacy
+    ''')
+    cursor.execute('''
+        INSERT INTO hot_items (id, snapshot_id, word_id, position, hot_value, tag_id)
+        SELECT l.id, l.snapshot_id, w.id, l.position, l.hot_value, t.id
+        FROM hot_items_legacy l
+        JOIN words w ON w.word = l.word
+        JOIN tags t ON t.name = COALESCE(l.tag, '')
+    ''')
+    migrated = cursor.rowcount
+    cursor.execute('DROP TABLE hot_items_legacy')
+    print(f"[数据库] 迁移完成，共 {migrated} 条记录")
+
+
+def _rebuild_rollups_if_empty(cursor):
+    """汇总表为空但已有历史数据时（旧数据库升级），从 hot_items 重建汇总"""
+    cursor.execute('SELECT 1 FROM hot_rollups_hourly LIMIT 1')
+    if cursor.fetchone():
+        return
+    cursor.execute('SELECT 1 FROM hot_items LIMIT 1')
+    if not cursor.fetchone():
+        return
+    
+    print("[数据库] 正在从历史数据重建小时/天汇总表 ...")
+    for table, bucket_format in ROLLUP_TABLES.values():
+        cursor.execute(f'''
+            WITH gaps AS (
+                SELECT id, captured_at,
+                       MIN(COALESCE((julianday(captured_at) - julianday(
+                           LAG(captured_at) OVER (ORDER BY captured_at))) * 1440, 0), ?) AS gap
+                FROM hot_snapshots
+            )
+            INSERT INTO {table} (word_id, bucket, samples, min_position, max_position,
+                                 sum_position, max_hot_value, minutes_on_board)
+            SELECT i.word_id, strftime(?, g.captured_at), COUNT(*), MIN(i.position),
+                   MAX(i.position), SUM(i.position), MAX(i.hot_value), SUM(g.gap)
+            FROM hot_items i
+            JOIN gaps g ON g.id = i.snapshot_id
+            GROUP BY 1, 2
+        ''', (MAX_SNAPSHOT_GAP_MINUTES, bucket_format))
+
+
+def _rebuild_latest_deltas_if_empty(cursor):
+    """排名变化表为空时（旧数据库升级），为最新快照计算一次排名变化"""
+    cursor.execute('SELECT 1 FROM hot_deltas LIMIT 1')
+    if cursor.fetchone():
+        return
+    
+    cursor.execute('''
+        SELECT id, captured_at FROM hot_snapshots
+        ORDER BY captured_at DESC
+        LIMIT 1
+    ''')
+    latest = cursor.fetchone()
+    if not latest:
+        return
+    
+    cursor.execute('''
+        SELECT word_id, position, hot_value FROM hot_items
+        WHERE snapshot_id = ?
+        ORDER BY id
+    ''', (latest['id'],))
+    current = {}
+    for row in cursor.fetchall():
+        current.setdefault(row['word_id'], (row['position'], row['hot_value']))
+    
+    previous = _previous_snapshot_items(cursor, _parse_time(latest['captured_at']))
+    if previous is not None:
+        _insert_deltas(cursor, latest['id'], current, previous)
+
+
+def _rebuild_lifecycle_if_empty(cursor):
+    """生命周期表为空但已有历史数据时（旧数据库升级），从 hot_items 回填"""
+    cursor.execute('SELECT 1 FROM topic_lifecycle LIMIT 1')
+    if cursor.fetchone():
+        return
+    cursor.execute('SELECT 1 FROM hot_items LIMIT 1')
+    if not cursor.fetchone():
+        return
+    
+    print("[数据库] 正在从历史数据回填话题生命周期表 ...")
+    _fill_lifecycle(cursor)
+
+
+def _fill_lifecycle(cursor):
+    """按 hot_items 中的全部快照计算每个话题的生命周期（在榜时长与汇总表算法相同）"""
+    cursor.execute('''
+        WITH gaps AS (
+            SELECT id, captured_at,
+                   MIN(COALESCE((julianday(captured_at) - julianday(
+                       LAG(captured_at) OVER (ORDER BY captured_at))) * 1440, 0), ?) AS gap
+            FROM hot_snapshots
+        )
+        INSERT INTO topic_lifecycle (word_id, first_seen, last_seen, peak_position,
+                                     peak_hot_value, minutes_on_board, appearances)
+        SELECT i.word_id, MIN(g.captured_at), MAX(g.captured_at),
+               MIN(CASE WHEN i.position > 0 THEN i.position END),
+               COALESCE(MAX(i.hot_value), 0), SUM(g.gap), COUNT(*)
+        FROM hot_items i
+        JOIN gaps g ON g.id = i.snapshot_id
+        GROUP BY i.word_id
+    ''', (MAX_SNAPSHOT_GAP_MINUTES,))
+
+
+def rebuild_topic_lifecycle() -> int:
+    """
+    从现有快照重新计算话题生命周期表（回填命令使用）
+    
+    已超出保留期、被清理的快照不在 hot_items 中，重建后这部分历史不再计入。
+    
+    Returns:
+        重建的话题数
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM topic_lifecycle')
+        _fill_lifecycle(cursor)
+        conn.commit()
+        cursor.execute('SELECT COUNT(*) FROM topic_lifecycle')
+        return cursor.fetchone()[0]
+
+
+def _previous_snapshot_items(cursor, before: datetime) -> Optional[Dict[int, tuple]]:
+    """
+    读取某时间点之前最近一个快照的条目
+    
+    Returns:
+        {word_id: (position, hot_value)}，没有更早的快照时返回 None
+    """
+    cursor.execute('''
+        SELECT id FROM hot_snapshots
+        WHERE captured_at < ?
+        ORDER BY captured_at DESC
+        LIMIT 1
+    ''', (_format_time(before),))
+    row = cursor.fetchone()
+    if not row:
+        return None
+    
+    cursor.execute('''
+        SELECT word_id, position, hot_value FROM hot_items
+        WHERE snapshot_id = ?
+        ORDER BY id
+    ''', (row['id'],))
+    items = {}
+    for item in cursor.fetchall():
+        items.setdefault(item['word_id'], (item['position'], item['hot_value']))
+    return items
+
+
+def _insert_deltas(cursor, snapshot_id: int, current: Dict[int, tuple],
+                   previous: Dict[int, tuple]):
+    """
+    计算并写入一个快照相对上一个快照的排名/热度变化
+    
+    只保存 /api/rising 可能展示的行：新上榜、排名上升或热度增长。
+    """
+    rows = []
+    for word_id, (position, hot_value) in current.items():
+        prev = previous.get(word_id)
+        if prev is None:
+            prev_position, rise_score = None, RISE_SCORE_NEW
+            hot_change = hot_value
+        else:
+            prev_position = prev[0]
+            rise_score = prev_position - position if prev_position > position else None
+            hot_change = hot_value - (prev[1] or 0)
+        
+        if rise_score is not None or hot_change > 0:
+            rows.append((snapshot_id, word_id, position, prev_position,
+                         hot_value, hot_change, rise_score))
+    
+    cursor.executemany('''
+        INSERT OR IGNORE INTO hot_deltas (snapshot_id, word_id, position, prev_position,
+                                          hot_value, hot_change, rise_score)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+
+
+def _write_deltas(cursor, saved: List[tuple]):
+    """
+    按抓取时间顺序为本批快照计算排名变化
     
     Args:
-        items: 热榜数据列表
+        saved: [(captured_at, snapshot_id, items, word_ids), ...]
+    """
+    if not saved:
+        return
+    
+    saved = sorted(saved, key=lambda entry: entry[0])
+    previous = _previous_snapshot_items(cursor, saved[0][0])
+    
+    for captured_at, snapshot_id, items, ids in saved:
+        current = {}
+        for item, word_id in zip(items, ids):
+            get = item.get
+            current.setdefault(word_id, (get('position', 0), get('hot_value', 0)))
         
+        # 第一个快照没有可比较的对象
+        if previous is not None:
+            _insert_deltas(cursor, snapshot_id, current, previous)
+        previous = current
+
+
+def _parse_time(value) -> datetime:
+    """把 datetime 或时间字符串统一为 datetime"""
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+def _format_time(value) -> str:
+    """统一时间格式（与 sqlite3 默认的 datetime 适配器一致）"""
+    if isinstance(value, datetime):
+        return value.isoformat(' ')
+    return str(value)
+
+
+def _time_ago(hours: float) -> str:
+    """
+    计算 N 小时前的时间字符串
+    
+    captured_at 按本地时间写入，这里也用本地时间计算，
+    避免与 SQLite 的 datetime('now')（UTC）混用。
+    """
+    return _format_time(datetime.now() - timedelta(hours=hours))
+
+
+def _chunks(values: list, size: int = 500):
+    """按 SQLite 参数数量上限切分列表"""
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def _topic_key(item: Dict) -> Optional[int]:
+    """
+    话题的规范ID（整数）
+    
+    API/演示数据为 sentence_id，HTML 抓取为 topic_id，都缺失时从链接中提取。
+    """
+    for field in ('topic_id', 'sentence_id'):
+        value = str(item.get(field) or '').strip()
+        if value.isdigit():
+            return int(value)
+    match = _TOPIC_URL_RE.search(item.get('url') or '')
+    return int(match.group(1)) if match else None
+
+
+def _item_identity(item: Dict) -> Union[int, str]:
+    """条目对应话题的身份：有话题ID时为 topic_key，否则退回标题文本"""
+    key = _topic_key(item)
+    return key if key is not None else item.get('word', '')
+
+
+def _intern_words(cursor, snapshots: List[Dict]) -> Dict[Union[int, str], int]:
+    """
+    把快照中出现的话题写入 words 字典表
+    
+    有话题ID的条目按 topic_key 归并，标题变化时更新标题并把旧标题记入 word_aliases；
+    没有话题ID的条目只按标题归并到同样没有ID的记录。已存在的话题只在元数据变化时更新。
+    
     Returns:
-        快照ID
+        {_item_identity(item): word_id}
     """
-    if not items:
-        return -1
+    # 同一个话题以最后一次出现的信息为准 (word, topic_key, topic_id, url, cover)
+    latest = {}
+    seen_at = {}
+    for snapshot in snapshots:
+        for item in snapshot.get('items') or []:
+            get = item.get
+            key = _topic_key(item)
+            identity = key if key is not None else get('word', '')
+            seen_at[identity] = snapshot.get('captured_at')
+            latest[identity] = (
+                get('word', ''),
+                key,
+                str(key) if key is not None else get('topic_id', '') or '',
+                get('url', ''),
+                get('cover') or get('cover_url', '')
+            )
+    
+    keys = [identity for identity in latest if isinstance(identity, int)]
+    titles = [identity for identity in latest if isinstance(identity, str)]
+    word_ids = {}
+    updates = []
+    aliases = []
+    
+    def check(identity, row):
+        word_ids[identity] = row['id']
+        meta = latest[identity]
+        current = (row['word'], row['topic_key'], row['topic_id'], row['url'], row['cover'])
+        if meta != current:
+            changed_at = seen_at[identity]
+            updates.append((*meta, _format_time(changed_at) if changed_at else None, row['id']))
+            if meta[0] != row['word']:
+                aliases.append((row['word'], row['id']))
+    
+    for chunk in _chunks(keys):
+        cursor.execute(f'''
+            SELECT id, word, topic_key, topic_id, url, cover FROM words
+            WHERE topic_key IN ({','.join('?' * len(chunk))})
+        ''', chunk)
+        for row in cursor.fetchall():
+            check(row['topic_key'], row)
+    
+    # 新出现的话题ID：优先认领同标题、尚无ID的旧记录；
+    # 没有话题ID的条目只归并到同标题、同样没有ID的记录，不会并入其他话题
+    unclaimed = {latest[key][0]: key for key in keys if key not in word_ids}
+    title_set = set(titles)
+    title_rows = {}
+    lookups = list(title_set | set(unclaimed))
+    for chunk in _chunks(lookups):
+        cursor.execute(f'''
+            SELECT id, word, topic_key, topic_id, url, cover FROM words
+            WHERE word IN ({','.join('?' * len(chunk))}) AND topic_key IS NULL
+            ORDER BY id
+        ''', chunk)
+        for row in cursor.fetchall():
+            word = row['word']
+            if word in unclaimed:
+                check(unclaimed.pop(word), row)
+            elif word in title_set:
+                # 同标题有多条时取最新一条
+                title_rows[word] = row
+    for word, row in title_rows.items():
+        check(word, row)
+    
+    for identity, meta in latest.items():
+        if identity not in word_ids:
+            cursor.execute('''
+                INSERT INTO words (word, topic_key, topic_id, url, cover) VALUES (?, ?, ?, ?, ?)
+            ''', meta)
+            word_ids[identity] = cursor.lastrowid
+    
+    if updates:
+        cursor.executemany('''
+            UPDATE words SET word = ?, topic_key = ?, topic_id = ?, url = ?, cover = ?,
+                             meta_changed_at = ?
+            WHERE id = ?
+        ''', updates)
+    if aliases:
+        cursor.executemany('''
+            INSERT OR IGNORE INTO word_aliases (alias, word_id) VALUES (?, ?)
+        ''', aliases)
+    
+    return word_ids
+
+
+def _snapshot_word_ids(items: List[Dict], word_ids: Dict[Union[int, str], int]) -> List[int]:
+    """快照中每个条目对应的 word_id（与 items 顺序一致）"""
+    return [word_ids[_item_identity(item)] for item in items]
+
+
+def _intern_tags(cursor, snapshots: List[Dict]) -> Dict[str, int]:
+    """把快照中出现的标签写入 tags 字典表，返回 {tag: tag_id}"""
+    cursor.execute('SELECT id, name FROM tags')
+    tag_ids = {row['name']: row['id'] for row in cursor.fetchall()}
+    
+    for snapshot in snapshots:
+        for item in snapshot.get('items') or []:
+            tag = item.get('tag') or ''
+            if tag not in tag_ids:
+                cursor.execute('INSERT INTO tags (name) VALUES (?)', (tag,))
+                tag_ids[tag] = cursor.lastrowid
+    
+    return tag_ids
+
+
+def _item_rows(snapshot_id: int, items: List[Dict], ids: List[int],
+               tag_ids: Dict[str, int]):
+    """生成 hot_items 的插入参数"""
+    for item, word_id in zip(items, ids):
+        get = item.get
+        yield (
+            snapshot_id,
+            word_id,
+            get('position', 0),
+            get('hot_value', 0),
+            tag_ids[get('tag') or '']
+        )
+
+
+def _snapshot_gaps(cursor, times: List[datetime]) -> List[float]:
+    """
+    计算每个快照距上一个快照的分钟数（用于累计在榜时长）
+    
+    批次内按时间排序比较，批次中最早的快照与库中更早的快照比较。
+    """
+    gaps = [0.0] * len(times)
+    if not times:
+        return gaps
+    
+    order = sorted(range(len(times)), key=times.__getitem__)
+    cursor.execute('''
+        SELECT MAX(captured_at) AS prev FROM hot_snapshots WHERE captured_at < ?
+    ''', (_format_time(times[order[0]]),))
+    row = cursor.fetchone()
+    prev = _parse_time(row['prev']) if row['prev'] else None
+    
+    for index in order:
+        if prev is not None:
+            minutes = (times[index] - prev).total_seconds() / 60
+            gaps[index] = min(max(minutes, 0.0), MAX_SNAPSHOT_GAP_MINUTES)
+        prev = times[index]
+    
+    return gaps
+
+
+def _accumulate_rollups(rollups: Dict, bucket_format: str, captured_at: datetime,
+                        gap: float, items: List[Dict], ids: List[int]):
+    """把一个快照累加到 {(word_id, bucket): [samples, min, max, sum, max_hot, minutes]}"""
+    bucket = captured_at.strftime(bucket_format)
+    for item, word_id in zip(items, ids):
+        get = item.get
+        position = get('position', 0)
+        hot_value = get('hot_value', 0)
+        key = (word_id, bucket)
+        agg = rollups.get(key)
+        if agg is None:
+            rollups[key] = [1, position, position, position, hot_value, gap]
+        else:
+            agg[0] += 1
+            agg[1] = min(agg[1], position)
+            agg[2] = max(agg[2], position)
+            agg[3] += position
+            agg[4] = max(agg[4], hot_value)
+            agg[5] += gap
+
+
+def _write_rollups(cursor, table: str, rollups: Dict):
+    """把累加结果合并写入汇总表"""
+    cursor.executemany(f'''
+        INSERT INTO {table} (word_id, bucket, samples, min_position, max_position,
+                             sum_position, max_hot_value, minutes_on_board)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (word_id, bucket) DO UPDATE SET
+            samples = samples + excluded.samples,
+            min_position = MIN(min_position, excluded.min_position),
+            max_position = MAX(max_position, excluded.max_position),
+            sum_position = sum_position + excluded.sum_position,
+            max_hot_value = MAX(max_hot_value, excluded.max_hot_value),
+            minutes_on_board = minutes_on_board + excluded.minutes_on_board
+    ''', ((*key, *agg) for key, agg in rollups.items()))
+
+
+def _accumulate_lifecycle(lifecycle: Dict, captured_at: datetime, gap: float,
+                          items: List[Dict], ids: List[int]):
+    """把一个快照累加到 {word_id: [first_seen, last_seen, peak_position, peak_hot, minutes, appearances]}"""
+    seen_at = _format_time(captured_at)
+    for item, word_id in zip(items, ids):
+        position = item.get('position', 0) or None
+        hot_value = item.get('hot_value', 0) or 0
+        agg = lifecycle.get(word_id)
+        if agg is None:
+            lifecycle[word_id] = [seen_at, seen_at, position, hot_value, gap, 1]
+        else:
+            agg[0] = min(agg[0], seen_at)
+            agg[1] = max(agg[1], seen_at)
+            if position is not None and (agg[2] is None or position < agg[2]):
+                agg[2] = position
+            agg[3] = max(agg[3], hot_value)
+            agg[4] += gap
+            agg[5] += 1
+
+
+# 生命周期合并规则（MIN 遇到 NULL 返回 NULL，peak_position 先用 COALESCE 补齐）
+_LIFECYCLE_MERGE = '''
+    first_seen = MIN(first_seen, excluded.first_seen),
+    last_seen = MAX(last_seen, excluded.last_seen),
+    peak_position = MIN(COALESCE(peak_position, excluded.peak_position),
+                        COALESCE(excluded.peak_position, peak_position)),
+    peak_hot_value = MAX(peak_hot_value, excluded.peak_hot_value),
+    minutes_on_board = minutes_on_board + excluded.minutes_on_board,
+    appearances = appearances + excluded.appearances
+'''
+
+
+def _write_lifecycle(cursor, lifecycle: Dict):
+    """把累加结果合并写入生命周期表"""
+    cursor.executemany(f'''
+        INSERT INTO topic_lifecycle (word_id, first_seen, last_seen, peak_position,
+                                     peak_hot_value, minutes_on_board, appearances)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (word_id) DO UPDATE SET {_LIFECYCLE_MERGE}
+    ''', ((word_id, *agg) for word_id, agg in lifecycle.items()))
+
+
+def _write_word_stats(cursor, saved: List[tuple]):
+    """更新本批次出现过的词的最后出现时间和峰值热度"""
+    stats = {}
+    for captured_at, _, items, ids in saved:
+        seen_at = _format_time(captured_at)
+        for item, word_id in zip(items, ids):
+            hot_value = item.get('hot_value', 0) or 0
+            current = stats.get(word_id)
+            if current is None:
+                stats[word_id] = [seen_at, hot_value]
+            else:
+                current[0] = max(current[0], seen_at)
+                current[1] = max(current[1], hot_value)
+    
+    cursor.executemany('''
+        UPDATE words SET
+            last_seen_at = MAX(COALESCE(last_seen_at, ''), ?),
+            peak_hot_value = MAX(COALESCE(peak_hot_value, 0), ?)
+        WHERE id = ?
+    ''', ((seen_at, hot_value, word_id) for word_id, (seen_at, hot_value) in stats.items()))
+
+
+def save_snapshots(snapshots: List[Dict]) -> List[int]:
+    """
+    批量保存多个热榜快照（单个事务 + executemany）
+    
+    适用于历史数据回填，也被 save_hot_list 复用。
+    同一事务内增量更新小时/天汇总表和排名变化表。
+    
+    Args:
+        snapshots: 快照列表 [{"captured_at": datetime/str, "items": [...]}, ...]
+                   captured_at 缺省时使用当前时间
+        
+    Returns:
+        快照ID列表（与输入顺序一致，空快照为 -1）
+    """
+    now = datetime.now()
+    snapshots = [
+        {'captured_at': _parse_time(snapshot.get('captured_at') or now),
+         'items': snapshot.get('items') or []}
+        for snapshot in snapshots
+    ]
+    snapshot_ids = []
     
     with get_db_connection() as conn:
         cursor = conn.cursor()
         
-        # 创建快照记录
-        cursor.execute('''
-            INSERT INTO hot_snapshots (captured_at, total_count)
-            VALUES (?, ?)
-        ''', (datetime.now(), len(items)))
-        
-        snapshot_id = cursor.lastrowid
+        word_ids = _intern_words(cursor, snapshots)
+        tag_ids = _intern_tags(cursor, snapshots)
+        gaps = iter(_snapshot_gaps(cursor, [s['captured_at'] for s in snapshots if s['items']]))
+        rollups = {resolution: {} for resolution in ROLLUP_TABLES}
+        lifecycle = {}
+        saved = []
         
-        # 批量插入热搜条目
-        for item in items:
+        for snapshot in snapshots:
+            items = snapshot['items']
+            if not items:
+                snapshot_ids.append(-1)
+                continue
+            
+            captured_at = snapshot['captured_at']
             cursor.execute('''
-                INSERT INTO hot_items (snapshot_id, position, word, hot_value, topic_id, tag, url)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                snapshot_id,
-                item.get('position', 0),
-                item.get('word', ''),
-                item.get('hot_value', 0),
-                item.get('topic_id', ''),
-                item.get('tag', ''),
-                item.get('url', '')
-            ))
+                INSERT INTO hot_snapshots (captured_at, total_count)
+                VALUES (?, ?)
+            ''', (_format_time(captured_at), len(items)))
+            
+            snapshot_id = cursor.lastrowid
+            snapshot_ids.append(snapshot_id)
+            ids = _snapshot_word_ids(items, word_ids)
+            saved.append((captured_at, snapshot_id, items, ids))
+            gap = next(gaps)
+            
+            cursor.executemany('''
+                INSERT INTO hot_items (snapshot_id, word_id, position, hot_value, tag_id)
+                VALUES (?, ?, ?, ?, ?)
+            ''', _item_rows(snapshot_id, items, ids, tag_ids))
+            
+            for resolution, (_, bucket_format) in ROLLUP_TABLES.items():
+                _accumulate_rollups(rollups[resolution], bucket_format, captured_at,
+                                    gap, items, ids)
+            _accumulate_lifecycle(lifecycle, captured_at, gap, items, ids)
+        
+        for resolution, (table, _) in ROLLUP_TABLES.items():
+            _write_rollups(cursor, table, rollups[resolution])
+        
+        _write_deltas(cursor, saved)
+        _write_word_stats(cursor, saved)
+        _write_lifecycle(cursor, lifecycle)
         
         conn.commit()
-        print(f"[数据库] 保存快照 #{snapshot_id}，共 {len(items)} 条记录")
-        return snapshot_id
+    
+    if saved:
+        # 更新状态计数并刷新最新快照缓存
+        from models.status import get_status_counters
+        from models.cache import get_snapshot_cache
+        
+        times = [_format_time(captured_at) for captured_at, _, _, _ in saved]
+        get_status_counters().on_ingest(
+            len(saved), sum(len(items) for _, _, items, _ in saved), min(times), max(times)
+        )
+        get_snapshot_cache().refresh()
+    
+    return snapshot_ids
+
+
+def save_hot_list(items: List[Dict], captured_at: Optional[datetime] = None) -> int:
+    """
+    保存热榜数据到数据库
+    
+    Args:
+        items: 热榜数据列表
+        captured_at: 抓取时间（默认当前时间）
+        
+    Returns:
+        快照ID
+    """
+    if not items:
+        return -1
+    
+    snapshot_id = save_snapshots([{'captured_at': captured_at, 'items': items}])[0]
+    print(f"[数据库] 保存快照 #{snapshot_id}，共 {len(items)} 条记录")
+    return snapshot_id
 
 
 def get_latest_hot_list() -> List[Dict]:
@@ -135,67 +1174,341 @@ def get_latest_hot_list() -> List[Dict]:
         if not snapshot:
             return []
         
-        # 获取该快照的所有热搜
+        return _get_hot_list(cursor, snapshot['id'])
+
+
+def _get_hot_list(cursor, snapshot_id: int) -> List[Dict]:
+    """
+    读取某个快照的全部热搜
+    
+    每条带有 key（word_id；同一快照中重复出现时追加序号），
+    用于在两个快照之间对应同一条目。
+    """
+    cursor.execute('''
+        SELECT i.word_id, i.position, w.word, i.hot_value, w.topic_id, w.topic_key,
+               t.name AS tag, w.url
+        FROM hot_items i
+        JOIN words w ON w.id = i.word_id
+        LEFT JOIN tags t ON t.id = i.tag_id
+        WHERE i.snapshot_id = ?
+        ORDER BY i.position, i.word_id
+    ''', (snapshot_id,))
+    
+    items = []
+    occurrences = {}
+    for row in cursor.fetchall():
+        word_id = row['word_id']
+        seen = occurrences.get(word_id, 0)
+        occurrences[word_id] = seen + 1
+        items.append({
+            'key': f'{word_id}-{seen}' if seen else str(word_id),
+            'position': row['position'],
+            'word': row['word'],
+            'hot_value': row['hot_value'],
+            'topic_id': row['topic_id'],
+            'topic_key': row['topic_key'],
+            'tag': row['tag'],
+            'url': row['url']
+        })
+    
+    return items
+
+
+# 热榜增量中逐快照比较的字段
+HOT_DELTA_FIELDS = ('position', 'hot_value', 'tag')
+
+# 标题、链接等存放在 words 表，两个快照读到的都是当前值，无法直接比较；
+# 话题在 since 之后改过名（meta_changed_at 更新）时整组下发
+HOT_DELTA_WORD_FIELDS = ('word', 'topic_id', 'topic_key', 'url')
+
+
+def get_hot_list_delta(since_id: int, until_id: int,
+                       max_behind: int = HOT_DELTA_MAX_SNAPSHOTS) -> Optional[Dict]:
+    """
+    计算两个快照之间热榜的变化
+    
+    Args:
+        since_id: 客户端当前持有的快照ID
+        until_id: 目标快照ID（通常为最新快照）
+        max_behind: since_id 落后超过该快照数时不再计算增量
+        
+    Returns:
+        {"entered": [完整条目...], "left": [key...], "changed": [{key, 变化的字段...}...]}；
+        since_id 不存在、比 until_id 新或落后太多时返回 None（调用方改为返回完整热榜）
+    """
+    if since_id == until_id:
+        return {'entered': [], 'left': [], 'changed': []}
+    
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        
         cursor.execute('''
-            SELECT position, word, hot_value, topic_id, tag, url
-            FROM hot_items
-            WHERE snapshot_id = ?
-            ORDER BY position
-        ''', (snapshot['id'],))
+            SELECT id, captured_at FROM hot_snapshots WHERE id IN (?, ?)
+        ''', (since_id, until_id))
+        times = {row['id']: row['captured_at'] for row in cursor.fetchall()}
+        if len(times) < 2 or times[since_id] >= times[until_id]:
+            return None
         
-        items = []
-        for row in cursor.fetchall():
-            items.append({
-                'position': row['position'],
-                'word': row['word'],
-                'hot_value': row['hot_value'],
-                'topic_id': row['topic_id'],
-                'tag': row['tag'],
-                'url': row['url']
-            })
+        cursor.execute('''
+            SELECT COUNT(*) FROM hot_snapshots
+            WHERE captured_at > ? AND captured_at <= ?
+        ''', (times[since_id], times[until_id]))
+        if cursor.fetchone()[0] > max_behind:
+            return None
+        
+        old = {item['key']: item for item in _get_hot_list(cursor, since_id)}
+        new = _get_hot_list(cursor, until_id)
         
-        return items
+        word_ids = list({int(item['key'].split('-')[0]) for item in new})
+        renamed = set()
+        for chunk in _chunks(word_ids):
+            cursor.execute(f'''
+                SELECT id FROM words
+                WHERE id IN ({','.join('?' * len(chunk))}) AND meta_changed_at > ?
+            ''', (*chunk, times[since_id]))
+            renamed.update(str(row['id']) for row in cursor.fetchall())
+    
+    entered = []
+    changed = []
+    for item in new:
+        prev = old.pop(item['key'], None)
+        if prev is None:
+            entered.append(item)
+            continue
+        diff = {field: item[field] for field in HOT_DELTA_FIELDS if item[field] != prev[field]}
+        if item['key'].split('-')[0] in renamed:
+            diff.update((field, item[field]) for field in HOT_DELTA_WORD_FIELDS)
+        if diff:
+            diff['key'] = item['key']
+            changed.append(diff)
+    
+    return {'entered': entered, 'left': list(old), 'changed': changed}
 
 
-def get_word_trend(word: str, hours: int = 24) -> List[Dict]:
+def get_word_trend(word: str, hours: int = 24, resolution: str = 'auto') -> List[Dict]:
     """
     获取某个热搜词的热度趋势
     
     Args:
         word: 热搜词
         hours: 查询的小时数
+        resolution: raw/hourly/daily，auto 按时间窗口自动选择
         
     Returns:
         趋势数据列表 [{time, position, hot_value}, ...]
     """
+    return get_word_trends([word], hours, resolution)[word]
+
+
+def pick_trend_resolution(hours: int, resolution: str = 'auto') -> str:
+    """根据时间窗口选择趋势数据的分辨率"""
+    if resolution == 'raw' or resolution in ROLLUP_TABLES:
+        return resolution
+    if hours <= TREND_RAW_MAX_HOURS:
+        return 'raw'
+    if hours <= TREND_HOURLY_MAX_HOURS:
+        return 'hourly'
+    return 'daily'
+
+
+def get_word_trends(words: List[str], hours: int = 24,
+                    resolution: str = 'auto') -> Dict[str, List[Dict]]:
+    """
+    一次查询获取多个热搜词的热度趋势
+    
+    时间窗口较长时读取小时/天汇总表，返回点数与抓取频率无关。
+    汇总数据中 position 为平均排名，hot_value 为区间内最高热度。
+    
+    Args:
+        words: 热搜词列表
+        hours: 查询的小时数
+        resolution: raw/hourly/daily，auto 按时间窗口自动选择
+        
+    Returns:
+        {word: [{time, position, hot_value}, ...]}，没有数据的词对应空列表
+    """
+    trends = {word: [] for word in words}
+    if not trends:
+        return trends
+    
+    resolution = pick_trend_resolution(hours, resolution)
+    
     with get_db_connection() as conn:
         cursor = conn.cursor()
         
-        cursor.execute('''
-            SELECT s.captured_at, i.position, i.hot_value
-            FROM hot_items i
-            JOIN hot_snapshots s ON i.snapshot_id = s.id
-            WHERE i.word = ?
-              AND s.captured_at >= datetime('now', '-' || ? || ' hours')
-            ORDER BY s.captured_at
-        ''', (word, hours))
+        targets = _resolve_word_ids(cursor, list(trends))
+        if not targets:
+            return trends
+        
+        if resolution in ROLLUP_TABLES:
+            return _get_rollup_trends(cursor, trends, targets, hours, *ROLLUP_TABLES[resolution])
         
-        trend = []
+        for chunk in _chunks(list(targets)):
+            cursor.execute(f'''
+                SELECT i.word_id, s.captured_at, i.position, i.hot_value
+                FROM hot_items i
+                JOIN hot_snapshots s ON i.snapshot_id = s.id
+                WHERE i.word_id IN ({','.join('?' * len(chunk))})
+                  AND s.captured_at >= ?
+                ORDER BY s.captured_at
+            ''', (*chunk, _time_ago(hours)))
+            
+            for row in cursor.fetchall():
+                point = {
+                    'time': row['captured_at'],
+                    'position': row['position'],
+                    'hot_value': row['hot_value']
+                }
+                for word in targets[row['word_id']]:
+                    trends[word].append(point)
+        
+        return trends
+
+
+def _resolve_word_ids(cursor, words: List[str]) -> Dict[int, List[str]]:
+    """
+    把标题解析为 word_id（包括改名前的旧标题）
+    
+    Returns:
+        {word_id: [请求中对应的标题, ...]}
+    """
+    targets = {}
+    for chunk in _chunks(words):
+        marks = ','.join('?' * len(chunk))
+        cursor.execute(f'''
+            SELECT id AS word_id, word AS title FROM words WHERE word IN ({marks})
+            UNION
+            SELECT word_id, alias AS title FROM word_aliases WHERE alias IN ({marks})
+        ''', (*chunk, *chunk))
         for row in cursor.fetchall():
-            trend.append({
-                'time': row['captured_at'],
-                'position': row['position'],
-                'hot_value': row['hot_value']
-            })
+            targets.setdefault(row['word_id'], []).append(row['title'])
+    return targets
+
+
+def _get_rollup_trends(cursor, trends: Dict[str, List[Dict]], targets: Dict[int, List[str]],
+                       hours: int, table: str, bucket_format: str) -> Dict[str, List[Dict]]:
+    """从汇总表读取趋势"""
+    start_bucket = (datetime.now() - timedelta(hours=hours)).strftime(bucket_format)
+    
+    for chunk in _chunks(list(targets)):
+        cursor.execute(f'''
+            SELECT r.word_id, r.bucket, r.samples, r.min_position, r.max_position,
+                   r.sum_position, r.max_hot_value, r.minutes_on_board
+            FROM {table} r
+            WHERE r.word_id IN ({','.join('?' * len(chunk))})
+              AND r.bucket >= ?
+            ORDER BY r.bucket
+        ''', (*chunk, start_bucket))
         
-        return trend
+        for row in cursor.fetchall():
+            point = {
+                'time': row['bucket'],
+                'position': round(row['sum_position'] / row['samples']),
+                'hot_value': row['max_hot_value'],
+                'min_position': row['min_position'],
+                'max_position': row['max_position'],
+                'minutes_on_board': round(row['minutes_on_board'], 1)
+            }
+            for word in targets[row['word_id']]:
+                trends[word].append(point)
+    
+    return trends
+
+
+# trigram 分词至少需要 3 个字符，更短的查询按前缀匹配
+SEARCH_MIN_TRIGRAM_CHARS = 3
+
+# 子串匹配时参与排序的候选数量（取最新入库的匹配词）
+SEARCH_CANDIDATES = 2000
+
+# 1-2 个字符的查询无法使用 trigram 索引，子串匹配只扫描最新入库的这么多个词
+SEARCH_SHORT_SCAN_WORDS = 20000
+
+
+def _like_pattern(query: str) -> str:
+    """子串匹配的 LIKE 模式（转义通配符，配合 ESCAPE '\\' 使用）"""
+    return '%' + query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+
+def search_words(query: str, limit: int = 10) -> List[Dict]:
+    """
+    搜索出现过的热搜词（子串匹配，按最近出现时间和峰值热度排序）
+    
+    排序分数 = 峰值热度 / (1 + 距最后出现的天数)，近期的高热度话题排在前面。
+    子串匹配只对最新入库的 SEARCH_CANDIDATES 个匹配词排序，
+    避免常见关键字匹配上万个词时逐个回表。
+    1-2 个字符的查询按前缀匹配全部历史，另在最新入库的 SEARCH_SHORT_SCAN_WORDS 个词中做子串匹配。
+    
+    Args:
+        query: 搜索关键字
+        limit: 返回数量
+        
+    Returns:
+        [{"word", "topic_id", "topic_key", "url", "cover", "last_seen_at", "peak_hot_value"}, ...]
+    """
+    query = query.strip()
+    if not query:
+        return []
+    
+    columns = '''
+        w.word, w.topic_id, w.topic_key, w.url, w.cover, w.last_seen_at, w.peak_hot_value
+    '''
+    score = '''
+        COALESCE(w.peak_hot_value, 0) /
+        (1.0 + COALESCE(julianday(?) - julianday(w.last_seen_at), 365))
+    '''
+    now = _format_time(datetime.now())
+    
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        
+        if len(query) < SEARCH_MIN_TRIGRAM_CHARS:
+            # 前缀范围走 idx_words_search；子串匹配按 rowid 范围限定在最新入库的词中，扫描量有上限
+            cursor.execute(f'''
+                SELECT {columns} FROM words w
+                WHERE w.id IN (
+                    SELECT id FROM words INDEXED BY idx_words_search
+                    WHERE word >= ? AND word < ?
+                    UNION
+                    SELECT id FROM words
+                    WHERE id > (SELECT MAX(id) FROM words) - ?
+                      AND word LIKE ? ESCAPE '\\'
+                )
+                ORDER BY {score} DESC
+                LIMIT ?
+            ''', (query, query + '\U0010ffff', SEARCH_SHORT_SCAN_WORDS, _like_pattern(query),
+                  now, limit))
+        else:
+            try:
+                cursor.execute(f'''
+                    SELECT {columns} FROM words w
+                    WHERE w.id IN (
+                        SELECT rowid FROM words_fts
+                        WHERE words_fts MATCH ?
+                        ORDER BY rowid DESC
+                        LIMIT ?
+                    )
+                    ORDER BY {score} DESC
+                    LIMIT ?
+                ''', ('"' + query.replace('"', '""') + '"', SEARCH_CANDIDATES, now, limit))
+            except sqlite3.OperationalError:
+                # 不支持 FTS5 时退化为 LIKE 全表匹配
+                cursor.execute(f'''
+                    SELECT {columns} FROM words w
+                    WHERE w.word LIKE ? ESCAPE '\\'
+                    ORDER BY {score} DESC
+                    LIMIT ?
+                ''', (_like_pattern(query), now, limit))
+        
+        return [dict(row) for row in cursor.fetchall()]
 
 
 def get_rising_topics(limit: int = 10) -> List[Dict]:
     """
     获取上升最快的热点话题
     
-    优先显示排名上升的词条，如果没有则显示热度值增长最多的词条
+    优先显示排名上升的词条，如果没有则显示热度值增长最多的词条。
+    排名变化在入库时已写入 hot_deltas，这里只做一次索引查询。
     """
     with get_db_connection() as conn:
         cursor = conn.cursor()
@@ -211,15 +1524,18 @@ def get_rising_topics(limit: int = 10) -> List[Dict]:
         if len(snapshots) < 2:
             # 快照不足，显示当前热榜前10
             cursor.execute('''
-                SELECT word, position, hot_value, url FROM hot_items
-                WHERE snapshot_id = (SELECT id FROM hot_snapshots ORDER BY captured_at DESC LIMIT 1)
-                ORDER BY position
+                SELECT w.word, w.topic_key, i.position, i.hot_value, w.url
+                FROM hot_items i
+                JOIN words w ON w.id = i.word_id
+                WHERE i.snapshot_id = (SELECT id FROM hot_snapshots ORDER BY captured_at DESC LIMIT 1)
+                ORDER BY i.position
                 LIMIT ?
             ''', (limit,))
             result = []
             for row in cursor.fetchall():
                 result.append({
                     'word': row['word'],
+                    'topic_key': row['topic_key'],
                     'current_position': row['position'],
                     'hot_value': row['hot_value'],
                     'previous_position': None,
@@ -229,71 +1545,219 @@ def get_rising_topics(limit: int = 10) -> List[Dict]:
             return result
         
         latest_id = snapshots[0]['id']
-        prev_id = snapshots[1]['id']
         
         # 2. 先尝试找排名上升的
         cursor.execute('''
-            SELECT 
-                curr.word,
-                curr.position as curr_pos,
-                curr.hot_value as curr_value,
-                prev.position as prev_pos,
-                prev.hot_value as prev_value,
-                (prev.position - curr.position) as rank_change,
-                curr.url
-            FROM hot_items curr
-            LEFT JOIN hot_items prev ON curr.word = prev.word AND prev.snapshot_id = ?
-            WHERE curr.snapshot_id = ?
-              AND (prev.position IS NULL OR prev.position > curr.position)
-            ORDER BY 
-                CASE WHEN prev.position IS NULL THEN 1000 ELSE prev.position - curr.position END DESC
+            SELECT w.word, w.topic_key, d.position, d.hot_value, d.prev_position, w.url
+            FROM hot_deltas d
+            JOIN words w ON w.id = d.word_id
+            WHERE d.snapshot_id = ?
+              AND d.rise_score IS NOT NULL
+            ORDER BY d.rise_score DESC
             LIMIT ?
-        ''', (prev_id, latest_id, limit))
+        ''', (latest_id, limit))
         
         rising = []
         for row in cursor.fetchall():
+            prev_position = row['prev_position']
+            rank_change = prev_position - row['position'] if prev_position is not None else None
             rising.append({
                 'word': row['word'],
-                'current_position': row['curr_pos'],
-                'hot_value': row['curr_value'],
-                'previous_position': row['prev_pos'],
-                'rank_change': row['rank_change'] if row['rank_change'] else 'NEW',
+                'topic_key': row['topic_key'],
+                'current_position': row['position'],
+                'hot_value': row['hot_value'],
+                'previous_position': prev_position,
+                'rank_change': rank_change if rank_change else 'NEW',
                 'url': row['url']
             })
         
         # 3. 如果没有排名上升的，显示热度增长最多的
         if len(rising) == 0:
             cursor.execute('''
-                SELECT 
-                    curr.word,
-                    curr.position as curr_pos,
-                    curr.hot_value as curr_value,
-                    prev.hot_value as prev_value,
-                    (curr.hot_value - COALESCE(prev.hot_value, 0)) as hot_change,
-                    curr.url
-                FROM hot_items curr
-                LEFT JOIN hot_items prev ON curr.word = prev.word AND prev.snapshot_id = ?
-                WHERE curr.snapshot_id = ?
-                ORDER BY hot_change DESC
+                SELECT w.word, w.topic_key, d.position, d.hot_value, d.hot_change, w.url
+                FROM hot_deltas d
+                JOIN words w ON w.id = d.word_id
+                WHERE d.snapshot_id = ?
+                  AND d.hot_change > 0
+                ORDER BY d.hot_change DESC
                 LIMIT ?
-            ''', (prev_id, latest_id, limit))
+            ''', (latest_id, limit))
             
             for row in cursor.fetchall():
-                hot_change = row['hot_change'] or 0
-                # 只显示热度有正增长的
-                if hot_change > 0:
-                    rising.append({
-                        'word': row['word'],
-                        'current_position': row['curr_pos'],
-                        'hot_value': row['curr_value'],
-                        'previous_position': row['curr_pos'],  # 排名相同
-                        'rank_change': f'+{hot_change // 10000}w' if hot_change >= 10000 else f'+{hot_change}',
-                        'url': row['url']
-                    })
+                hot_change = row['hot_change']
+                rising.append({
+                    'word': row['word'],
+                    'topic_key': row['topic_key'],
+                    'current_position': row['position'],
+                    'hot_value': row['hot_value'],
+                    'previous_position': row['position'],  # 排名相同
+                    'rank_change': f'+{hot_change // 10000}w' if hot_change >= 10000 else f'+{hot_change}',
+                    'url': row['url']
+                })
         
         return rising
 
 
+def _lifecycle_row(row) -> Dict:
+    """生命周期查询结果转为接口格式"""
+    return {
+        'word': row['word'],
+        'topic_key': row['topic_key'],
+        'url': row['url'],
+        'first_seen': row['first_seen'],
+        'last_seen': row['last_seen'],
+        'peak_position': row['peak_position'],
+        'peak_hot_value': row['peak_hot_value'],
+        'minutes_on_board': round(row['minutes_on_board'] or 0, 1),
+        'appearances': row['appearances'],
+    }
+
+
+def get_topic_lifecycle(topic: Union[int, str]) -> Optional[Dict]:
+    """
+    获取单个话题的生命周期
+    
+    Args:
+        topic: 话题ID（topic_key）或标题（含改名前的旧标题）
+        
+    Returns:
+        {word, topic_key, first_seen, last_seen, peak_position, ...}，找不到时返回 None
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        
+        word_id = None
+        text = str(topic)
+        # 只把 ASCII 十进制数字当作话题ID（'²' 等 Unicode 数字、超出 64 位的数字按标题查找）
+        if isinstance(topic, int) or (text.isascii() and text.isdecimal() and len(text) <= 18):
+            cursor.execute('SELECT id FROM words WHERE topic_key = ?', (int(topic),))
+            row = cursor.fetchone()
+            word_id = row['id'] if row else None
+        if word_id is None:
+            # 同名标题取最近出现的话题
+            targets = _resolve_word_ids(cursor, [text])
+            if targets:
+                cursor.execute(f'''
+                    SELECT id FROM words WHERE id IN ({','.join('?' * len(targets))})
+                    ORDER BY last_seen_at DESC, id DESC
+                    LIMIT 1
+                ''', list(targets))
+                word_id = cursor.fetchone()['id']
+        if word_id is None:
+            return None
+        
+        cursor.execute('''
+            SELECT w.word, w.topic_key, w.url, l.first_seen, l.last_seen, l.peak_position,
+                   l.peak_hot_value, l.minutes_on_board, l.appearances
+            FROM topic_lifecycle l
+            JOIN words w ON w.id = l.word_id
+            WHERE l.word_id = ?
+        ''', (word_id,))
+        row = cursor.fetchone()
+        return _lifecycle_row(row) if row else None
+
+
+def list_topics(sort: str = 'last_seen', descending: bool = True,
+                limit: int = 50, offset: int = 0) -> List[Dict]:
+    """
+    按生命周期指标排序列出话题（各排序列均有索引）
+    
+    Args:
+        sort: LIFECYCLE_SORT_COLUMNS 中的列名
+        descending: 是否降序
+        limit: 返回数量
+        offset: 跳过的数量
+    """
+    if sort not in LIFECYCLE_SORT_COLUMNS:
+        raise ValueError(f"不支持的排序列: {sort}")
+    direction = 'DESC' if descending else 'ASC'
+    
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        # 没有排名的话题（peak_position 为 NULL）按升序时不排在最前
+        where = 'WHERE l.peak_position IS NOT NULL' if sort == 'peak_position' else ''
+        cursor.execute(f'''
+            SELECT w.word, w.topic_key, w.url, l.first_seen, l.last_seen, l.peak_position,
+                   l.peak_hot_value, l.minutes_on_board, l.appearances
+            FROM topic_lifecycle l
+            JOIN words w ON w.id = l.word_id
+            {where}
+            ORDER BY l.{sort} {direction}, l.word_id {direction}
+            LIMIT ? OFFSET ?
+        ''', (limit, offset))
+        return [_lifecycle_row(row) for row in cursor.fetchall()]
+
+
+def purge_snapshots_before(days: int, batch_size: int = RETENTION_BATCH_SNAPSHOTS,
+                           vacuum_pages: int = RETENTION_VACUUM_PAGES) -> Dict:
+    """
+    分批删除过期快照并增量回收空间
+    
+    每批只删除 batch_size 个快照并立即提交，写锁持有时间很短，
+    不会阻塞抓取任务写入；删除完成后用 incremental_vacuum 分步归还空闲页。
+    
+    Args:
+        days: 保留最近几天的数据
+        batch_size: 每个事务删除的快照数量
+        vacuum_pages: 每步回收的页数
+        
+    Returns:
+        {"snapshots": 删除快照数, "items": 删除条目数, "bytes_reclaimed": 回收字节数,
+         "oldest": 剩余最早的抓取时间}
+    """
+    cutoff = _time_ago(days * 24)
+    deleted_snapshots = 0
+    deleted_items = 0
+    
+    with get_db_connection() as conn:
+        size_before = os.path.getsize(DATABASE_PATH)
+        
+        while True:
+            ids = [row[0] for row in conn.execute('''
+                SELECT id FROM hot_snapshots
+                WHERE captured_at < ?
+                ORDER BY captured_at
+                LIMIT ?
+            ''', (cutoff, batch_size))]
+            if not ids:
+                break
+            
+            placeholders = ','.join('?' * len(ids))
+            cursor = conn.execute(
+                f'DELETE FROM hot_items WHERE snapshot_id IN ({placeholders})', ids
+            )
+            deleted_items += cursor.rowcount
+            conn.execute(f'DELETE FROM hot_deltas WHERE snapshot_id IN ({placeholders})', ids)
+            conn.execute(f'DELETE FROM hot_bursts WHERE snapshot_id IN ({placeholders})', ids)
+            conn.execute(f'DELETE FROM hot_snapshots WHERE id IN ({placeholders})', ids)
+            conn.commit()
+            deleted_snapshots += len(ids)
+            
+            # 让出写锁给抓取任务
+            time.sleep(0)
+        
+        # 分步回收空闲页，每步是一个独立的短事务
+        if conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2:
+            free_pages = conn.execute('PRAGMA freelist_count').fetchone()[0]
+            while free_pages > 0:
+                conn.execute(f'PRAGMA incremental_vacuum({int(vacuum_pages)})').fetchall()
+                remaining = conn.execute('PRAGMA freelist_count').fetchone()[0]
+                if remaining >= free_pages:
+                    break
+                free_pages = remaining
+        
+        conn.execute('PRAGMA wal_checkpoint(PASSIVE)').fetchall()
+        size_after = os.path.getsize(DATABASE_PATH)
+        oldest = conn.execute('SELECT MIN(captured_at) FROM hot_snapshots').fetchone()[0]
+    
+    return {
+        'snapshots': deleted_snapshots,
+        'items': deleted_items,
+        'bytes_reclaimed': max(0, size_before - size_after),
+        'oldest': oldest,
+    }
+
+
 def get_snapshot_history(limit: int = 50) -> List[Dict]:
     """获取快照历史"""
     with get_db_connection() as conn:
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+预渲染响应模块
+
+把接口返回的 JSON 一次性序列化为字节，并同时保存 gzip 和 brotli 压缩结果，
+请求到来时按 Accept-Encoding 直接选用其中一份，不再做序列化和压缩。
+
+brotli 为可选依赖，未安装时只提供 gzip 和未压缩两种编码。
+"""
+
+import gzip
+import hashlib
+import json
+from typing import Dict, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# gzip 压缩级别（每个快照只压缩一次，取较高压缩率）
+GZIP_LEVEL = 9
+
+# brotli 压缩质量（0-11）
+BROTLI_QUALITY = 11
+
+
+class RenderedBody:
+    """一份预渲染的 JSON 响应体及其各编码版本"""
+
+    def __init__(self, payload: Dict):
+        self.raw = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        # mtime=0 保证相同内容的压缩结果相同
+        self.gzip = gzip.compress(self.raw, compresslevel=GZIP_LEVEL, mtime=0)
+        self.br: Optional[bytes] = brotli.compress(self.raw, quality=BROTLI_QUALITY) if brotli else None
+        self.etag = hashlib.md5(self.raw).hexdigest()
+
+    def etags(self) -> Tuple[str, ...]:
+        """各编码版本的 ETag（内容相同，编码不同）"""
+        return (self.etag, f'{self.etag}-gzip', f'{self.etag}-br')
+
+    def select(self, accept_encodings) -> Tuple[bytes, Optional[str], str]:
+        """
+        按 Accept-Encoding 选择编码
+
+        Args:
+            accept_encodings: werkzeug 的 request.accept_encodings
+
+        Returns:
+            (响应体, Content-Encoding 或 None, ETag)
+        """
+        if self.br is not None and accept_encodings['br']:
+            return self.br, 'br', f'{self.etag}-br'
+        if accept_encodings['gzip']:
+            return self.gzip, 'gzip', f'{self.etag}-gzip'
+        return self.raw, None, self.etag
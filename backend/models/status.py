@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+存储状态统计模块
+
+维护快照数、条目数、数据库大小和最早/最新抓取时间等计数器。
+启动后只从数据库加载一次，之后由入库和清理任务增量更新，
+/api/status 直接读取内存中的值。
+"""
+
+import os
+import threading
+from typing import Dict, Optional
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models import database
+
+
+class StatusCounters:
+    """数据库存储状态的运行计数器"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.snapshot_count = 0
+        self.item_count = 0
+        self.db_size_bytes = 0
+        self.oldest_capture: Optional[str] = None
+        self.newest_capture: Optional[str] = None
+
+    def _ensure_loaded(self):
+        """首次访问时从数据库加载初始值"""
+        if self._loaded:
+            return
+
+        with database.get_db_connection() as conn:
+            row = conn.execute('''
+                SELECT COUNT(*) AS snapshots,
+                       COALESCE(SUM(total_count), 0) AS items,
+                       MIN(captured_at) AS oldest,
+                       MAX(captured_at) AS newest
+                FROM hot_snapshots
+            ''').fetchone()
+
+        self.snapshot_count = row['snapshots']
+        self.item_count = row['items']
+        self.oldest_capture = row['oldest']
+        self.newest_capture = row['newest']
+        self.db_size_bytes = self._measure_db_size()
+        self._loaded = True
+
+    @staticmethod
+    def _measure_db_size() -> int:
+        """数据库文件大小（含 WAL 文件）"""
+        size = 0
+        for path in (database.DATABASE_PATH, database.DATABASE_PATH + '-wal'):
+            if os.path.exists(path):
+                size += os.path.getsize(path)
+        return size
+
+    def on_ingest(self, snapshots: int, items: int, oldest: str, newest: str):
+        """新快照入库后更新计数"""
+        with self._lock:
+            if not self._loaded:
+                self._ensure_loaded()
+                return
+            self.snapshot_count += snapshots
+            self.item_count += items
+            if self.oldest_capture is None or oldest < self.oldest_capture:
+                self.oldest_capture = oldest
+            if self.newest_capture is None or newest > self.newest_capture:
+                self.newest_capture = newest
+            self.db_size_bytes = self._measure_db_size()
+
+    def on_cleanup(self, snapshots: int, items: int, oldest: Optional[str]):
+        """清理过期快照后更新计数"""
+        with self._lock:
+            if not self._loaded:
+                self._ensure_loaded()
+                return
+            self.snapshot_count = max(0, self.snapshot_count - snapshots)
+            self.item_count = max(0, self.item_count - items)
+            self.oldest_capture = oldest
+            if self.snapshot_count == 0:
+                self.newest_capture = None
+            self.db_size_bytes = self._measure_db_size()
+
+    def reset(self):
+        """丢弃计数，下次访问时重新从数据库加载"""
+        with self._lock:
+            self._loaded = False
+
+    def get_status(self) -> Dict:
+        """当前存储状态"""
+        with self._lock:
+            self._ensure_loaded()
+            return {
+                'snapshot_count': self.snapshot_count,
+                'item_count': self.item_count,
+                'db_size_bytes': self.db_size_bytes,
+                'oldest_capture': self.oldest_capture,
+                'newest_capture': self.newest_capture,
+            }
+
+
+# 全局计数器实例
+_status_counters = StatusCounters()
+
+
+def get_status_counters() -> StatusCounters:
+    """获取全局状态计数器"""
+    return _status_counters
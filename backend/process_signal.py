@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+进程间通知模块
+
+多个进程同时运行时（python run.py worker + serve，或多个 all），
+各进程只通过 SQLite 数据库和 data/ 目录下的几个小文件协作：
+
+- worker.signal:   抓取进程每次入库或清理后重写，其他 Web 进程据此刷新缓存并推送 SSE 事件
+- refresh.request: 非抓取进程收到 /api/refresh 后写入，抓取进程立即抓取一次
+- settings.json:   运行调度器的进程监听修改，重新加载设置并调整抓取间隔
+
+文件先写临时文件再 os.replace 原子替换；监听方每 SIGNAL_POLL_SECONDS 秒 stat 一次，
+修改时间、大小或 inode 变化即视为新通知。
+"""
+
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from config import DATA_DIR, SIGNAL_POLL_SECONDS
+
+
+WORKER_SIGNAL_FILE = os.path.join(DATA_DIR, 'worker.signal')
+REFRESH_REQUEST_FILE = os.path.join(DATA_DIR, 'refresh.request')
+
+
+class SignalFile:
+    """一个通过整体替换传递最新状态的小文件"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._stamp = self._stat()
+
+    def _stat(self) -> Optional[Tuple]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def write(self, data: Dict):
+        """原子写入（读方看到的要么是旧内容，要么是完整的新内容）"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def read(self) -> Optional[Dict]:
+        """读取当前内容，文件不存在或内容无效时返回 None"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def changed(self) -> bool:
+        """自上次检查以来文件是否被替换或修改"""
+        stamp = self._stat()
+        if stamp is None or stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        return True
+
+
+class SignalWatcher:
+    """在一个后台线程中轮询多个通知文件"""
+
+    def __init__(self, interval: float = SIGNAL_POLL_SECONDS):
+        self.interval = interval
+        self._watches: List[Tuple[SignalFile, Callable[[], None]]] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, path: str, callback: Callable[[], None]):
+        """文件变化时调用 callback（在监听线程中执行），登记前已存在的内容不会触发"""
+        with self._lock:
+            self._watches.append((SignalFile(path), callback))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='signal-watcher', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                watches = list(self._watches)
+            for signal, callback in watches:
+                if signal.changed():
+                    try:
+                        callback()
+                    except Exception as e:
+                        print(f"[进程通知] 处理 {os.path.basename(signal.path)} 失败: {e}")
+            time.sleep(self.interval)
+
+
+# ==================== 抓取进程 ====================
+
+_worker_state: Dict = {'snapshot': None, 'scraper_stats': None}
+
+
+def notify_web(snapshot: Optional[Dict] = None, scraper_stats: Optional[Dict] = None):
+    """
+    通知 Web 进程数据库已变化（新快照入库或过期数据被清理）
+
+    Args:
+        snapshot: 新快照事件（与 /api/stream 推送的 data 相同），清理时为 None
+        scraper_stats: 抓取器统计，供 Web 进程的 /api/status 显示
+    """
+    if snapshot is not None:
+        _worker_state['snapshot'] = snapshot
+    if scraper_stats is not None:
+        _worker_state['scraper_stats'] = scraper_stats
+    SignalFile(WORKER_SIGNAL_FILE).write({
+        **_worker_state,
+        'pid': os.getpid(),
+        'time': datetime.now().isoformat(' ', 'seconds'),
+    })
+
+
+# ==================== Web 进程 ====================
+
+_watcher = SignalWatcher()
+_worker_status: Optional[Dict] = None
+
+
+def get_signal_watcher() -> SignalWatcher:
+    """获取全局监听实例"""
+    return _watcher
+
+
+def request_refresh():
+    """请求抓取进程立即抓取一次"""
+    SignalFile(REFRESH_REQUEST_FILE).write({
+        'pid': os.getpid(),
+        'time': datetime.now().isoformat(' ', 'seconds'),
+    })
+
+
+def get_worker_status() -> Optional[Dict]:
+    """抓取进程最近一次通知的内容（未收到过通知时为 None）"""
+    return _worker_status
+
+
+def watch_worker():
+    """Web 进程：收到其他进程的抓取通知后刷新缓存和计数器，并推送新快照事件"""
+    from models.status import get_status_counters
+    from models.cache import get_snapshot_cache
+    from snapshot_events import get_snapshot_events
+
+    signal = SignalFile(WORKER_SIGNAL_FILE)
+    last = signal.read() or {}
+    published = [(last.get('snapshot') or {}).get('snapshot_id')]
+
+    def on_signal():
+        global _worker_status
+        payload = signal.read()
+        if payload is None:
+            return
+        _worker_status = payload
+        if payload.get('pid') == os.getpid():
+            # 本进程自己的抓取，入库时已刷新缓存并推送
+            published[0] = (payload.get('snapshot') or {}).get('snapshot_id')
+            return
+
+        # 计数器从数据库重新加载，缓存按最新快照重建
+        get_status_counters().reset()
+        get_snapshot_cache().refresh()
+
+        snapshot = payload.get('snapshot')
+        if snapshot and snapshot.get('snapshot_id') != published[0]:
+            published[0] = snapshot.get('snapshot_id')
+            get_snapshot_events().publish(snapshot)
+
+    _watcher.watch(WORKER_SIGNAL_FILE, on_signal)
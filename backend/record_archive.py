@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+历史记录归档模块
+
+把某一天的所有 JSON 快照压缩为一个列式归档文件（records/<日期>.dyca）：
+
+    MAGIC | 头部长度(uint32) | 头部 JSON | 列数据块...
+
+头部保存每个快照的元数据、当天出现过的条目模板（去掉 position/hot_value 后的字典）
+以及各列数据块的位置。条目按快照顺序展开为三列：
+    item_id   (uint32)  条目模板编号
+    position  (int32)   与同一模板上一次出现时的差值
+    hot_value (int64)   与同一模板上一次出现时的差值
+每列独立 zlib 压缩，读取时通过 mmap 直接解压对应区间，
+还原出的记录与原 JSON 文件内容完全一致。
+"""
+
+import os
+import sys
+import json
+import mmap
+import zlib
+import struct
+from array import array
+from typing import Dict, Iterator, List, Optional
+
+
+MAGIC = b'DYCA1\n'
+ARCHIVE_SUFFIX = '.dyca'
+
+# 列名 -> array 类型码
+COLUMNS = {
+    'item_id': 'I',
+    'position': 'i',
+    'hot_value': 'q',
+}
+
+# 按快照变化、需要单独存储的字段
+VALUE_FIELDS = ('position', 'hot_value')
+
+
+def archive_path_for(records_dir: str, date: str) -> str:
+    """某天归档文件的路径"""
+    return os.path.join(records_dir, date + ARCHIVE_SUFFIX)
+
+
+def _to_bytes(values: array) -> bytes:
+    """数组统一按小端序写入"""
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_bytes(typecode: str, data: bytes) -> array:
+    """从小端序字节还原数组"""
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def write_day_archive(records: List[Dict], path: str) -> int:
+    """
+    把一天的快照记录写成归档文件
+
+    Args:
+        records: get_records_for_date 返回的记录列表（含 filename）
+        path: 归档文件路径
+
+    Returns:
+        归档文件大小（字节）
+    """
+    templates = []
+    template_ids = {}
+    metas = []
+    columns = {name: array(typecode) for name, typecode in COLUMNS.items()}
+    last_values = {}
+
+    for record in records:
+        data = record.get('data', [])
+        # 保留原始键顺序，data 位置用占位符
+        metas.append({key: (None if key == 'data' else value) for key, value in record.items()})
+
+        for item in data:
+            template = {key: (None if key in VALUE_FIELDS else value) for key, value in item.items()}
+            key = json.dumps(template, ensure_ascii=False, sort_keys=False)
+            item_id = template_ids.get(key)
+            if item_id is None:
+                item_id = template_ids[key] = len(templates)
+                templates.append(template)
+
+            position = item.get('position') or 0
+            hot_value = item.get('hot_value') or 0
+            last_position, last_hot_value = last_values.get(item_id, (0, 0))
+            last_values[item_id] = (position, hot_value)
+
+            columns['item_id'].append(item_id)
+            columns['position'].append(position - last_position)
+            columns['hot_value'].append(hot_value - last_hot_value)
+
+    blobs = []
+    column_index = {}
+    offset = 0
+    for name, values in columns.items():
+        blob = zlib.compress(_to_bytes(values), 9)
+        column_index[name] = [offset, len(blob), len(values)]
+        blobs.append(blob)
+        offset += len(blob)
+
+    header = json.dumps({
+        'version': 1,
+        'records': metas,
+        'counts': [len(record.get('data', [])) for record in records],
+        'templates': templates,
+        'columns': column_index,
+    }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    header = zlib.compress(header, 9)
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<I', len(header)))
+        f.write(header)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp_path, path)
+
+    return os.path.getsize(path)
+
+
+def _load_columns(path: str):
+    """读取头部并解压三列数据"""
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                if bytes(view[:len(MAGIC)]) != MAGIC:
+                    raise ValueError(f"不是有效的归档文件: {path}")
+
+                pos = len(MAGIC)
+                (header_len,) = struct.unpack_from('<I', view, pos)
+                pos += 4
+                header = json.loads(zlib.decompress(view[pos:pos + header_len]))
+                data_start = pos + header_len
+
+                columns = {}
+                for name, (offset, length, _) in header['columns'].items():
+                    start = data_start + offset
+                    columns[name] = _from_bytes(
+                        COLUMNS[name], zlib.decompress(view[start:start + length])
+                    )
+            finally:
+                view.release()
+    return header, columns
+
+
+def iter_day_archive(path: str, after: Optional[str] = None) -> Iterator[Dict]:
+    """
+    逐条还原归档中的快照记录
+
+    Args:
+        path: 归档文件路径
+        after: 只返回文件名大于该值的记录（分页游标）
+
+    头部和列数据在调用时立即读取（文件损坏时直接抛出异常），
+    记录字典按需逐条生成。
+    """
+    header, columns = _load_columns(path)
+    return _iter_records(header, columns, after)
+
+
+def _iter_records(header: Dict, columns: Dict, after: Optional[str]) -> Iterator[Dict]:
+    """按列数据依次还原每条记录"""
+    templates = header['templates']
+    item_ids = columns['item_id']
+    positions = columns['position']
+    hot_values = columns['hot_value']
+    last_values = {}
+
+    index = 0
+    for meta, count in zip(header['records'], header['counts']):
+        # 游标之前的记录只推进差值状态，不构造字典
+        skip = after is not None and meta.get('filename', '') <= after
+        data = []
+        for _ in range(count):
+            item_id = item_ids[index]
+            last_position, last_hot_value = last_values.get(item_id, (0, 0))
+            position = last_position + positions[index]
+            hot_value = last_hot_value + hot_values[index]
+            last_values[item_id] = (position, hot_value)
+            index += 1
+
+            if skip:
+                continue
+            item = dict(templates[item_id])
+            if 'position' in item:
+                item['position'] = position
+            if 'hot_value' in item:
+                item['hot_value'] = hot_value
+            data.append(item)
+
+        if skip:
+            continue
+        record = dict(meta)
+        record['data'] = data
+        yield record
+
+
+def read_day_archive(path: str) -> List[Dict]:
+    """
+    读取归档文件，返回与 get_records_for_date 相同格式的记录列表
+    """
+    return list(iter_day_archive(path))
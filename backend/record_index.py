@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""
+历史记录倒排索引模块
+
+为每天的快照记录维护一个倒排索引文件（records/<日期>.idx）：
+
+    {
+        "version": 1,
+        "signature": [...],                       # 数据源签名，用于判断索引是否过期
+        "records": [[文件名, 时间戳], ...],
+        "words": {热搜词: [[记录序号, 排名, 热度值], ...]}
+    }
+
+save_record_snapshot 写入新快照时只把这一条的倒排条目追加到 records/<日期>.idx.log，
+每行一个 JSON 数组 [文件名, 时间戳, 数据源签名, [[热搜词, 排名, 热度值], ...]]，
+读取时在 .idx 之后依次重放；.idx 只在归档或索引缺失、过期重建时整体重写（同时删除 .log）。
+查询某个热搜词的历史只读取索引中的对应条目，不再逐个解析快照文件。
+"""
+
+import os
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = '.idx'
+INDEX_LOG_SUFFIX = '.log'
+
+# 内存中缓存的索引天数
+INDEX_CACHE_DAYS = 16
+
+
+def index_path_for(records_dir: str, date: str) -> str:
+    """某天索引文件的路径"""
+    return os.path.join(records_dir, date + INDEX_SUFFIX)
+
+
+def _log_path(index_path: str) -> str:
+    """索引追加日志的路径（<日期>.idx.log）"""
+    return index_path + INDEX_LOG_SUFFIX
+
+
+def source_signature(records_dir: str, date: str) -> Optional[list]:
+    """
+    某天数据源的签名（与 get_records_for_date 的读取顺序一致：优先归档文件）
+
+    新增快照文件或生成归档后签名都会变化。
+    """
+    from record_archive import archive_path_for
+
+    archive_path = archive_path_for(records_dir, date)
+    if os.path.exists(archive_path):
+        stat = os.stat(archive_path)
+        return ['archive', stat.st_size, stat.st_mtime_ns]
+
+    date_dir = os.path.join(records_dir, date)
+    if os.path.isdir(date_dir):
+        count = sum(1 for name in os.listdir(date_dir) if name.endswith('.json'))
+        return ['json', count, os.stat(date_dir).st_mtime_ns]
+
+    return None
+
+
+def build_day_index(records: List[Dict]) -> Dict:
+    """从一天的快照记录构建倒排索引"""
+    index = {'version': INDEX_VERSION, 'signature': None, 'records': [], 'words': {}}
+    for record in records:
+        _add_record(index, record.get('filename', ''), record.get('timestamp'),
+                    _record_postings(record), replace=False)
+    return index
+
+
+def _record_postings(record: Dict) -> List[list]:
+    """一条快照记录的倒排条目 [[热搜词, 排名, 热度值], ...]"""
+    postings = []
+    seen = set()
+    for item in record.get('data', []):
+        word = item.get('word')
+        # 与逐条扫描保持一致：同一快照中只取第一次出现
+        if word is None or word in seen:
+            continue
+        seen.add(word)
+        postings.append([word, item.get('position', 0), item.get('hot_value', 0)])
+    return postings
+
+
+def _add_record(index: Dict, filename: str, timestamp: Optional[str], postings: List[list],
+                replace: bool = True):
+    """把一条快照记录的倒排条目加入索引（replace 时同名文件被覆盖会先移除旧条目）"""
+    records = index['records']
+    words = index['words']
+
+    slot = None
+    if replace and filename:
+        for i, (name, _) in enumerate(records):
+            if name == filename:
+                slot = i
+                break
+
+    if slot is None:
+        slot = len(records)
+        records.append([filename, timestamp])
+    else:
+        records[slot][1] = timestamp
+        for word in list(words):
+            kept = [p for p in words[word] if p[0] != slot]
+            if kept:
+                words[word] = kept
+            else:
+                del words[word]
+
+    for word, position, hot_value in postings:
+        words.setdefault(word, []).append([slot, position, hot_value])
+
+
+class RecordIndex:
+    """按天管理倒排索引文件及其内存缓存"""
+
+    def __init__(self):
+        self._cache: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, path: str, index: Dict):
+        """放入内存缓存，超出容量时淘汰最久未用的日期"""
+        self._cache[path] = index
+        self._cache.move_to_end(path)
+        while len(self._cache) > INDEX_CACHE_DAYS:
+            self._cache.popitem(last=False)
+
+    def _write(self, path: str, index: Dict):
+        """原子写入索引文件，追加日志中的条目已包含在内，一并删除"""
+        tmp_path = path + '.tmp'
+        # json.dumps 走 C 编码器，比直接 json.dump 到文件快一个数量级
+        data = json.dumps(index, ensure_ascii=False, separators=(',', ':'))
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        if os.path.exists(_log_path(path)):
+            os.remove(_log_path(path))
+
+    def _append(self, path: str, entry: list):
+        """在追加日志末尾写入一条记录的倒排条目（一次 write 写完整行）"""
+        line = json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n'
+        with open(_log_path(path), 'a', encoding='utf-8') as f:
+            f.write(line)
+
+    def _read(self, path: str) -> Optional[Dict]:
+        """读取索引文件并重放追加日志，格式不符时返回 None"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (IOError, ValueError):
+            return None
+        if not isinstance(index, dict) or index.get('version') != INDEX_VERSION:
+            return None
+
+        try:
+            with open(_log_path(path), 'r', encoding='utf-8') as f:
+                for line in f:
+                    if not line.endswith('\n'):
+                        # 正在写入的行：签名停在上一行，与数据源不符时会整体重建
+                        break
+                    filename, timestamp, signature, postings = json.loads(line)
+                    _add_record(index, filename, timestamp, postings)
+                    index['signature'] = signature
+        except FileNotFoundError:
+            pass
+        except (IOError, ValueError, TypeError):
+            return None
+        return index
+
+    def _load(self, records_dir: str, date: str,
+              load_records: Callable[[str], List[Dict]]) -> Optional[Dict]:
+        """获取某天的有效索引，缺失或过期时重建"""
+        signature = source_signature(records_dir, date)
+        if signature is None:
+            return None
+
+        path = index_path_for(records_dir, date)
+        index = self._cache.get(path)
+        if index is None or index['signature'] != signature:
+            index = self._read(path)
+
+        if index is None or index['signature'] != signature:
+            # 签名在读取前取得：读取期间有新文件写入时签名落后，下次查询会再次重建
+            index = build_day_index(load_records(date))
+            index['signature'] = signature
+            try:
+                self._write(path, index)
+            except IOError as e:
+                print(f"[索引] 写入失败 {date}: {e}")
+
+        self._remember(path, index)
+        return index
+
+    def add_record(self, records_dir: str, date: str, filename: str, record: Dict,
+                   load_records: Callable[[str], List[Dict]]):
+        """
+        新快照文件写入后追加索引
+
+        索引原本就是最新的，只把这一条追加到日志，不重写整天的索引文件；
+        否则整天重建（已包含新文件）。
+        """
+        with self._lock:
+            path = index_path_for(records_dir, date)
+            index = self._cache.get(path) or self._read(path)
+            signature = source_signature(records_dir, date)
+
+            if index is None or not self._is_previous(index['signature'], signature, filename, records_dir, date):
+                self._cache.pop(path, None)
+                self._load(records_dir, date, load_records)
+                return
+
+            timestamp = record.get('timestamp')
+            postings = _record_postings(record)
+            self._append(path, [filename, timestamp, signature, postings])
+            _add_record(index, filename, timestamp, postings)
+            index['signature'] = signature
+            self._remember(path, index)
+
+    @staticmethod
+    def _is_previous(old: Optional[list], new: Optional[list], filename: str,
+                     records_dir: str, date: str) -> bool:
+        """判断索引是否恰好落后于刚写入的这一个文件"""
+        if not old or not new or old[0] != 'json' or new[0] != 'json':
+            return False
+        if new[1] == old[1] + 1:
+            return True
+        # 覆盖了同名文件：文件数不变
+        return new[1] == old[1] and os.path.exists(os.path.join(records_dir, date, filename))
+
+    def rebuild(self, records_dir: str, date: str, records: List[Dict]):
+        """用已读取的记录重建某天的索引（归档后调用，避免再次读取）"""
+        with self._lock:
+            path = index_path_for(records_dir, date)
+            index = build_day_index(records)
+            index['signature'] = source_signature(records_dir, date)
+            self._write(path, index)
+            self._remember(path, index)
+
+    def lookup(self, records_dir: str, date: str, word: str,
+               load_records: Callable[[str], List[Dict]]) -> List[Dict]:
+        """某个热搜词在某天的全部出现记录 [{timestamp, position, hot_value}, ...]"""
+        with self._lock:
+            index = self._load(records_dir, date, load_records)
+        if index is None:
+            return []
+
+        records = index['records']
+        return [
+            {'timestamp': records[slot][1], 'position': position, 'hot_value': hot_value}
+            for slot, position, hot_value in index['words'].get(word, [])
+        ]
+
+    def forget(self, records_dir: str, date: str):
+        """删除某天的索引文件、追加日志和缓存"""
+        with self._lock:
+            path = index_path_for(records_dir, date)
+            self._cache.pop(path, None)
+            for file_path in (path, _log_path(path)):
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+
+
+# 全局索引实例
+_record_index = RecordIndex()
+
+
+def get_record_index() -> RecordIndex:
+    """获取全局索引实例"""
+    return _record_index
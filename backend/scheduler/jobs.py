@@ -4,19 +4,32 @@
 
 使用 APScheduler 定时抓取抖音热榜数据。
 支持动态调整抓取间隔。
+
+多个进程都启动调度器时，只有通过数据库租约当选的进程（scheduler/leader.py）
+恢复调度器执行任务，其余进程的调度器保持暂停，持有者退出后自动接管。
 """
 
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from scraper.unified_scraper import get_unified_scraper
-from models.database import save_hot_list, init_database
-from settings_manager import load_settings, save_record_snapshot, cleanup_old_records
+from models.database import (
+    save_hot_list, init_database, get_snapshot_history, _parse_time, convert_to_incremental_vacuum
+)
+from models.bursts import detect_bursts
+from settings_manager import (
+    load_settings, reload_settings, save_record_snapshot, cleanup_old_records, compact_old_records,
+    SETTINGS_FILE
+)
+from snapshot_events import get_snapshot_events
+from process_signal import notify_web, request_refresh, get_signal_watcher, REFRESH_REQUEST_FILE
+from scheduler.leader import get_leader_election
+from config import RETENTION_INTERVAL_MINUTES
 
 
 # 全局调度器实例
@@ -32,10 +45,31 @@ def scrape_job():
         unified_scraper = get_unified_scraper()
         result = unified_scraper.fetch_hot_list()
         
+        # 抓取期间租约可能已被其他进程接管，入库前再确认一次
+        if not get_leader_election().confirm():
+            print("[任务跳过] 当前进程已不是抓取进程，丢弃本次结果")
+            return
+        
         if result['success'] and result['data']:
             # 保存到数据库
             snapshot_id = save_hot_list(result['data'])
             
+            # 增量突发检测（失败不影响快照保存）
+            try:
+                detect_bursts(snapshot_id)
+            except Exception as e:
+                print(f"[突发检测错误] {e}")
+            
+            # 通知本进程 /api/stream 的所有连接，并经由通知文件转给其他 Web 进程
+            event = {
+                'snapshot_id': snapshot_id,
+                'count': len(result['data']),
+                'method': result['method'],
+                'time': datetime.now().isoformat(' ', 'seconds'),
+            }
+            get_snapshot_events().publish(event)
+            notify_web(event, unified_scraper.get_stats())
+            
             # 保存 JSON 快照文件
             save_record_snapshot(result['data'], result['method'])
             
@@ -46,9 +80,6 @@ def scrape_job():
             stats = unified_scraper.get_stats()
             print(f"[统计] API成功率: {stats['api']['success_rate']:.1f}%, "
                   f"HTML成功率: {stats['html']['success_rate']:.1f}%")
-            
-            # 清理过期记录
-            cleanup_old_records()
         else:
             error_msg = result.get('error', '未知错误')
             print(f"[任务警告] 抓取失败: {error_msg}")
@@ -57,8 +88,81 @@ def scrape_job():
         print(f"[任务错误] {e}")
 
 
+def retention_job():
+    """过期数据清理和冷数据归档任务（独立于抓取任务运行，避免阻塞抓取）"""
+    try:
+        # 只在抓取进程中执行：旧数据库一次性转换为增量回收模式（同时回收旧表占用的空间）
+        convert_to_incremental_vacuum()
+    except Exception as e:
+        print(f"[数据库] 转换增量回收模式失败: {e}")
+    
+    try:
+        report = cleanup_old_records()
+        if report.get('snapshots'):
+            notify_web()
+    except Exception as e:
+        print(f"[清理错误] {e}")
+    
+    try:
+        compact_old_records()
+    except Exception as e:
+        print(f"[归档错误] {e}")
+
+
+def _scrape_due() -> bool:
+    """距最新快照是否已超过一个抓取间隔（接管时据此决定是否立即抓取）"""
+    history = get_snapshot_history(1)
+    if not history:
+        return True
+    latest = _parse_time(history[0]['captured_at'])
+    return datetime.now() - latest >= timedelta(minutes=_current_interval)
+
+
+def _on_elected():
+    """当选为抓取进程：按需立即抓取一次，执行一次清理，然后恢复定时任务"""
+    if _scrape_due():
+        scheduler.add_job(
+            scrape_job,
+            id='douyin_scrape_initial',
+            name='初始抓取任务',
+            replace_existing=True
+        )
+    scheduler.modify_job('douyin_retention', next_run_time=datetime.now())
+    scheduler.resume()
+    print(f"[调度器] 开始执行定时任务，抓取间隔: {_current_interval} 分钟")
+
+
+def _on_demoted():
+    """租约被其他进程接管：暂停定时任务"""
+    scheduler.pause()
+    print("[调度器] 已暂停，由其他进程执行抓取")
+
+
+def _on_refresh_request():
+    """其他进程请求立即抓取（只由抓取进程执行）"""
+    if not get_leader_election().is_leader:
+        return
+    scheduler.add_job(
+        scrape_job,
+        id='douyin_scrape_manual',
+        name='手动抓取任务',
+        replace_existing=True
+    )
+
+
+def _on_settings_changed():
+    """其他进程修改了设置：重新加载并调整抓取间隔"""
+    settings = reload_settings()
+    update_scheduler_interval(settings.get('scrape_interval_minutes', 10))
+
+
 def start_scheduler():
-    """启动调度器"""
+    """
+    启动调度器
+    
+    调度器以暂停状态启动，当选为抓取进程后才恢复执行；
+    同时监听手动抓取请求和设置文件的修改。
+    """
     global _current_interval
     
     # 初始化数据库
@@ -77,20 +181,29 @@ def start_scheduler():
         replace_existing=True
     )
     
-    # 启动时立即执行一次
+    # 过期数据清理任务（当选时执行一次）
     scheduler.add_job(
-        scrape_job,
-        id='douyin_scrape_initial',
-        name='初始抓取任务',
-        replace_existing=True
+        retention_job,
+        trigger=IntervalTrigger(minutes=RETENTION_INTERVAL_MINUTES),
+        id='douyin_retention',
+        name='过期数据清理任务',
+        replace_existing=True,
+        coalesce=True
     )
     
-    scheduler.start()
-    print(f"[调度器] 已启动，抓取间隔: {_current_interval} 分钟")
+    scheduler.start(paused=True)
+    print(f"[调度器] 已启动，抓取间隔: {_current_interval} 分钟，等待选主")
+    
+    watcher = get_signal_watcher()
+    watcher.watch(REFRESH_REQUEST_FILE, _on_refresh_request)
+    watcher.watch(SETTINGS_FILE, _on_settings_changed)
+    
+    get_leader_election().start(on_elected=_on_elected, on_demoted=_on_demoted)
 
 
 def stop_scheduler():
-    """停止调度器"""
+    """停止调度器并释放抓取租约"""
+    get_leader_election().stop()
     if scheduler.running:
         scheduler.shutdown()
         print("[调度器] 已停止")
@@ -107,6 +220,10 @@ def update_scheduler_interval(minutes: int):
     if minutes == _current_interval:
         return True
     
+    if not scheduler.running:
+        # 本进程未运行调度器，由运行调度器的进程监听 settings.json 后更新
+        return True
+    
     try:
         scheduler.reschedule_job(
             'douyin_scrape',
@@ -121,8 +238,11 @@ def update_scheduler_interval(minutes: int):
 
 
 def trigger_scrape_now():
-    """立即触发一次抓取"""
-    scrape_job()
+    """立即触发一次抓取（当前进程不是抓取进程时，转交抓取进程执行）"""
+    if get_leader_election().is_leader:
+        scrape_job()
+    else:
+        request_refresh()
 
 
 def get_current_interval() -> int:
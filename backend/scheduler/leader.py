@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+抓取任务选主模块
+
+多个进程都启动调度器时（多个 Web 进程、serve + worker 混合部署等），
+通过数据库 scheduler_lease 表中的一行租约选出唯一的抓取进程：
+
+- 每个进程每 LEADER_RENEW_SECONDS 秒执行一次 UPSERT，
+  租约属于自己或已过期时写入自己的标识和新的过期时间，否则保持不变；
+- 持有租约的进程恢复调度器，其余进程的调度器保持暂停；
+- 持有者退出时主动删除租约，其他进程在下一次尝试时接管；
+  异常退出时租约在 LEADER_LEASE_SECONDS 秒后过期，同样自动接管。
+
+抓取结果入库前再确认一次租约（confirm），避免续约中断期间两个进程同时写入。
+"""
+
+import atexit
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Optional
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import LEADER_LEASE_SECONDS, LEADER_RENEW_SECONDS
+from models.database import get_db_connection
+
+
+class LeaderElection:
+    """基于数据库租约的选主"""
+
+    def __init__(self, name: str = 'scrape',
+                 lease_seconds: float = LEADER_LEASE_SECONDS,
+                 renew_seconds: float = LEADER_RENEW_SECONDS):
+        self.name = name
+        self.lease_seconds = lease_seconds
+        self.renew_seconds = renew_seconds
+        self.holder_id = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        self._leader = False
+        self._expires_at = 0.0
+        self._current_holder: Optional[str] = None
+        self._on_elected: Optional[Callable[[], None]] = None
+        self._on_demoted: Optional[Callable[[], None]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_leader(self) -> bool:
+        """当前进程是否持有未过期的租约（按本地记录的过期时间判断，不访问数据库）"""
+        return self._leader and time.time() < self._expires_at
+
+    def _try_acquire(self) -> bool:
+        """续约或获取租约，返回是否持有"""
+        now = time.time()
+        expires_at = now + self.lease_seconds
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO scheduler_lease (name, holder, expires_at)
+                VALUES (?, ?, ?)
+                ON CONFLICT (name) DO UPDATE SET
+                    holder = excluded.holder,
+                    expires_at = excluded.expires_at
+                WHERE scheduler_lease.holder = excluded.holder
+                   OR scheduler_lease.expires_at < ?
+            ''', (self.name, self.holder_id, expires_at, now))
+            cursor.execute('SELECT holder FROM scheduler_lease WHERE name = ?', (self.name,))
+            row = cursor.fetchone()
+            conn.commit()
+
+        self._current_holder = row['holder'] if row else None
+        if self._current_holder == self.holder_id:
+            self._expires_at = expires_at
+            return True
+        return False
+
+    def confirm(self) -> bool:
+        """从数据库确认租约仍属于当前进程且未过期（写入抓取结果前调用）"""
+        with get_db_connection() as conn:
+            row = conn.execute(
+                'SELECT holder, expires_at FROM scheduler_lease WHERE name = ?', (self.name,)
+            ).fetchone()
+        return row is not None and row['holder'] == self.holder_id and row['expires_at'] > time.time()
+
+    def release(self):
+        """主动释放租约，其他进程无需等待过期即可接管"""
+        if not self._leader:
+            return
+        self._leader = False
+        try:
+            with get_db_connection() as conn:
+                conn.execute(
+                    'DELETE FROM scheduler_lease WHERE name = ? AND holder = ?',
+                    (self.name, self.holder_id)
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"[选主] 释放租约失败: {e}")
+
+    def _tick(self):
+        """一次续约/竞选，并在身份变化时调用回调"""
+        try:
+            acquired = self._try_acquire()
+        except sqlite3.Error as e:
+            # 数据库暂时不可用：租约未过期前仍视为持有
+            print(f"[选主] 续约失败: {e}")
+            acquired = self.is_leader
+
+        if acquired and not self._leader:
+            self._leader = True
+            print(f"[选主] 当前进程成为抓取进程 ({self.holder_id})")
+            callback = self._on_elected
+        elif not acquired and self._leader:
+            self._leader = False
+            print(f"[选主] 租约已被 {self._current_holder} 接管，停止抓取")
+            callback = self._on_demoted
+        else:
+            return
+
+        if callback is not None:
+            try:
+                callback()
+            except Exception as e:
+                print(f"[选主] 回调执行失败: {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.renew_seconds):
+            self._tick()
+
+    def start(self, on_elected: Callable[[], None], on_demoted: Callable[[], None]):
+        """立即竞选一次，之后在后台线程中定期续约"""
+        if self._thread is not None:
+            return
+        self._on_elected = on_elected
+        self._on_demoted = on_demoted
+        self._tick()
+        self._thread = threading.Thread(target=self._run, name='leader-election', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """停止续约并释放租约"""
+        self._stop.set()
+        # 等待进行中的续约结束，避免释放后又被写回
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.renew_seconds + 1)
+        self.release()
+
+    def get_stats(self) -> Dict:
+        """选主状态（来自最近一次续约，不访问数据库）"""
+        return {
+            'leader': self.is_leader,
+            'holder_id': self.holder_id,
+            'current_holder': self._current_holder,
+        }
+
+
+# 全局实例
+_leader_election = LeaderElection()
+
+
+def get_leader_election() -> LeaderElection:
+    """获取全局选主实例"""
+    return _leader_election
@@ -92,6 +92,7 @@ class DouyinAPIScraper:
             - view_count: 浏览量
             - video_count: 视频数
             - sentence_id: 话题ID
+            - topic_id: 话题ID（与 HTML 抓取器字段一致）
             - tag: 标签 (热/新等)
             - cover_url: 封面图URL
         """
@@ -149,6 +150,7 @@ class DouyinAPIScraper:
                 'view_count': item.get('view_count', 0),
                 'video_count': item.get('video_count', 0),
                 'sentence_id': item.get('sentence_id', ''),
+                'topic_id': str(item.get('sentence_id', '')),
                 'tag': tag,
                 'cover_url': cover_url,
                 'url': f"https://www.douyin.com/hot/{item.get('sentence_id', '')}"
@@ -169,6 +171,7 @@ class DouyinAPIScraper:
                 'view_count': 0,
                 'video_count': item.get('video_count', 0),
                 'sentence_id': item.get('sentence_id', ''),
+                'topic_id': str(item.get('sentence_id', '')),
                 'tag': '上升',
                 'cover_url': cover_url,
                 'url': f"https://www.douyin.com/hot/{item.get('sentence_id', '')}"
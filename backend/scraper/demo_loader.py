@@ -75,6 +75,7 @@ class DemoDataLoader:
                 'view_count': item.get('view_count', 0),
                 'video_count': item.get('video_count', 0),
                 'sentence_id': item.get('sentence_id', ''),
+                'topic_id': str(item.get('sentence_id', '')),
                 'tag': tag,
                 'cover_url': cover_url,
                 'url': f"https://www.douyin.com/hot/{item.get('sentence_id', '')}"
@@ -95,6 +96,7 @@ class DemoDataLoader:
                 'view_count': 0,
                 'video_count': item.get('video_count', 0),
                 'sentence_id': item.get('sentence_id', ''),
+                'topic_id': str(item.get('sentence_id', '')),
                 'tag': '上升',
                 'cover_url': cover_url,
                 'url': f"https://www.douyin.com/hot/{item.get('sentence_id', '')}"
@@ -7,7 +7,8 @@
 
 import os
 import json
-from typing import Dict, Any
+import zlib
+from typing import Dict, Any, Iterator, Optional
 
 # 配置文件路径
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
@@ -21,7 +22,8 @@ DEFAULT_SETTINGS = {
     "auto_refresh_seconds": 60,
     "theme": "dark",
     "show_trending_list": True,
-    "max_display_items": 50
+    "max_display_items": 50,
+    "archive_after_days": 1
 }
 
 
@@ -31,8 +33,17 @@ def ensure_data_dirs():
     os.makedirs(RECORDS_DIR, exist_ok=True)
 
 
+# 内存中的设置缓存，save_settings 时更新
+_settings_cache = None
+
+
 def load_settings() -> Dict[str, Any]:
-    """加载设置"""
+    """加载设置（首次读取文件后缓存在内存中）"""
+    global _settings_cache
+    
+    if _settings_cache is not None:
+        return _settings_cache.copy()
+    
     ensure_data_dirs()
     
     if os.path.exists(SETTINGS_FILE):
@@ -40,18 +51,21 @@ def load_settings() -> Dict[str, Any]:
             with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
                 settings = json.load(f)
                 # 合并默认值（确保新字段有值）
-                return {**DEFAULT_SETTINGS, **settings}
+                _settings_cache = {**DEFAULT_SETTINGS, **settings}
+                return _settings_cache.copy()
         except (json.JSONDecodeError, IOError):
             pass
     
-    # 如果文件不存在或读取失败，创建默认配置
+    # 如果文件不存在或读取失败，创建默认配置（先放入缓存，save_settings 合并时不再读取文件）
+    _settings_cache = DEFAULT_SETTINGS.copy()
     save_settings(DEFAULT_SETTINGS)
     return DEFAULT_SETTINGS.copy()
 
 
 def save_settings(settings: Dict[str, Any]) -> bool:
-    """保存设置"""
+    """保存设置（只需传入要修改的字段，其余字段保持当前值）"""
     ensure_data_dirs()
+    settings = {**load_settings(), **settings}
     
     try:
         # 验证关键字段
@@ -61,17 +75,31 @@ def save_settings(settings: Dict[str, Any]) -> bool:
             "auto_refresh_seconds": max(10, min(300, int(settings.get("auto_refresh_seconds", 60)))),
             "theme": settings.get("theme", "dark"),
             "show_trending_list": bool(settings.get("show_trending_list", True)),
-            "max_display_items": max(10, min(100, int(settings.get("max_display_items", 50))))
+            "max_display_items": max(10, min(100, int(settings.get("max_display_items", 50)))),
+            "archive_after_days": max(1, min(30, int(settings.get("archive_after_days", 1))))
         }
         
-        with open(SETTINGS_FILE, 'w', encoding='utf-8') as f:
+        # 先写临时文件再替换，独立的抓取进程监听该文件时不会读到写了一半的内容
+        tmp_file = f'{SETTINGS_FILE}.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
             json.dump(validated, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, SETTINGS_FILE)
+        
+        global _settings_cache
+        _settings_cache = {**DEFAULT_SETTINGS, **validated}
         return True
     except (IOError, ValueError) as e:
         print(f"[设置] 保存失败: {e}")
         return False
 
 
+def reload_settings() -> Dict[str, Any]:
+    """丢弃内存缓存，重新读取设置文件（其他进程修改设置后调用）"""
+    global _settings_cache
+    _settings_cache = None
+    return load_settings()
+
+
 def get_scrape_interval() -> int:
     """获取抓取间隔（分钟）"""
     return load_settings().get("scrape_interval_minutes", 10)
@@ -110,42 +138,96 @@ def save_record_snapshot(data: list, method: str) -> str:
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(record, f, indent=2, ensure_ascii=False)
         print(f"[记录] 保存快照到 {filepath}")
-        return filepath
     except IOError as e:
         print(f"[记录] 保存失败: {e}")
         return ""
+    
+    # 同步追加当天的倒排索引
+    try:
+        from record_index import get_record_index
+        get_record_index().add_record(
+            RECORDS_DIR, now.strftime('%Y-%m-%d'), filename, record, get_records_for_date
+        )
+    except (IOError, ValueError) as e:
+        print(f"[索引] 更新失败: {e}")
+    
+    return filepath
 
 
 def get_record_dates() -> list:
-    """获取所有有记录的日期"""
+    """获取所有有记录的日期（包括已归档的日期）"""
+    from record_archive import ARCHIVE_SUFFIX
+    
     ensure_data_dirs()
     
-    dates = []
+    dates = set()
     if os.path.exists(RECORDS_DIR):
-        for name in sorted(os.listdir(RECORDS_DIR), reverse=True):
-            if os.path.isdir(os.path.join(RECORDS_DIR, name)):
-                dates.append(name)
-    return dates
+        for name in os.listdir(RECORDS_DIR):
+            if name.endswith(ARCHIVE_SUFFIX):
+                dates.add(name[:-len(ARCHIVE_SUFFIX)])
+            elif os.path.isdir(os.path.join(RECORDS_DIR, name)):
+                dates.add(name)
+    return sorted(dates, reverse=True)
 
 
 def get_records_for_date(date: str) -> list:
-    """获取某天的所有快照记录"""
-    date_dir = os.path.join(RECORDS_DIR, date)
-    records = []
+    """获取某天的所有快照记录（优先读取归档文件）"""
+    from record_archive import archive_path_for, read_day_archive
+    
+    archive_path = archive_path_for(RECORDS_DIR, date)
+    if os.path.exists(archive_path):
+        try:
+            return read_day_archive(archive_path)
+        except (ValueError, OSError, zlib.error) as e:
+            print(f"[记录] 读取归档失败 {date}: {e}")
     
+    date_dir = os.path.join(RECORDS_DIR, date)
     if os.path.exists(date_dir):
-        for filename in sorted(os.listdir(date_dir)):
-            if filename.endswith('.json'):
-                filepath = os.path.join(date_dir, filename)
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        record = json.load(f)
-                        record['filename'] = filename
-                        records.append(record)
-                except (json.JSONDecodeError, IOError):
-                    pass
+        return _read_json_records(date_dir)
+    return []
+
+
+def iter_records_for_date(date: str, after: Optional[str] = None) -> Iterator[Dict]:
+    """
+    逐条读取某天的快照记录（按文件名排序，每次只在内存中保留一条）
+    
+    Args:
+        date: 日期 YYYY-MM-DD
+        after: 分页游标，只返回文件名大于该值的记录
+    """
+    from record_archive import archive_path_for, iter_day_archive
+    
+    archive_path = archive_path_for(RECORDS_DIR, date)
+    if os.path.exists(archive_path):
+        try:
+            return iter_day_archive(archive_path, after)
+        except (ValueError, OSError, zlib.error) as e:
+            print(f"[记录] 读取归档失败 {date}: {e}")
+    
+    return _iter_json_records(os.path.join(RECORDS_DIR, date), after)
+
+
+def _iter_json_records(date_dir: str, after: Optional[str] = None) -> Iterator[Dict]:
+    """按文件名顺序逐个读取 JSON 快照"""
+    if not os.path.exists(date_dir):
+        return
     
-    return records
+    for filename in sorted(os.listdir(date_dir)):
+        if not filename.endswith('.json') or (after is not None and filename <= after):
+            continue
+        filepath = os.path.join(date_dir, filename)
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            continue
+        record['filename'] = filename
+        yield record
+
+
+def _read_json_records(date_dir: str) -> list:
+    """按文件名顺序读取某个日期文件夹下的 JSON 快照"""
+    return list(_iter_json_records(date_dir))
 
 
 def get_word_history(word: str, days: int = 7) -> list:
@@ -160,31 +242,90 @@ def get_word_history(word: str, days: int = 7) -> list:
         历史记录列表 [{timestamp, position, hot_value}, ...]
     """
     from datetime import datetime, timedelta
+    from record_index import get_record_index
     
+    index = get_record_index()
     history = []
     
+    # 通过每天的倒排索引定位，只读取该词对应的条目
     for i in range(days):
         date = (datetime.now() - timedelta(days=i)).strftime('%Y-%m-%d')
-        records = get_records_for_date(date)
-        
-        for record in records:
-            for item in record.get('data', []):
-                if item.get('word') == word:
-                    history.append({
-                        'timestamp': record.get('timestamp'),
-                        'position': item.get('position', 0),
-                        'hot_value': item.get('hot_value', 0)
-                    })
-                    break
+        history.extend(index.lookup(RECORDS_DIR, date, word, get_records_for_date))
     
     return sorted(history, key=lambda x: x['timestamp'])
 
 
-def cleanup_old_records():
+def compact_old_records() -> Dict[str, Any]:
+    """
+    把超过 archive_after_days 天的 JSON 记录压缩为每天一个列式归档文件
+    
+    归档写入成功并校验一致后才删除原日期文件夹。
+    
+    Returns:
+        {"days": 归档天数, "json_bytes": 原 JSON 大小, "archive_bytes": 归档大小}
+    """
+    from datetime import datetime, timedelta
+    from record_archive import archive_path_for, write_day_archive, read_day_archive
+    from record_index import get_record_index
+    import shutil
+    
+    settings = load_settings()
+    after_days = settings.get('archive_after_days', 1)
+    cutoff_date = (datetime.now() - timedelta(days=after_days)).strftime('%Y-%m-%d')
+    
+    report = {'days': 0, 'json_bytes': 0, 'archive_bytes': 0}
+    if not os.path.exists(RECORDS_DIR):
+        return report
+    
+    for date in sorted(os.listdir(RECORDS_DIR)):
+        folder_path = os.path.join(RECORDS_DIR, date)
+        if not os.path.isdir(folder_path) or date >= cutoff_date:
+            continue
+        
+        archive_path = archive_path_for(RECORDS_DIR, date)
+        try:
+            json_bytes = _dir_size(folder_path)
+            records = _read_json_records(folder_path)
+            archive_bytes = write_day_archive(records, archive_path)
+            
+            if read_day_archive(archive_path) != records:
+                os.remove(archive_path)
+                print(f"[归档] 校验失败，保留原始记录: {date}")
+                continue
+            
+            shutil.rmtree(folder_path)
+            get_record_index().rebuild(RECORDS_DIR, date, records)
+            report['days'] += 1
+            report['json_bytes'] += json_bytes
+            report['archive_bytes'] += archive_bytes
+            print(f"[归档] {date}: {json_bytes / 1024:.0f} KB -> {archive_bytes / 1024:.0f} KB")
+        except Exception as e:
+            print(f"[归档] 归档失败 {date}: {e}")
+    
+    return report
+
+
+def _dir_size(path: str) -> int:
+    """目录占用的字节数"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def cleanup_old_records() -> Dict[str, Any]:
     """
     清理过期的历史记录
     
-    根据 max_history_days 设置删除旧的 JSON 记录和数据库快照
+    根据 max_history_days 设置删除旧的 JSON 记录和数据库快照。
+    由调度器中独立的清理任务定期执行，数据库按小批次删除并增量回收空间。
+    
+    Returns:
+        清理报告 {"folders", "folder_bytes", "snapshots", "items", "db_bytes_reclaimed"}
     """
     from datetime import datetime, timedelta
     import shutil
@@ -193,51 +334,70 @@ def cleanup_old_records():
     max_days = settings.get('max_history_days', 7)
     cutoff_date = (datetime.now() - timedelta(days=max_days)).strftime('%Y-%m-%d')
     
-    deleted_count = 0
+    report = {
+        'folders': 0,
+        'folder_bytes': 0,
+        'snapshots': 0,
+        'items': 0,
+        'db_bytes_reclaimed': 0,
+    }
     
-    # 1. 清理 JSON 记录文件
+    # 1. 清理 JSON 记录文件和归档文件
     if os.path.exists(RECORDS_DIR):
+        from record_archive import ARCHIVE_SUFFIX
+        from record_index import INDEX_SUFFIX, get_record_index
+        
+        for name in os.listdir(RECORDS_DIR):
+            if name.endswith(INDEX_SUFFIX) and name[:-len(INDEX_SUFFIX)] < cutoff_date:
+                get_record_index().forget(RECORDS_DIR, name[:-len(INDEX_SUFFIX)])
+        
+        for name in os.listdir(RECORDS_DIR):
+            path = os.path.join(RECORDS_DIR, name)
+            if name.endswith(ARCHIVE_SUFFIX) and name[:-len(ARCHIVE_SUFFIX)] < cutoff_date:
+                try:
+                    size = os.path.getsize(path)
+                    os.remove(path)
+                    report['folders'] += 1
+                    report['folder_bytes'] += size
+                    print(f"[清理] 删除过期归档: {name}")
+                except OSError as e:
+                    print(f"[清理] 删除失败 {name}: {e}")
+        
         for date_folder in os.listdir(RECORDS_DIR):
             folder_path = os.path.join(RECORDS_DIR, date_folder)
             if os.path.isdir(folder_path) and date_folder < cutoff_date:
                 try:
+                    size = _dir_size(folder_path)
                     shutil.rmtree(folder_path)
-                    deleted_count += 1
+                    report['folders'] += 1
+                    report['folder_bytes'] += size
                     print(f"[清理] 删除过期记录: {date_folder}")
                 except Exception as e:
                     print(f"[清理] 删除失败 {date_folder}: {e}")
     
-    # 2. 清理数据库中的旧快照
+    # 2. 分批清理数据库中的旧快照
     try:
-        from models.database import get_db_connection
+        from models.database import purge_snapshots_before
         
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # 删除超过 max_days 天的快照
-            cursor.execute('''
-                DELETE FROM hot_items 
-                WHERE snapshot_id IN (
-                    SELECT id FROM hot_snapshots 
-                    WHERE captured_at < datetime('now', '-' || ? || ' days')
-                )
-            ''', (max_days,))
-            
-            cursor.execute('''
-                DELETE FROM hot_snapshots 
-                WHERE captured_at < datetime('now', '-' || ? || ' days')
-            ''', (max_days,))
-            
-            deleted_snapshots = cursor.rowcount
-            conn.commit()
+        result = purge_snapshots_before(max_days)
+        report['snapshots'] = result['snapshots']
+        report['items'] = result['items']
+        report['db_bytes_reclaimed'] = result['bytes_reclaimed']
+        
+        if result['snapshots'] > 0:
+            # 更新状态计数，最新快照可能已被删除，缓存重新加载
+            from models.status import get_status_counters
+            from models.cache import get_snapshot_cache
             
-            if deleted_snapshots > 0:
-                print(f"[清理] 数据库删除了 {deleted_snapshots} 个过期快照")
+            get_status_counters().on_cleanup(result['snapshots'], result['items'], result['oldest'])
+            get_snapshot_cache().invalidate()
                 
     except Exception as e:
         print(f"[清理] 数据库清理失败: {e}")
     
-    if deleted_count > 0:
-        print(f"[清理] 完成，共删除 {deleted_count} 个过期日期文件夹")
+    print(f"[清理] 完成: 删除 {report['folders']} 个日期文件夹 "
+          f"({report['folder_bytes'] / 1024 / 1024:.1f} MB)，"
+          f"{report['snapshots']} 个快照 / {report['items']} 条记录，"
+          f"数据库回收 {report['db_bytes_reclaimed'] / 1024 / 1024:.1f} MB")
     
-    return deleted_count
+    return report
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+新快照推送模块
+
+抓取任务提交新快照后调用 publish()，/api/stream 的每个 SSE 连接
+在 wait() 上阻塞，收到通知后立即把事件推送给浏览器。
+
+只保留最新一个事件和递增的序号：慢客户端不会积压消息，
+重连时带上 Last-Event-ID，序号落后即可直接补发最新事件。
+"""
+
+import threading
+from typing import Dict, Optional
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from config import SSE_MAX_CLIENTS
+
+
+class SnapshotEvents:
+    """进程内的新快照广播"""
+
+    def __init__(self, max_clients: int = SSE_MAX_CLIENTS):
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._event: Optional[Dict] = None
+        self._clients = 0
+        self.max_clients = max_clients
+
+    def publish(self, data: Dict) -> int:
+        """发布新快照事件，唤醒所有等待中的连接，返回事件序号"""
+        with self._cond:
+            self._seq += 1
+            self._event = {'id': self._seq, 'data': data}
+            self._cond.notify_all()
+            return self._seq
+
+    @property
+    def last_id(self) -> int:
+        """最新事件序号（没有事件时为 0）"""
+        with self._cond:
+            return self._seq
+
+    def wait(self, last_id: int, timeout: float) -> Optional[Dict]:
+        """
+        等待序号大于 last_id 的事件
+
+        Returns:
+            最新事件 {id, data}；超时返回 None
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > last_id, timeout)
+            if self._seq > last_id:
+                return self._event
+            return None
+
+    def connect(self) -> bool:
+        """登记一个连接，超过上限时返回 False（客户端回退到轮询）"""
+        with self._cond:
+            if self._clients >= self.max_clients:
+                return False
+            self._clients += 1
+            return True
+
+    def disconnect(self):
+        """连接关闭"""
+        with self._cond:
+            self._clients = max(0, self._clients - 1)
+
+    def get_stats(self) -> Dict:
+        """连接数和已发布事件数"""
+        with self._cond:
+            return {'clients': self._clients, 'max_clients': self.max_clients,
+                    'events': self._seq}
+
+
+# 全局实例
+_snapshot_events = SnapshotEvents()
+
+
+def get_snapshot_events() -> SnapshotEvents:
+    """获取全局推送实例"""
+    return _snapshot_events
@@ -7,6 +7,9 @@ const API_BASE = '';
 let compareWords = [];
 let mainChart = null;
 let refreshTimer = null;
+let eventSource = null;
+let streamConnected = false;
+let streamLost = false;
 let currentSettings = {};
 let selectedHours = 1; // 默认显示 1 小时
 
@@ -23,6 +26,7 @@ const els = {
     mainChart: document.getElementById('mainChart'),
     risingList: document.getElementById('risingList'),
     manualInput: document.getElementById('manualInput'),
+    searchSuggestions: document.getElementById('searchSuggestions'),
     btnManualAdd: document.getElementById('btnManualAdd'),
     btnRefresh: document.getElementById('btnRefresh'),
     updateTime: document.getElementById('updateTime'),
@@ -46,6 +50,7 @@ function init() {
     setupDragAndDrop();
     setupEventListeners();
     loadAllData();
+    connectStream();
     window.addEventListener('resize', () => mainChart && mainChart.resize());
 }
 
@@ -62,6 +67,13 @@ function setupEventListeners() {
         }
     });
 
+    // 输入时搜索历史热词作为补全候选
+    let searchTimer = null;
+    els.manualInput.addEventListener('input', () => {
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(() => fetchSuggestions(els.manualInput.value.trim()), 200);
+    });
+
     els.btnRefresh.addEventListener('click', manualRefresh);
     if (els.btnSaveSettings) els.btnSaveSettings.addEventListener('click', saveSettings);
 
@@ -109,14 +121,104 @@ async function loadAllData() {
     ]);
 }
 
+// 新快照推送：连接成功时停止轮询，断开期间回退到定时轮询
+function connectStream() {
+    if (!window.EventSource) return;
+
+    eventSource = new EventSource(`${API_BASE}/api/stream`);
+
+    eventSource.addEventListener('open', () => {
+        // 断线后重连：期间可能错过了新快照
+        if (streamLost) loadAllData();
+        streamConnected = true;
+        streamLost = false;
+        stopPolling();
+    });
+
+    eventSource.addEventListener('snapshot', () => loadAllData());
+
+    eventSource.addEventListener('error', () => {
+        streamConnected = false;
+        streamLost = true;
+        startPolling();
+        // 服务端拒绝（如连接数已满）时浏览器不再自动重连，稍后手动重试
+        if (eventSource.readyState === EventSource.CLOSED) {
+            eventSource = null;
+            setTimeout(connectStream, 60000);
+        }
+    });
+}
+
+function startPolling() {
+    if (refreshTimer) clearInterval(refreshTimer);
+    refreshTimer = setInterval(loadAllData, (currentSettings.auto_refresh_seconds || 60) * 1000);
+}
+
+function stopPolling() {
+    if (refreshTimer) clearInterval(refreshTimer);
+    refreshTimer = null;
+}
+
+// 条件请求：带上 If-None-Match，304 时返回缓存内容并标记未变化
+const etagCache = {};
+
+async function fetchCached(url) {
+    const cached = etagCache[url];
+    const headers = cached ? { 'If-None-Match': cached.etag } : {};
+    const res = await fetch(url, { headers, cache: 'no-store' });
+
+    if (res.status === 304 && cached) {
+        return { data: cached.data, changed: false };
+    }
+
+    const data = await res.json();
+    const etag = res.headers.get('ETag');
+    if (etag && res.ok) etagCache[url] = { etag, data };
+    return { data, changed: true };
+}
+
+async function fetchSuggestions(query) {
+    if (!els.searchSuggestions) return;
+    if (!query) {
+        els.searchSuggestions.innerHTML = '';
+        return;
+    }
+
+    try {
+        const res = await fetch(`${API_BASE}/api/search?q=${encodeURIComponent(query)}&limit=10`);
+        const json = await res.json();
+        if (!json.success) return;
+
+        els.searchSuggestions.innerHTML = '';
+        json.data.forEach(item => {
+            const option = document.createElement('option');
+            option.value = item.word;
+            els.searchSuggestions.appendChild(option);
+        });
+    } catch (e) {
+        console.error(e);
+    }
+}
+
+// 当前热榜及其快照ID，之后只请求增量
+let hotState = { snapshotId: null, list: [] };
+
 async function fetchHotList() {
     try {
-        const res = await fetch(`${API_BASE}/api/hot`);
+        if (hotState.snapshotId === null) {
+            // 没有可用的本地状态（首次加载或增量对不上）：304 时缓存的完整热榜就是最新的，同样要重新应用
+            const { data } = await fetchCached(`${API_BASE}/api/hot`);
+            if (data.success) setHotList(data.snapshot_id, data.data);
+            return;
+        }
+
+        const res = await fetch(`${API_BASE}/api/hot/delta?since=${hotState.snapshotId}`, { cache: 'no-store' });
         const data = await res.json();
-        if (data.success) {
-            renderHotList(data.data);
-            els.statCurrentCount.textContent = data.count;
-            updateStatusTime();
+        if (!data.success) return;
+        if (data.mode === 'full') {
+            setHotList(data.snapshot_id, data.data);
+        } else if (data.snapshot_id !== hotState.snapshotId) {
+            applyHotDelta(data);
         }
     } catch (e) {
         console.error(e);
@@ -124,11 +226,38 @@ async function fetchHotList() {
     }
 }
 
+function setHotList(snapshotId, list) {
+    hotState = { snapshotId, list };
+    renderHotList(list);
+    els.statCurrentCount.textContent = list.length;
+    updateStatusTime();
+}
+
+// 把增量应用到当前热榜：移除下榜条目、更新变化字段、加入新条目，再按排名排序
+function applyHotDelta(delta) {
+    const items = new Map(hotState.list.map(item => [item.key, item]));
+    delta.left.forEach(key => items.delete(key));
+    delta.changed.forEach(change => {
+        const item = items.get(change.key);
+        if (item) items.set(change.key, { ...item, ...change });
+    });
+    delta.entered.forEach(item => items.set(item.key, item));
+
+    const list = [...items.values()].sort(
+        (a, b) => a.position - b.position || parseInt(a.key, 10) - parseInt(b.key, 10)
+    );
+    if (list.length !== delta.count) {
+        // 本地状态与服务端不一致，下次重新获取完整热榜
+        hotState.snapshotId = null;
+        return fetchHotList();
+    }
+    setHotList(delta.snapshot_id, list);
+}
+
 async function fetchRising() {
     try {
-        const res = await fetch(`${API_BASE}/api/rising`);
-        const data = await res.json();
-        if (data.success) renderRising(data.data);
+        const { data, changed } = await fetchCached(`${API_BASE}/api/rising`);
+        if (changed && data.success) renderRising(data.data);
     } catch (e) { console.error(e); }
 }
 
@@ -318,37 +447,43 @@ async function updateChart() {
 
     showToast('正在加载趋势数据...', 'system');
 
-    for (const word of compareWords) {
+    // 一次请求获取所有词的趋势
+    let trends = {};
+    try {
+        // 每个词单独一个 words 参数，词中的逗号不会被拆开
+        const params = new URLSearchParams();
+        compareWords.forEach(word => params.append('words', word));
+        params.append('hours', selectedHours);
+        const { data: json } = await fetchCached(`${API_BASE}/api/trends?${params}`);
+        if (json.success) trends = json.trends;
+    } catch (e) {
+        console.error(e);
+    }
+
+    // 数据库中没有数据的词，并行回退到 JSON 历史记录
+    const days = Math.max(1, Math.ceil(selectedHours / 24)); // 将小时转换为天数（至少1天）
+    // 趋势接口已按时间窗口返回（汇总数据的第一个桶与窗口起点重叠，按桶起点过滤会被丢掉），
+    // 只有按整天返回的 JSON 历史记录需要在前端截取
+    const cutoffTime = Date.now() - (selectedHours * 60 * 60 * 1000);
+    await Promise.all(compareWords.map(async (word) => {
+        let data = trends[word] || [];
         try {
-            let data = [];
-            const r1 = await fetch(`${API_BASE}/api/trend/${encodeURIComponent(word)}?hours=${selectedHours}`);
-            const j1 = await r1.json();
-
-            if (j1.success && j1.trend.length > 0) {
-                data = j1.trend;
-            } else {
-                // 将小时转换为天数（至少1天）
-                const days = Math.max(1, Math.ceil(selectedHours / 24));
+            if (data.length === 0) {
                 const r2 = await fetch(`${API_BASE}/api/history/${encodeURIComponent(word)}?days=${days}`);
                 const j2 = await r2.json();
-                if (j2.success) data = j2.history;
-            }
-
-            // 前端过滤：确保只显示选定时间范围内的数据
-            const cutoffTime = Date.now() - (selectedHours * 60 * 60 * 1000);
-            data = data.filter(d => {
-                const itemTime = new Date(d.time || d.timestamp).getTime();
-                return itemTime >= cutoffTime;
-            });
-
-            if (data.length > 0) {
-                dataMap[word] = data;
-                data.forEach(d => allDates.add(new Date(d.time || d.timestamp).getTime()));
+                if (j2.success) {
+                    data = j2.history.filter(d => new Date(d.timestamp).getTime() >= cutoffTime);
+                }
             }
         } catch (e) {
             console.error(e);
         }
-    }
+
+        if (data.length > 0) {
+            dataMap[word] = data;
+            data.forEach(d => allDates.add(new Date(d.time || d.timestamp).getTime()));
+        }
+    }));
 
     compareWords.forEach((word, idx) => {
         const rawData = dataMap[word] || [];
@@ -502,8 +637,8 @@ function applySettings(s) {
     if (els.settingRefresh) els.settingRefresh.value = s.auto_refresh_seconds || 60;
     if (els.settingHistory) els.settingHistory.value = s.max_history_days || 7;
 
-    if (refreshTimer) clearInterval(refreshTimer);
-    refreshTimer = setInterval(loadAllData, (s.auto_refresh_seconds || 60) * 1000);
+    // 推送连接正常时不需要轮询
+    if (!streamConnected) startPolling();
 }
 
 async function saveSettings() {
@@ -4,11 +4,19 @@
 抖音热搜监控系统 - 启动脚本
 
 Usage:
-    python run.py
+    python run.py                      # 单进程启动 Web 服务（waitress 多线程）和定时抓取（同 all）
+    python run.py serve                # 只启动 Web 服务，新快照由独立的抓取进程写入
+    python run.py worker               # 只运行定时抓取/入库/清理
+    python run.py --dev                # 使用 Flask 开发服务器
+    python run.py --threads 64         # 指定请求线程数（另有 --port、--backlog、--keepalive）
+    python run.py backfill-lifecycle   # 从现有快照重建话题生命周期表
+    python run.py vacuum               # 把旧数据库转换为增量回收模式（一次完整的 VACUUM）
 """
 
 import os
 import sys
+import argparse
+import importlib.util
 import traceback
 
 def get_base_path():
@@ -38,15 +46,96 @@ def pause_on_error():
             pass
 
 
-def main():
-    """主入口"""
+def backfill_lifecycle():
+    """从现有快照重建话题生命周期表"""
+    import time
+    from models.database import init_database, rebuild_topic_lifecycle
+    
+    init_database()
+    start = time.time()
+    count = rebuild_topic_lifecycle()
+    print(f"[回填] 话题生命周期表已重建: {count} 个话题，耗时 {time.time() - start:.1f} 秒")
+
+
+def vacuum_database():
+    """把旧数据库转换为增量回收模式（抓取进程的清理任务也会自动执行）"""
+    import time
+    from models.database import init_database, convert_to_incremental_vacuum
+    
+    init_database()
+    start = time.time()
+    if convert_to_incremental_vacuum():
+        print(f"[回收] 已转换为增量回收模式，耗时 {time.time() - start:.1f} 秒")
+    else:
+        print("[回收] 数据库已是增量回收模式，无需转换")
+
+
+def serve_production(app, port: int, threads: int, backlog: int, keepalive: int):
+    """使用 waitress 多线程 WSGI 服务器"""
+    from waitress import serve
+    from config import FLASK_HOST, SERVER_CONNECTION_LIMIT
+    
+    serve(
+        app,
+        host=FLASK_HOST,
+        port=port,
+        threads=threads,
+        backlog=backlog,
+        connection_limit=SERVER_CONNECTION_LIMIT,
+        channel_timeout=keepalive,
+        asyncore_use_poll=True,  # 连接数可能超过 select 的 1024 个文件描述符限制
+        ident=None
+    )
+
+
+def run_worker():
+    """独立抓取进程：定时抓取、入库和清理，通过数据库和通知文件与 Web 进程协作"""
+    import time
+    from scheduler.jobs import start_scheduler, stop_scheduler
+    
+    print("[抓取进程] 启动中...")
+    start_scheduler()
+    print("[抓取进程] 已启动，按 Ctrl+C 停止")
+    
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        stop_scheduler()
+        print("\n抓取进程已停止")
+
+
+def run_server(dev: bool = False, port: int = None, threads: int = None, backlog: int = None,
+               keepalive: int = None, with_scheduler: bool = True):
+    """
+    启动 Web 服务
+    
+    with_scheduler 为 True 时在同一进程中运行定时抓取（all），否则只提供 Web 服务（serve）。
+    多个进程都运行调度器时由数据库租约选出唯一的抓取进程，
+    其他进程通过通知文件得知新快照。
+    """
     import webbrowser
     import threading
     
     # 延迟导入，确保路径设置正确后再导入
-    from backend.app import app, create_app
-    from backend.scheduler.jobs import start_scheduler
-    from backend.config import FLASK_HOST, FLASK_PORT
+    # backend 已在 sys.path 中，按顶层模块名导入，与 app.py 内部的导入是同一个模块实例
+    from app import app, create_app
+    from scheduler.jobs import start_scheduler
+    from snapshot_events import get_snapshot_events
+    from process_signal import watch_worker
+    from config import (
+        FLASK_HOST, FLASK_PORT, FLASK_DEBUG, SSE_MAX_CLIENTS,
+        SERVER_THREADS, SERVER_RESERVED_THREADS, SERVER_BACKLOG, SERVER_KEEPALIVE_SECONDS
+    )
+    
+    port = port or FLASK_PORT
+    threads = threads or SERVER_THREADS
+    backlog = backlog or SERVER_BACKLOG
+    keepalive = keepalive or SERVER_KEEPALIVE_SECONDS
+    
+    if not dev and importlib.util.find_spec('waitress') is None:
+        print("[服务] 未安装 waitress，改用 Flask 开发服务器（pip install waitress）")
+        dev = True
     
     print("""
     ╔══════════════════════════════════════════════════════════╗
@@ -59,38 +148,80 @@ def main():
     # 初始化应用
     create_app()
     
-    # 启动调度器
-    start_scheduler()
+    # 每个推送连接占用一个请求线程，连接上限不能吃光线程池
+    if not dev:
+        events = get_snapshot_events()
+        events.max_clients = max(0, min(SSE_MAX_CLIENTS, threads - SERVER_RESERVED_THREADS))
+        if events.max_clients < SSE_MAX_CLIENTS:
+            print(f"[服务] 线程数 {threads} 不足，推送连接上限调整为 {events.max_clients}")
+    
+    if with_scheduler:
+        # 启动调度器（当选为抓取进程后才执行任务）
+        start_scheduler()
+    
+    # 新快照可能由其他进程写入数据库，通过通知文件得知
+    watch_worker()
     
     def open_browser():
         """延迟打开浏览器"""
         import time
         time.sleep(1.5)
-        webbrowser.open(f'http://localhost:{FLASK_PORT}')
+        webbrowser.open(f'http://localhost:{port}')
     
     # 在新线程中打开浏览器
     threading.Thread(target=open_browser, daemon=True).start()
     
+    server = 'Flask 开发服务器' if dev else f'waitress，{threads} 个线程'
+    scrape = '每10分钟自动执行' if with_scheduler else '由独立抓取进程执行（python run.py worker）'
     print(f"""
-    ✓ 服务已启动
-    ✓ 访问地址: http://localhost:{FLASK_PORT}
-    ✓ 热榜抓取: 每10分钟自动执行
+    ✓ 服务已启动（{server}）
+    ✓ 访问地址: http://localhost:{port}
+    ✓ 热榜抓取: {scrape}
     
     按 Ctrl+C 停止服务
     """)
     
-    # 启动 Flask
     try:
-        app.run(
-            host=FLASK_HOST, 
-            port=FLASK_PORT, 
-            debug=False,  # 生产模式
-            use_reloader=False  # 禁用重载，避免调度器重复启动
-        )
+        if dev:
+            app.run(
+                host=FLASK_HOST, 
+                port=port, 
+                debug=FLASK_DEBUG,
+                use_reloader=False  # 禁用重载，避免调度器重复启动
+            )
+        else:
+            serve_production(app, port, threads, backlog, keepalive)
     except KeyboardInterrupt:
         print("\n服务已停止")
 
 
+def main():
+    """主入口"""
+    parser = argparse.ArgumentParser(description='抖音热搜监控系统')
+    parser.add_argument(
+        'command', nargs='?', default='all', choices=['all', 'serve', 'worker', 'backfill-lifecycle', 'vacuum'],
+        help='all: Web 服务和定时抓取（默认）；serve: 只启动 Web 服务；'
+             'worker: 只运行定时抓取；backfill-lifecycle: 重建话题生命周期表；'
+             'vacuum: 转换为增量回收模式'
+    )
+    parser.add_argument('--dev', action='store_true', help='使用 Flask 开发服务器')
+    parser.add_argument('--port', type=int, help='监听端口（默认 FLASK_PORT）')
+    parser.add_argument('--threads', type=int, help='请求线程数（默认 SERVER_THREADS）')
+    parser.add_argument('--backlog', type=int, help='监听队列长度（默认 SERVER_BACKLOG）')
+    parser.add_argument('--keepalive', type=int, help='空闲连接保持秒数（默认 SERVER_KEEPALIVE_SECONDS）')
+    args = parser.parse_args()
+    
+    if args.command == 'backfill-lifecycle':
+        backfill_lifecycle()
+    elif args.command == 'vacuum':
+        vacuum_database()
+    elif args.command == 'worker':
+        run_worker()
+    else:
+        run_server(dev=args.dev, port=args.port, threads=args.threads, backlog=args.backlog,
+                   keepalive=args.keepalive, with_scheduler=(args.command == 'all'))
+
+
 if __name__ == '__main__':
     try:
         main()
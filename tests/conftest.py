@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""测试公共夹具：每个测试使用 tmp_path 下的独立数据库和数据目录"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+import config
+import process_signal
+import settings_manager
+from models import database
+from models.cache import get_snapshot_cache
+from models.status import get_status_counters
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """指向临时目录的空数据库，测试结束后恢复全局状态"""
+    db_path = str(tmp_path / 'douyin.db')
+    monkeypatch.setattr(config, 'DATABASE_PATH', db_path)
+    monkeypatch.setattr(config, 'DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(database, 'DATABASE_PATH', db_path)
+    monkeypatch.setattr(settings_manager, 'DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(settings_manager, 'SETTINGS_FILE', str(tmp_path / 'settings.json'))
+    monkeypatch.setattr(settings_manager, 'RECORDS_DIR', str(tmp_path / 'records'))
+    monkeypatch.setattr(settings_manager, '_settings_cache', None)
+    monkeypatch.setattr(process_signal, 'WORKER_SIGNAL_FILE', str(tmp_path / 'worker.signal'))
+    monkeypatch.setattr(process_signal, 'REFRESH_REQUEST_FILE', str(tmp_path / 'refresh.request'))
+
+    get_snapshot_cache().invalidate()
+    get_status_counters().reset()
+    database.init_database()
+    yield database
+
+    database.close_db_connection()
+    get_snapshot_cache().invalidate()
+    get_status_counters().reset()
+
+
+@pytest.fixture
+def client(db):
+    """Flask 测试客户端（使用临时数据库）"""
+    from app import app
+    return app.test_client()
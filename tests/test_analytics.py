@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+"""/api/analytics 在没有快照时的行为"""
+
+import pytest
+
+
+@pytest.mark.parametrize('query', ['', '?hours=1000', '?hours=1&sort=velocity'])
+def test_analytics_on_empty_database(client, query):
+    response = client.get(f'/api/analytics{query}')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['success'] is True
+    assert body['data'] == []
+    assert body['count'] == 0
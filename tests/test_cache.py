@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""快照缓存命中统计：ETag 检查读取数据版本不计入命中"""
+
+from datetime import datetime
+
+from models.cache import get_snapshot_cache
+
+
+def test_etag_checks_do_not_count_as_hits(client, db):
+    db.save_snapshots([{
+        'captured_at': datetime.now(),
+        'items': [{'position': 1, 'word': '话题', 'hot_value': 100}],
+    }])
+    cache = get_snapshot_cache()
+    cache.invalidate()
+
+    first = client.get('/api/trend/话题')
+    etag = first.headers['ETag']
+    before = cache.get_stats()
+    for _ in range(5):
+        assert client.get('/api/trend/话题', headers={'If-None-Match': etag}).status_code == 304
+        cache.get_version()
+    assert cache.get_stats() == before
+
+    client.get('/api/hot')
+    after = cache.get_stats()
+    assert after['hits'] == before['hits'] + 1
+    assert after['misses'] == before['misses']
+
+
+def test_worker_does_not_prerender(db, monkeypatch):
+    cache = get_snapshot_cache()
+    rendered = []
+    render_hot = cache._render_hot
+    monkeypatch.setattr(cache, '_render_hot', lambda entry: rendered.append(1) or render_hot(entry))
+
+    # 抓取进程（未调用 create_app）入库时只刷新数据，不渲染响应体
+    db.save_snapshots([{'captured_at': datetime.now(), 'items': [{'position': 1, 'word': '话题'}]}])
+    assert rendered == []
+
+    body = cache.get_hot_body()
+    assert cache.get_hot_body() is body
+    assert rendered == [1]
+
+
+def test_http_process_prerenders_on_ingest(db, monkeypatch):
+    cache = get_snapshot_cache()
+    monkeypatch.setattr(cache, 'prerender', True)
+    db.save_snapshots([{'captured_at': datetime.now(), 'items': [{'position': 1, 'word': '话题'}]}])
+    assert 'hot' in cache._entry['rendered']
+    assert b'"snapshot_id":1' in cache.get_hot_body().raw
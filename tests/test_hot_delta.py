@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""/api/hot/delta：同一话题ID改名后，增量中带上新标题和链接"""
+
+from datetime import datetime, timedelta
+
+
+def _save(db, captured_at, word, hot_value=100):
+    return db.save_snapshots([{
+        'captured_at': captured_at,
+        'items': [{'position': 1, 'word': word, 'hot_value': hot_value,
+                   'url': f'https://www.douyin.com/hot/101?title={word}'}],
+    }])[0]
+
+
+def test_renamed_topic_is_sent_in_delta(db):
+    now = datetime.now()
+    first = _save(db, now - timedelta(minutes=20), '旧标题')
+    second = _save(db, now - timedelta(minutes=10), '新标题')
+    third = _save(db, now, '新标题')
+
+    delta = db.get_hot_list_delta(first, second)
+    assert delta['entered'] == [] and delta['left'] == []
+    [change] = delta['changed']
+    assert change['word'] == '新标题'
+    assert change['url'].endswith('title=新标题')
+    assert 'position' not in change
+
+    # 改名之后的快照之间没有变化
+    assert db.get_hot_list_delta(second, third)['changed'] == []
+    assert db.get_hot_list_delta(first, third)['changed'][0]['word'] == '新标题'
+
+
+def test_unchanged_topic_has_empty_delta(db):
+    now = datetime.now()
+    first = _save(db, now - timedelta(minutes=10), '话题')
+    second = _save(db, now, '话题', hot_value=200)
+    assert db.get_hot_list_delta(first, second)['changed'] == [{'hot_value': 200, 'key': '1'}]
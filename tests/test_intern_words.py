@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""words 字典表的话题归并：有话题ID按 topic_key，无话题ID只按标题归并到同样无ID的记录"""
+
+from datetime import datetime, timedelta
+
+
+def _save(db, captured_at, items):
+    db.save_snapshots([{
+        'captured_at': captured_at,
+        'items': [{'position': i + 1, 'hot_value': 100, **item} for i, item in enumerate(items)],
+    }])
+
+
+def _words(db):
+    with db.get_db_connection() as conn:
+        rows = conn.execute('SELECT id, word, topic_key, url, cover FROM words ORDER BY id').fetchall()
+    return [dict(row) for row in rows]
+
+
+def test_untitled_item_does_not_merge_into_keyed_topic(db):
+    now = datetime.now()
+    _save(db, now - timedelta(minutes=10), [
+        {'word': '同名话题', 'url': 'https://www.douyin.com/hot/101'},
+    ])
+    _save(db, now, [
+        {'word': '同名话题', 'url': 'https://example.com/a'},
+    ])
+
+    words = _words(db)
+    assert len(words) == 2
+    keyed, untitled = words
+    assert keyed['topic_key'] == 101
+    assert keyed['url'] == 'https://www.douyin.com/hot/101'
+    assert untitled['topic_key'] is None
+    assert untitled['url'] == 'https://example.com/a'
+
+
+def test_untitled_item_updates_metadata(db):
+    now = datetime.now()
+    _save(db, now - timedelta(minutes=10), [
+        {'word': '无ID话题', 'url': 'https://example.com/a', 'cover': 'a.jpg'},
+    ])
+    _save(db, now, [
+        {'word': '无ID话题', 'url': 'https://example.com/b', 'cover': 'b.jpg'},
+    ])
+
+    words = _words(db)
+    assert len(words) == 1
+    assert words[0]['url'] == 'https://example.com/b'
+    assert words[0]['cover'] == 'b.jpg'
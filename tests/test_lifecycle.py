@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""/api/topics/<topic>/lifecycle 的话题ID与标题查找"""
+
+from datetime import datetime
+from urllib.parse import quote
+
+import pytest
+
+
+@pytest.fixture
+def topic(db):
+    db.save_snapshots([{
+        'captured_at': datetime.now(),
+        'items': [{'position': 1, 'word': '测试话题', 'hot_value': 100,
+                   'url': 'https://www.douyin.com/hot/2366771'}],
+    }])
+    return db
+
+
+def test_lookup_by_key_and_title(client, topic):
+    by_key = client.get('/api/topics/2366771/lifecycle').get_json()
+    by_title = client.get(f"/api/topics/{quote('测试话题')}/lifecycle").get_json()
+    assert by_key['data']['word'] == '测试话题'
+    assert by_title['data'] == by_key['data']
+
+
+@pytest.mark.parametrize('value', ['²', '٣', '99999999999999999999'])
+def test_non_ascii_or_huge_digits_fall_back_to_title(client, topic, value):
+    response = client.get(f'/api/topics/{quote(value)}/lifecycle')
+    assert response.status_code == 404
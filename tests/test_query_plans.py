@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+查询计划检查
+
+在临时数据库中执行入库、清理和全部读取函数，记录实际执行的每条 SQL，
+对其运行 EXPLAIN QUERY PLAN，发现对大表的全表扫描即判定失败。
+"""
+
+import re
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import pytest
+
+from models import analytics, bursts, database
+from scheduler.leader import LeaderElection
+
+
+# 允许全表扫描的小字典表
+SCAN_ALLOWED_TABLES = {'tags'}
+
+# 不带 USING INDEX 的 SCAN 即为全表扫描
+_FULL_SCAN_RE = re.compile(r'^SCAN (\w+)$')
+
+# 会产生查询计划的语句
+_PLANNED_PREFIXES = ('SELECT', 'WITH', 'INSERT', 'REPLACE', 'UPDATE', 'DELETE')
+
+
+def _seed_items(seed: int) -> List[Dict]:
+    """生成测试用热榜数据"""
+    return [
+        {
+            'position': i + 1,
+            'word': f'查询计划测试{(i + seed) % 60}',
+            'hot_value': 1000000 - i * 1000 + seed,
+            'topic_id': str(1000 + (i + seed) % 60),
+            'tag': ('热', '新', '')[i % 3],
+            'url': f'https://www.douyin.com/hot/{1000 + (i + seed) % 60}'
+        }
+        for i in range(50)
+    ]
+
+
+def _seed_snapshots() -> List[Dict]:
+    """
+    两段快照：10 天前的一段供清理测试删除，最近的一段覆盖各读取分支；
+    最后两个快照排名相同，以覆盖上升榜的回退分支
+    """
+    old = datetime.now() - timedelta(days=10)
+    base = datetime.now() - timedelta(hours=2)
+    snapshots = [
+        {'captured_at': old + timedelta(minutes=i), 'items': _seed_items(i)}
+        for i in range(5)
+    ]
+    snapshots += [
+        {'captured_at': base + timedelta(minutes=i), 'items': _seed_items(i)}
+        for i in range(20)
+    ]
+    same = _seed_items(20)
+    snapshots.append({'captured_at': base + timedelta(minutes=20), 'items': same})
+    snapshots.append({
+        'captured_at': base + timedelta(minutes=21),
+        'items': [{**item, 'hot_value': item['hot_value'] + 10} for item in same]
+    })
+    return snapshots
+
+
+@contextmanager
+def _capture():
+    """记录块内当前线程连接执行的 SQL（参数已展开）"""
+    statements = []
+    with database.get_db_connection() as conn:
+        conn.set_trace_callback(statements.append)
+        try:
+            yield statements
+        finally:
+            conn.set_trace_callback(None)
+
+
+def _full_scans(statements: List[str]) -> List[str]:
+    """返回语句列表中对大表的全表扫描"""
+    problems = []
+    with database.get_db_connection() as conn:
+        for sql in dict.fromkeys(statements):
+            if not sql.lstrip().upper().startswith(_PLANNED_PREFIXES):
+                continue
+            for row in conn.execute('EXPLAIN QUERY PLAN ' + sql).fetchall():
+                match = _FULL_SCAN_RE.match(row['detail'])
+                if match and match.group(1) not in SCAN_ALLOWED_TABLES:
+                    problems.append(f"{row['detail']}  <-  {' '.join(sql.split())}")
+    return problems
+
+
+@pytest.fixture
+def seeded(db):
+    """已写入测试快照的数据库"""
+    db.save_snapshots(_seed_snapshots())
+    return db
+
+
+def _query_cases():
+    """需要检查的读取函数（覆盖各个分支）"""
+    word = _seed_items(0)[0]['word']
+    words = [item['word'] for item in _seed_items(0)[:5]]
+    return [
+        ('get_latest_hot_list', lambda: database.get_latest_hot_list()),
+        ('get_hot_list_delta', lambda: database.get_hot_list_delta(
+            *[row['id'] for row in database.get_snapshot_history(2)][::-1])),
+        ('get_word_trend', lambda: database.get_word_trend(word, 24)),
+        ('get_word_trends', lambda: database.get_word_trends(words, 24)),
+        ('get_word_trends[hourly]', lambda: database.get_word_trends(words, 168)),
+        ('get_word_trends[daily]', lambda: database.get_word_trends(words, 24 * 90)),
+        ('get_rising_topics', lambda: database.get_rising_topics(10)),
+        ('get_snapshot_history', lambda: database.get_snapshot_history(50)),
+        ('search_words', lambda: database.search_words('计划测试', 10)),
+        ('search_words[prefix]', lambda: database.search_words('查询', 10)),
+        ('analyze_topics', lambda: analytics.analyze_topics(24, 'velocity', 10)),
+        ('analyze_topics[hourly]', lambda: analytics.analyze_topics(168, 'ewma_heat', 10)),
+        ('analyze_topics[daily]', lambda: analytics.analyze_topics(24 * 90, resolution='daily')),
+        ('detect_bursts', lambda: bursts.detect_bursts(database.get_snapshot_history(1)[0]['id'])),
+        ('get_recent_bursts', lambda: bursts.get_recent_bursts(24, 10)),
+        ('get_topic_lifecycle', lambda: database.get_topic_lifecycle(1000)),
+        ('get_topic_lifecycle[title]', lambda: database.get_topic_lifecycle(word)),
+        *[
+            (f'list_topics[{column}]', lambda column=column: database.list_topics(column, True, 20))
+            for column in database.LIFECYCLE_SORT_COLUMNS
+        ],
+        ('list_topics[asc]', lambda: database.list_topics('peak_position', False, 20)),
+        ('LeaderElection.acquire', lambda: LeaderElection('query_plans')._try_acquire()),
+        ('LeaderElection.confirm', lambda: LeaderElection('query_plans').confirm()),
+    ]
+
+
+def test_ingest_uses_indexes(db):
+    # 分两次入库，第二次覆盖 _snapshot_gaps / _previous_snapshot_items 的已有数据分支
+    snapshots = _seed_snapshots()
+    db.save_snapshots(snapshots[:10])
+    with _capture() as statements:
+        db.save_snapshots(snapshots[10:])
+    assert statements
+    assert _full_scans(statements) == []
+
+
+def test_purge_uses_indexes(seeded):
+    with _capture() as statements:
+        result = seeded.purge_snapshots_before(7)
+    assert result['snapshots'] == 5
+    assert _full_scans(statements) == []
+
+
+@pytest.mark.parametrize('func', [func for _, func in _query_cases()],
+                         ids=[name for name, _ in _query_cases()])
+def test_query_uses_indexes(seeded, func):
+    with _capture() as statements:
+        func()
+    assert _full_scans(statements) == []
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""倒排索引：新快照只追加到 .idx.log，重建或归档时才重写 .idx"""
+
+import json
+import os
+
+import pytest
+
+import settings_manager
+from record_index import RecordIndex, build_day_index, index_path_for
+
+DATE = '2026-01-17'
+
+
+@pytest.fixture
+def records_dir(db):
+    os.makedirs(os.path.join(settings_manager.RECORDS_DIR, DATE))
+    return settings_manager.RECORDS_DIR
+
+
+def _save(index, records_dir, filename, words):
+    record = {
+        'timestamp': f'{DATE}T{filename[:5].replace("-", ":")}:00',
+        'data': [{'word': word, 'position': i + 1, 'hot_value': 100 - i} for i, word in enumerate(words)],
+    }
+    with open(os.path.join(records_dir, DATE, filename), 'w', encoding='utf-8') as f:
+        json.dump(record, f, ensure_ascii=False)
+    index.add_record(records_dir, DATE, filename, record, settings_manager.get_records_for_date)
+
+
+def _positions(index, records_dir, word):
+    return [(r['timestamp'][-8:-3], r['position'])
+            for r in index.lookup(records_dir, DATE, word, settings_manager.get_records_for_date)]
+
+
+def test_add_record_appends_without_rewriting_index(records_dir):
+    index = RecordIndex()
+    path = index_path_for(records_dir, DATE)
+    _save(index, records_dir, '10-00.json', ['甲', '乙'])
+    with open(path, 'rb') as f:
+        base = f.read()
+
+    _save(index, records_dir, '10-10.json', ['乙', '甲'])
+    _save(index, records_dir, '10-20.json', ['甲', '甲', '丙'])
+
+    with open(path, 'rb') as f:
+        assert f.read() == base
+    with open(path + '.log', encoding='utf-8') as f:
+        assert len(f.readlines()) == 2
+
+    # 另一个进程：读取 .idx 后重放 .log，结果与整天重建一致
+    reader = RecordIndex()
+    assert _positions(reader, records_dir, '甲') == [('10:00', 1), ('10:10', 2), ('10:20', 1)]
+    rebuilt = build_day_index(settings_manager.get_records_for_date(DATE))
+    assert reader._read(path)['words'] == rebuilt['words']
+    assert os.path.exists(path + '.log')
+
+
+def test_overwrite_and_rebuild(records_dir):
+    index = RecordIndex()
+    path = index_path_for(records_dir, DATE)
+    _save(index, records_dir, '10-00.json', ['甲'])
+    _save(index, records_dir, '10-10.json', ['甲'])
+    _save(index, records_dir, '10-10.json', ['乙', '甲'])
+    assert _positions(RecordIndex(), records_dir, '甲') == [('10:00', 1), ('10:10', 2)]
+
+    index.rebuild(records_dir, DATE, settings_manager.get_records_for_date(DATE))
+    assert not os.path.exists(path + '.log')
+    assert _positions(RecordIndex(), records_dir, '甲') == [('10:00', 1), ('10:10', 2)]
+
+
+def test_partial_log_line_triggers_rebuild(records_dir):
+    index = RecordIndex()
+    path = index_path_for(records_dir, DATE)
+    _save(index, records_dir, '10-00.json', ['甲'])
+    _save(index, records_dir, '10-10.json', ['甲'])
+    with open(path + '.log', 'a', encoding='utf-8') as f:
+        f.write('["10-20.json",')
+    with open(os.path.join(records_dir, DATE, '10-20.json'), 'w', encoding='utf-8') as f:
+        json.dump({'timestamp': f'{DATE}T10:20:00', 'data': [{'word': '甲', 'position': 3}]}, f)
+
+    assert _positions(RecordIndex(), records_dir, '甲') == [('10:00', 1), ('10:10', 1), ('10:20', 3)]
+    assert not os.path.exists(path + '.log')
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""热搜词搜索：1-2 个字符的查询也能匹配标题中间的子串"""
+
+from datetime import datetime
+
+import pytest
+
+
+@pytest.fixture
+def words(db):
+    db.save_snapshots([{
+        'captured_at': datetime.now(),
+        'items': [
+            {'position': 1, 'word': '今天天气很好', 'hot_value': 300},
+            {'position': 2, 'word': '天气预报', 'hot_value': 200},
+            {'position': 3, 'word': '50%_折扣', 'hot_value': 100},
+        ],
+    }])
+    return db
+
+
+def _search(db, query):
+    return {row['word'] for row in db.search_words(query, 10)}
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('天气', {'今天天气很好', '天气预报'}),
+    ('好', {'今天天气很好'}),
+    ('预报', {'天气预报'}),
+    ('天气很好', {'今天天气很好'}),
+    ('%_', {'50%_折扣'}),
+    ('_', {'50%_折扣'}),
+])
+def test_short_queries_match_substrings(words, query, expected):
+    assert _search(words, query) == expected
+
+
+def test_short_substring_scan_is_bounded(words, monkeypatch):
+    monkeypatch.setattr(words, 'SEARCH_SHORT_SCAN_WORDS', 1)
+    # 只扫描最新入库的 1 个词，较早的词仍可按前缀找到
+    assert _search(words, '很好') == set()
+    assert _search(words, '今天') == {'今天天气很好'}
+    assert _search(words, '折扣') == {'50%_折扣'}
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""设置保存：只提交部分字段时其余字段保持原值"""
+
+import json
+
+import settings_manager
+
+
+def test_partial_save_keeps_other_keys(db):
+    assert settings_manager.save_settings({'archive_after_days': 5, 'max_display_items': 80})
+    assert settings_manager.save_settings({'max_history_days': 3})
+
+    settings_manager.reload_settings()
+    settings = settings_manager.load_settings()
+    assert settings['archive_after_days'] == 5
+    assert settings['max_display_items'] == 80
+    assert settings['max_history_days'] == 3
+
+
+def test_settings_form_keeps_archive_after_days(client, db):
+    settings_manager.save_settings({'archive_after_days': 7, 'scrape_interval_minutes': 15})
+
+    # 与前端设置面板提交的字段相同
+    response = client.post('/api/settings', json={
+        'scrape_interval_minutes': 20,
+        'auto_refresh_seconds': 30,
+        'max_history_days': 10,
+    })
+    assert response.get_json()['settings']['archive_after_days'] == 7
+
+    with open(settings_manager.SETTINGS_FILE, encoding='utf-8') as f:
+        saved = json.load(f)
+    assert saved['archive_after_days'] == 7
+    assert saved['scrape_interval_minutes'] == 20
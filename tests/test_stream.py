@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""/api/stream 连接名额的释放"""
+
+from snapshot_events import get_snapshot_events
+
+
+def test_head_is_refused_without_taking_a_slot(client):
+    response = client.head('/api/stream')
+    assert response.status_code == 405
+    assert get_snapshot_events().get_stats()['clients'] == 0
+
+
+def test_aborted_get_releases_slot(client):
+    events = get_snapshot_events()
+    response = client.get('/api/stream', buffered=False)
+    assert response.status_code == 200
+    assert events.get_stats()['clients'] == 1
+
+    # 只读取第一段（retry 指令）后断开
+    assert next(response.response).startswith(b'retry:')
+    response.close()
+    assert events.get_stats()['clients'] == 0
+
+
+def test_unread_get_releases_slot(client):
+    response = client.get('/api/stream', buffered=False)
+    response.close()
+    assert get_snapshot_events().get_stats()['clients'] == 0
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""/api/trends 的 words 参数：可重复传入，只传一个时按逗号分隔"""
+
+from datetime import datetime
+
+import pytest
+
+
+@pytest.fixture
+def topics(db):
+    db.save_snapshots([{
+        'captured_at': datetime.now(),
+        'items': [
+            {'position': 1, 'word': '甲,乙', 'hot_value': 300},
+            {'position': 2, 'word': '丙', 'hot_value': 200},
+        ],
+    }])
+    return db
+
+
+def test_repeated_params_keep_commas(client, topics):
+    json = client.get('/api/trends', query_string=[('words', '甲,乙'), ('words', '丙')]).get_json()
+    assert set(json['trends']) == {'甲,乙', '丙'}
+    assert [p['position'] for p in json['trends']['甲,乙']] == [1]
+
+
+def test_single_param_splits_on_commas(client, topics):
+    json = client.get('/api/trends', query_string={'words': '丙, 丁'}).get_json()
+    assert set(json['trends']) == {'丙', '丁'}
+    assert json['trends']['丁'] == []
+
+
+def test_missing_words(client, db):
+    assert client.get('/api/trends').status_code == 400
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""增量回收模式：启动时不转换已有数据库，由 convert_to_incremental_vacuum 显式转换"""
+
+
+def _auto_vacuum(db):
+    with db.get_db_connection() as conn:
+        return conn.execute('PRAGMA auto_vacuum').fetchone()[0]
+
+
+def test_new_database_is_incremental(db):
+    assert _auto_vacuum(db) == 2
+
+
+def test_init_does_not_vacuum_existing_database(db):
+    with db.get_db_connection() as conn:
+        conn.execute('PRAGMA auto_vacuum=NONE')
+        conn.execute('VACUUM')
+    db.close_db_connection()
+    assert _auto_vacuum(db) == 0
+
+    statements = []
+    with db.get_db_connection() as conn:
+        conn.set_trace_callback(statements.append)
+        db.init_database()
+        conn.set_trace_callback(None)
+    assert not [sql for sql in statements if sql.strip().upper() == 'VACUUM']
+    assert _auto_vacuum(db) == 0
+
+    assert db.convert_to_incremental_vacuum() is True
+    assert _auto_vacuum(db) == 2
+    assert db.convert_to_incremental_vacuum() is False